@@ -0,0 +1,233 @@
+import asyncio
+import io
+import json
+import os
+import signal
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from http import HTTPStatus
+from http.client import parse_headers
+from urllib.parse import parse_qs, urlparse
+
+from db import DB_POOL_SIZE
+from live_events import LIVE_EVENTS_HEARTBEAT_SECONDS, event_broker, format_events
+
+ASYNC_IO_WORKERS = max(1, int(os.getenv('OSCAR_ASYNC_IO_WORKERS', '8')))
+ASYNC_KEEPALIVE_SECONDS = max(1, int(os.getenv('OSCAR_ASYNC_KEEPALIVE_SECONDS', '75')))
+MAX_HEADER_BYTES = 64 * 1024
+
+
+def _buffered_handler_class(handler_class, directory):
+    class BufferedHandler(handler_class):
+        """Runs one fully read request against in-memory streams.
+
+        Lets the asyncio engine reuse every route of the threaded handler
+        without giving a worker thread the socket.
+        """
+
+        def __init__(self, raw_request, client_address):
+            # Skip BaseRequestHandler.__init__: there is no socket to service.
+            self.directory = directory
+            self.client_address = client_address
+            self.server = None
+            self.request = None
+            self.rfile = io.BytesIO(raw_request)
+            self.wfile = io.BytesIO()
+            self.close_connection = True
+
+        def handle_expect_100(self):
+            # The connection loop already answered Expect before reading the body.
+            return True
+
+        def run(self):
+            self.handle_one_request()
+            return self.wfile.getvalue(), self.close_connection
+
+    return BufferedHandler
+
+
+def _simple_response(status, payload, extra_headers=None):
+    body = json.dumps(payload).encode('utf-8')
+    lines = [
+        f'HTTP/1.1 {status.value} {status.phrase}',
+        'Content-Type: application/json; charset=utf-8',
+        f'Content-Length: {len(body)}',
+        'Connection: close',
+    ]
+    for key, value in (extra_headers or {}).items():
+        lines.append(f'{key}: {value}')
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body
+
+
+class AsyncServer:
+    """Event-loop front end for OscarHandler.
+
+    Sockets, keep-alive and SSE streams live on the loop. Request handlers
+    run on a DB executor sized like the connection pool, and routes that
+    wait on JustWatch, SMTP or poster downloads run on a separate I/O
+    executor so they never starve DB work.
+    """
+
+    def __init__(self, handler_class, directory, max_body_bytes):
+        self.handler_class = _buffered_handler_class(handler_class, directory)
+        self.outbound_io_routes = getattr(handler_class, 'outbound_io_routes', frozenset())
+        self.max_body_bytes = max_body_bytes
+        self.db_executor = ThreadPoolExecutor(max_workers=DB_POOL_SIZE, thread_name_prefix='oscar-db')
+        self.io_executor = ThreadPoolExecutor(max_workers=ASYNC_IO_WORKERS, thread_name_prefix='oscar-io')
+        self.open_connections = 0
+
+    def _run_handler(self, raw_request, client_address):
+        return self.handler_class(raw_request, client_address).run()
+
+    async def handle_connection(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        peer = writer.get_extra_info('peername') or ('', 0)
+        client_address = tuple(peer[:2])
+        self.open_connections += 1
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), ASYNC_KEEPALIVE_SECONDS)
+                except asyncio.LimitOverrunError:
+                    writer.write(
+                        _simple_response(
+                            HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE,
+                            {'ok': False, 'error': 'Request headers too large.'},
+                        )
+                    )
+                    break
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+
+                request_line, _, header_block = head.partition(b'\r\n')
+                headers = parse_headers(io.BytesIO(header_block))
+                parts = request_line.decode('latin-1').split()
+                method = parts[0] if parts else ''
+                target = parts[1] if len(parts) > 1 else '/'
+                path = urlparse(target).path
+
+                try:
+                    length = int(headers.get('Content-Length', '0'))
+                except ValueError:
+                    length = 0
+                # Oversized bodies are left unread; the handler answers 413.
+                body_unread = length > self.max_body_bytes
+                body = b''
+                if 0 < length <= self.max_body_bytes:
+                    if headers.get('Expect', '').lower() == '100-continue':
+                        writer.write(b'HTTP/1.1 100 Continue\r\n\r\n')
+                        await writer.drain()
+                    try:
+                        body = await reader.readexactly(length)
+                    except (asyncio.IncompleteReadError, ConnectionError):
+                        break
+
+                if method == 'GET' and path == '/api/events':
+                    await self.stream_events(writer, target, headers)
+                    break
+
+                executor = self.io_executor if (method, path) in self.outbound_io_routes else self.db_executor
+                try:
+                    response, close_connection = await loop.run_in_executor(
+                        executor, self._run_handler, head + body, client_address
+                    )
+                except Exception:
+                    traceback.print_exc()
+                    response = _simple_response(
+                        HTTPStatus.INTERNAL_SERVER_ERROR,
+                        {'ok': False, 'error': 'Internal server error.'},
+                    )
+                    close_connection = True
+                writer.write(response)
+                await writer.drain()
+                if close_connection or body_unread:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self.open_connections -= 1
+            writer.close()
+            with suppress(Exception):
+                await writer.wait_closed()
+
+    async def stream_events(self, writer, target, headers):
+        query = parse_qs(urlparse(target).query)
+        try:
+            year = int(query.get('year', ['2026'])[0])
+        except ValueError:
+            writer.write(_simple_response(HTTPStatus.BAD_REQUEST, {'ok': False, 'error': 'Invalid year.'}))
+            await writer.drain()
+            return
+        await asyncio.get_running_loop().run_in_executor(self.db_executor, event_broker.start)
+        last_event_id = headers.get('Last-Event-ID') or query.get('lastEventId', [''])[0]
+        try:
+            cursor = int(last_event_id)
+        except ValueError:
+            cursor = event_broker.last_id
+        if not event_broker.open_stream():
+            writer.write(
+                _simple_response(
+                    HTTPStatus.SERVICE_UNAVAILABLE,
+                    {'ok': False, 'error': 'Too many live streams; poll instead.'},
+                    extra_headers={'Retry-After': str(LIVE_EVENTS_HEARTBEAT_SECONDS)},
+                )
+            )
+            await writer.drain()
+            return
+
+        try:
+            writer.write(
+                b'HTTP/1.1 200 OK\r\n'
+                b'Content-Type: text/event-stream; charset=utf-8\r\n'
+                b'Cache-Control: no-cache\r\n'
+                b'X-Accel-Buffering: no\r\n'
+                b'Connection: close\r\n'
+                b'\r\n'
+                b'retry: 3000\n\n'
+            )
+            await writer.drain()
+            loop = asyncio.get_running_loop()
+            last_write = loop.time()
+            while True:
+                events, cursor, gap = await event_broker.events_after_async(
+                    cursor, year, LIVE_EVENTS_HEARTBEAT_SECONDS
+                )
+                frames = format_events(events, cursor, gap)
+                if not frames and loop.time() - last_write >= LIVE_EVENTS_HEARTBEAT_SECONDS:
+                    frames = b': heartbeat\n\n'
+                if frames:
+                    writer.write(frames)
+                    await writer.drain()
+                    last_write = loop.time()
+        finally:
+            event_broker.close_stream()
+
+    async def serve_forever(self, host, port, reuse_port=False, ready=None, grace_seconds=0):
+        server = await asyncio.start_server(
+            self.handle_connection,
+            host,
+            port,
+            limit=MAX_HEADER_BYTES,
+            reuse_port=reuse_port or None,
+        )
+        if ready is None:
+            async with server:
+                await server.serve_forever()
+            return
+
+        # Supervised worker: report readiness, then drain on SIGTERM.
+        loop = asyncio.get_running_loop()
+        stopping = asyncio.Event()
+        loop.add_signal_handler(signal.SIGTERM, stopping.set)
+        ready()
+        await stopping.wait()
+        server.close()
+        deadline = loop.time() + grace_seconds
+        while self.open_connections and loop.time() < deadline:
+            await asyncio.sleep(0.1)
+
+
+def serve(handler_class, host, port, directory, max_body_bytes, reuse_port=False, ready=None, grace_seconds=0):
+    app = AsyncServer(handler_class, directory, max_body_bytes)
+    asyncio.run(app.serve_forever(host, port, reuse_port=reuse_port, ready=ready, grace_seconds=grace_seconds))
@@ -0,0 +1,168 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from db import connect
+
+AUDIT_FLUSH_SECONDS = max(10, int(os.getenv('OSCAR_AUDIT_FLUSH_MS', '200'))) / 1000
+AUDIT_QUEUE_MAX_ITEMS = max(1, int(os.getenv('OSCAR_AUDIT_QUEUE_MAX', '10000')))
+AUDIT_RETENTION_DAYS = max(1, int(os.getenv('OSCAR_AUDIT_RETENTION_DAYS', '90')))
+AUDIT_BATCH_MAX_ITEMS = 500
+AUDIT_PRUNE_INTERVAL_SECONDS = 60 * 60
+
+
+class AuditLogWriter:
+    """Buffers admin audit rows and inserts them from one background thread.
+
+    record() never touches SQLite, so auditing adds no latency to the admin
+    request. Rows are stamped when recorded and flushed in batches, together
+    with the per-month action counters the audit page lists.
+
+    Retention works on monthly partitions: months that lie entirely before
+    the retention window lose their rows and counters with one index range
+    delete each. The month the cutoff falls in is then trimmed to the exact
+    cutoff, and only that month's counters are adjusted.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue(maxsize=AUDIT_QUEUE_MAX_ITEMS)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stopping = False
+        self._stats_lock = threading.Lock()
+        self._written = 0
+        self._dropped = 0
+        self._failed = 0
+
+    def start(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='audit-log', daemon=True)
+                self._thread.start()
+
+    def record(self, admin_user_id, action, success, actor_email, request_ip, user_agent, details):
+        self.start()
+        created_at = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime())
+        row = (admin_user_id, action, 1 if success else 0, actor_email, request_ip, user_agent, details, created_at)
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            with self._stats_lock:
+                self._dropped += 1
+
+    def close(self, timeout):
+        """Flush buffered rows and stop the thread (worker shutdown)."""
+        if self._thread is None:
+            return
+        self._stopping = True
+        self._thread.join(timeout)
+
+    def metrics(self):
+        with self._stats_lock:
+            return {
+                'queueDepth': self._queue.qsize(),
+                'written': self._written,
+                'dropped': self._dropped,
+                'failedFlushes': self._failed,
+            }
+
+    def _next_batch(self):
+        try:
+            batch = [self._queue.get(timeout=AUDIT_FLUSH_SECONDS)]
+        except queue.Empty:
+            return []
+        # Let a burst of admin actions collect into one insert.
+        time.sleep(AUDIT_FLUSH_SECONDS)
+        while len(batch) < AUDIT_BATCH_MAX_ITEMS:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _flush(self, conn, batch):
+        try:
+            conn.executemany(
+                '''
+                INSERT INTO admin_audit_logs(
+                  admin_user_id, action, success, actor_email, request_ip, user_agent, details, created_at
+                ) VALUES(?, ?, ?, ?, ?, ?, ?, ?)
+                ''',
+                batch,
+            )
+            counts = Counter((row[7][:7], row[1]) for row in batch)
+            conn.executemany(
+                '''
+                INSERT INTO admin_audit_action_counts(created_month, action, count)
+                VALUES(?, ?, ?)
+                ON CONFLICT(created_month, action) DO UPDATE SET
+                  count=count + excluded.count
+                ''',
+                [(month, action, count) for (month, action), count in counts.items()],
+            )
+            conn.commit()
+            with self._stats_lock:
+                self._written += len(batch)
+        except sqlite3.Error:
+            conn.rollback()
+            with self._stats_lock:
+                self._failed += 1
+
+    def _prune(self, conn):
+        cutoff = datetime.now(timezone.utc) - timedelta(days=AUDIT_RETENTION_DAYS)
+        cutoff_at = cutoff.strftime('%Y-%m-%d %H:%M:%S')
+        cutoff_month = cutoff.strftime('%Y-%m')
+        month_start = f'{cutoff_month}-01'
+        try:
+            # Whole months before the cutoff month are expired partitions.
+            conn.execute('DELETE FROM admin_audit_logs WHERE created_at < ?', (month_start,))
+            conn.execute('DELETE FROM admin_audit_action_counts WHERE created_month < ?', (cutoff_month,))
+            # Without this trim, entries could outlive the window by up to a month.
+            conn.execute(
+                '''
+                UPDATE admin_audit_action_counts
+                SET count = count - (
+                  SELECT COUNT(*)
+                  FROM admin_audit_logs l
+                  WHERE l.created_at >= ? AND l.created_at < ?
+                    AND l.action = admin_audit_action_counts.action
+                )
+                WHERE created_month = ?
+                ''',
+                (month_start, cutoff_at, cutoff_month),
+            )
+            conn.execute(
+                'DELETE FROM admin_audit_logs WHERE created_at >= ? AND created_at < ?',
+                (month_start, cutoff_at),
+            )
+            conn.execute(
+                'DELETE FROM admin_audit_action_counts WHERE created_month = ? AND count <= 0',
+                (cutoff_month,),
+            )
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+
+    def _run(self):
+        conn = connect(check_same_thread=False)
+        next_prune_at = 0
+        while True:
+            now_ts = time.time()
+            if now_ts >= next_prune_at:
+                next_prune_at = now_ts + AUDIT_PRUNE_INTERVAL_SECONDS
+                self._prune(conn)
+            batch = self._next_batch()
+            if batch:
+                self._flush(conn, batch)
+            elif self._stopping:
+                break
+        conn.close()
+
+
+audit_log = AuditLogWriter()
@@ -1,25 +1,12 @@
 import argparse
+import hashlib
 import re
-from urllib.request import Request, urlopen
-
-from db import connect, init_db
-
-
-def fetch_html(url, timeout=12):
-    req = Request(
-        url,
-        headers={
-            'User-Agent': (
-                'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) '
-                'AppleWebKit/537.36 (KHTML, like Gecko) '
-                'Chrome/122.0.0.0 Safari/537.36'
-            ),
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-        },
-    )
-    with urlopen(req, timeout=timeout) as response:
-        return response.read().decode('utf-8', errors='ignore')
+import time
+
+from db import bump_content_version, connect, init_db
+from http_fetch import FetchError, add_cache_arguments, configure_cache, http_fetcher, run_concurrently
+
+AUDIT_RECHECK_HOURS = 168
 
 
 def extract_year_from_title_tag(html):
@@ -42,75 +29,198 @@ def extract_year_from_payload(html):
     return int(m.group(1))
 
 
+def extract_release_year(html):
+    release_year = extract_year_from_title_tag(html)
+    if release_year is None:
+        release_year = extract_year_from_payload(html)
+    return release_year
+
+
+def check_url(url, known_hash=None, timeout=12):
+    """Fetch one watch page; returns (release_year, content hash). Runs on the worker pool.
+
+    A page whose bytes still hash to known_hash is not parsed again and
+    comes back with release_year None.
+    """
+    body = http_fetcher.fetch(url, timeout=timeout)[1]
+    content_hash = hashlib.sha256(body).hexdigest()
+    if content_hash == known_hash:
+        return None, content_hash
+    return extract_release_year(body.decode('utf-8', errors='ignore')), content_hash
+
+
+def store_audit(cur, url, release_year, content_hash, checked_at):
+    cur.execute(
+        '''
+        INSERT INTO watch_link_audits(url, release_year, http_status, content_hash, error, checked_at_epoch)
+        VALUES(?, ?, 200, ?, NULL, ?)
+        ON CONFLICT(url) DO UPDATE SET
+          release_year=excluded.release_year,
+          http_status=excluded.http_status,
+          content_hash=excluded.content_hash,
+          error=NULL,
+          checked_at_epoch=excluded.checked_at_epoch
+        ''',
+        (url, release_year, content_hash, checked_at),
+    )
+
+
+def store_failed_audit(cur, url, error, checked_at):
+    # The last good release year stays on record; the URL is re-checked next run.
+    status = error.status if isinstance(error, FetchError) else None
+    cur.execute(
+        '''
+        INSERT INTO watch_link_audits(url, http_status, error, checked_at_epoch)
+        VALUES(?, ?, ?, ?)
+        ON CONFLICT(url) DO UPDATE SET
+          http_status=excluded.http_status,
+          error=excluded.error,
+          checked_at_epoch=excluded.checked_at_epoch
+        ''',
+        (url, status, str(error), checked_at),
+    )
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Audit watch-link overrides and remove any pointing to releases before cutoff year.'
     )
     parser.add_argument('--year', type=int, default=2026)
-    parser.add_argument('--cutoff', type=int, default=2025)
+    parser.add_argument('--all-years', action='store_true', help='Audit the overrides of every year.')
+    parser.add_argument(
+        '--cutoff',
+        type=int,
+        help='Remove links to releases before this year (default: the year before each ceremony year).',
+    )
+    parser.add_argument(
+        '--recheck-hours',
+        type=float,
+        default=AUDIT_RECHECK_HOURS,
+        help='Re-fetch a URL whose last audit is older than this.',
+    )
+    parser.add_argument(
+        '--full',
+        action='store_true',
+        help='Re-fetch and re-parse every URL regardless of earlier audits.',
+    )
     parser.add_argument('--timeout', type=float, default=12)
+    parser.add_argument('--delay', type=float, default=0.25, help='Minimum seconds between requests to one host.')
+    parser.add_argument('--workers', type=int, default=4)
     parser.add_argument('--dry-run', action='store_true')
+    add_cache_arguments(parser)
     args = parser.parse_args()
+    http_fetcher.min_interval = args.delay
+    cache = configure_cache(http_fetcher, args)
 
     init_db()
     conn = connect()
     cur = conn.cursor()
 
     rows = cur.execute(
-        '''
-        SELECT awl.year, awl.film_id, f.title, awl.url
+        f'''
+        SELECT awl.year, awl.film_id, f.title, awl.url,
+               wla.release_year, wla.content_hash, wla.error, wla.checked_at_epoch
         FROM admin_watch_links awl
         JOIN films f ON f.id = awl.film_id
-        WHERE awl.year = ?
-        ORDER BY f.title
+        LEFT JOIN watch_link_audits wla ON wla.url = awl.url
+        {'' if args.all_years else 'WHERE awl.year = ?'}
+        ORDER BY awl.year, f.title
         ''',
-        (args.year,),
+        () if args.all_years else (args.year,),
     ).fetchall()
 
+    # A URL shared by several films or years is fetched once.
+    audits = {}
+    for row in rows:
+        audits.setdefault(row['url'], row)
+    now = int(time.time())
+    stale_before = now - int(args.recheck_hours * 3600)
+    stale = [
+        url
+        for url, audit in audits.items()
+        if args.full
+        or audit['checked_at_epoch'] is None
+        or audit['error'] is not None
+        or audit['checked_at_epoch'] < stale_before
+    ]
+    release_years = {url: audit['release_year'] for url, audit in audits.items()}
+
+    # Unchanged pages keep the release year parsed from them before.
+    known_hashes = {} if args.full else {url: audit['content_hash'] for url, audit in audits.items()}
+    changed = 0
+    unchanged = 0
+    failed = 0
+    results = run_concurrently(
+        lambda url: check_url(url, known_hashes.get(url), timeout=args.timeout), stale, args.workers
+    )
+    for url, result, error in results:
+        audit = audits[url]
+        label = f"{audit['film_id']} {audit['title']}"
+        if error is not None:
+            failed += 1
+            store_failed_audit(cur, url, error, now)
+            print(f'WARN  {label}: fetch failed ({error})', flush=True)
+            continue
+
+        release_year, content_hash = result
+        if content_hash == known_hashes.get(url):
+            unchanged += 1
+            release_year = audit['release_year']
+        store_audit(cur, url, release_year, content_hash, now)
+        release_years[url] = release_year
+        if audit['checked_at_epoch'] is None:
+            print(f'NEW   {label}: linked year {release_year or "unknown"} -> {url}', flush=True)
+        elif release_year != audit['release_year']:
+            changed += 1
+            print(
+                f'CHANGED {label}: linked year {audit["release_year"] or "unknown"} -> '
+                f'{release_year or "unknown"} ({url})',
+                flush=True,
+            )
+
     removed = 0
     kept = 0
     unknown = 0
-
+    removed_years = set()
     for row in rows:
-        film_id = row['film_id']
-        title = row['title']
-        url = row['url']
-
-        try:
-            html = fetch_html(url, timeout=args.timeout)
-            release_year = extract_year_from_title_tag(html)
-            if release_year is None:
-                release_year = extract_year_from_payload(html)
-        except Exception as exc:
-            release_year = None
-            print(f'WARN  {film_id} {title}: fetch failed ({exc})', flush=True)
-
+        release_year = release_years[row['url']]
+        cutoff = args.cutoff if args.cutoff is not None else row['year'] - 1
         if release_year is None:
             unknown += 1
             kept += 1
-            print(f'KEEP  {film_id} {title}: unknown year -> {url}', flush=True)
-            continue
-
-        if release_year < args.cutoff:
+        elif release_year < cutoff:
             removed += 1
-            print(f'REMOVE {film_id} {title}: linked year {release_year} < {args.cutoff} -> {url}', flush=True)
-            if not args.dry_run:
-                cur.execute(
-                    'DELETE FROM admin_watch_links WHERE year = ? AND film_id = ?',
-                    (args.year, film_id),
-                )
-                conn.commit()
+            print(
+                f"REMOVE {row['year']} {row['film_id']} {row['title']}: "
+                f"linked year {release_year} < {cutoff} -> {row['url']}",
+                flush=True,
+            )
+            cur.execute(
+                'DELETE FROM admin_watch_links WHERE year = ? AND film_id = ?',
+                (row['year'], row['film_id']),
+            )
+            removed_years.add(row['year'])
         else:
             kept += 1
-            print(f'KEEP  {film_id} {title}: linked year {release_year} -> {url}', flush=True)
+
+    if args.dry_run:
+        conn.rollback()
+    else:
+        for year in sorted(removed_years):
+            bump_content_version(cur, year)
+        cur.execute('DELETE FROM watch_link_audits WHERE url NOT IN (SELECT url FROM admin_watch_links)')
+        conn.commit()
 
     print('---', flush=True)
     print(f'Total: {len(rows)}', flush=True)
+    print(f'Checked: {len(stale)} of {len(audits)} URLs ({failed} failed, {unchanged} unchanged pages, {changed} changed)', flush=True)
     print(f'Kept: {kept}', flush=True)
     print(f'Removed: {removed}', flush=True)
     print(f'Unknown year kept: {unknown}', flush=True)
+    if cache is not None:
+        print(f'HTTP cache: {cache.summary()}', flush=True)
     if args.dry_run:
-        print('Dry run only; no deletions committed.', flush=True)
+        print('Dry run only; no changes committed.', flush=True)
 
     conn.close()
 
@@ -0,0 +1,206 @@
+STAGING_TABLES = {
+    'stage_years': 'year INTEGER, label TEXT',
+    'stage_categories': 'year INTEGER, name TEXT, year_started INTEGER, year_ended INTEGER',
+    'stage_films': 'id TEXT, title TEXT, external_id TEXT',
+    'stage_film_years': (
+        'year INTEGER, film_id TEXT, base_free TEXT, base_subscription TEXT, base_rent TEXT, base_theaters TEXT'
+    ),
+    'stage_nominations': 'year INTEGER, category TEXT, film_id TEXT, nominee TEXT',
+    'stage_default_seen': 'year INTEGER, film_id TEXT',
+}
+
+MERGE_SQL = (
+    '''
+    INSERT INTO years(year, label)
+    SELECT year, label FROM stage_years WHERE true ORDER BY rowid
+    ON CONFLICT(year) DO UPDATE SET
+      label=excluded.label
+    ''',
+    'INSERT OR IGNORE INTO year_content_versions(year) SELECT year FROM stage_years',
+    '''
+    INSERT INTO categories(year, name, year_started, year_ended)
+    SELECT year, name, year_started, year_ended FROM stage_categories WHERE true ORDER BY rowid
+    ON CONFLICT(year, name) DO UPDATE SET
+      year_started=excluded.year_started,
+      year_ended=excluded.year_ended
+    ''',
+    '''
+    INSERT INTO films(id, title, external_id)
+    SELECT id, title, external_id FROM stage_films WHERE true ORDER BY rowid
+    ON CONFLICT(id) DO UPDATE SET
+      title=excluded.title,
+      external_id=excluded.external_id
+    ''',
+    '''
+    INSERT INTO film_years(year, film_id, base_free, base_subscription, base_rent, base_theaters)
+    SELECT year, film_id, base_free, base_subscription, base_rent, base_theaters
+    FROM stage_film_years WHERE true ORDER BY rowid
+    ON CONFLICT(year, film_id) DO UPDATE SET
+      base_free=excluded.base_free,
+      base_subscription=excluded.base_subscription,
+      base_rent=excluded.base_rent,
+      base_theaters=excluded.base_theaters
+    ''',
+    'DELETE FROM nominations WHERE year IN (SELECT year FROM stage_years)',
+    '''
+    INSERT INTO nominations(year, category_id, film_id, nominee)
+    SELECT n.year, c.id, n.film_id, n.nominee
+    FROM stage_nominations n
+    JOIN categories c ON c.year = n.year AND c.name = n.category
+    ORDER BY n.rowid
+    ''',
+    'DELETE FROM default_seen WHERE year IN (SELECT year FROM stage_years)',
+    'INSERT INTO default_seen(year, film_id) SELECT year, film_id FROM stage_default_seen ORDER BY rowid',
+)
+
+PRUNE_SQL = (
+    '''
+    DELETE FROM film_years
+    WHERE year IN (SELECT year FROM stage_years)
+      AND (year, film_id) NOT IN (SELECT year, film_id FROM stage_film_years)
+    ''',
+    '''
+    DELETE FROM categories
+    WHERE year IN (SELECT year FROM stage_years)
+      AND (year, name) NOT IN (SELECT year, name FROM stage_categories)
+    ''',
+)
+
+
+class FilmIndex:
+    """The films table held in memory while payloads are resolved.
+
+    Canonical ids are resolved as the row-by-row importer did: by
+    external_id first, then by title, with the earliest film winning a tie.
+    Without an external_id the payload's own id is kept. Upserts are applied
+    here in payload order, and the films they touch are written back in one
+    statement.
+    """
+
+    def __init__(self, cur):
+        self.films = {}
+        self.rowids = {}
+        self.by_external_id = {}
+        self.by_title = {}
+        self.changed = {}
+        for rowid, film_id, title, external_id in cur.execute('SELECT rowid, id, title, external_id FROM films'):
+            self.rowids[film_id] = rowid
+            self._store(film_id, title, external_id)
+        self._next_rowid = max(self.rowids.values(), default=0) + 1
+        self.changed.clear()
+
+    def _store(self, film_id, title, external_id):
+        previous = self.films.get(film_id)
+        if previous is not None:
+            self.by_title[previous[0]].discard(film_id)
+            if previous[1] is not None:
+                self.by_external_id[previous[1]].discard(film_id)
+        self.films[film_id] = (title, external_id)
+        self.by_title.setdefault(title, set()).add(film_id)
+        if external_id is not None:
+            self.by_external_id.setdefault(external_id, set()).add(film_id)
+        if film_id not in self.rowids:
+            self.rowids[film_id] = self._next_rowid
+            self._next_rowid += 1
+        self.changed[film_id] = None
+
+    def _first(self, index, key):
+        film_ids = index.get(key)
+        return min(film_ids, key=self.rowids.__getitem__) if film_ids else None
+
+    def resolve(self, source_film_id, title, external_id):
+        external_id = (external_id or '').strip()
+        if not external_id:
+            return source_film_id
+
+        film_id = self._first(self.by_external_id, external_id)
+        if film_id is not None:
+            return film_id
+
+        film_id = self._first(self.by_title, title)
+        if film_id is not None:
+            current_title, current_external_id = self.films[film_id]
+            if current_external_id in (None, '', film_id):
+                self._store(film_id, current_title, external_id)
+            return film_id
+
+        return external_id
+
+    def upsert(self, film_id, title, external_id):
+        current = self.films.get(film_id)
+        if current is not None and current[1]:
+            external_id = current[1]
+        self._store(film_id, title, external_id)
+
+    def changed_rows(self):
+        return [(film_id, *self.films[film_id]) for film_id in self.changed]
+
+
+def _stage(cur, table, rows):
+    cur.execute(f'DROP TABLE IF EXISTS temp.{table}')
+    cur.execute(f'CREATE TEMP TABLE {table} ({STAGING_TABLES[table]})')
+    placeholders = ','.join('?' for _ in STAGING_TABLES[table].split(','))
+    cur.executemany(f'INSERT INTO temp.{table} VALUES({placeholders})', rows)
+
+
+def load_years(cur, payloads, prune=False):
+    """Import {year: payload} with set-based merges; the caller owns the transaction.
+
+    Films are resolved against an in-memory FilmIndex, every row is staged
+    in temp tables with executemany, and years, categories, films,
+    film_years, nominations and default_seen are then merged with one
+    statement each. With prune, film_years and categories of the imported
+    years that the payload no longer lists are removed.
+    """
+    films = FilmIndex(cur)
+    rows = {table: [] for table in STAGING_TABLES}
+    for year, payload in payloads.items():
+        rows['stage_years'].append((year, payload['label']))
+        category_names = set()
+        for category in payload.get('categories') or []:
+            category_names.add(category['name'])
+            rows['stage_categories'].append(
+                (year, category['name'], category.get('yearStarted'), category.get('yearEnded'))
+            )
+
+        source_to_canonical = {}
+        for film in payload.get('films') or []:
+            title = film['title']
+            external_id = film.get('externalId')
+            film_id = films.resolve(film['id'], title, external_id)
+            source_to_canonical[film['id']] = film_id
+            films.upsert(film_id, title, external_id or film_id)
+            availability = film.get('availability', {})
+            rows['stage_film_years'].append(
+                (
+                    year,
+                    film_id,
+                    availability.get('free', ''),
+                    availability.get('subscription', ''),
+                    availability.get('rent', ''),
+                    availability.get('theaters', ''),
+                )
+            )
+
+        for nomination in payload.get('nominations') or []:
+            if nomination['category'] not in category_names:
+                raise ValueError(f"{year}: nomination in unknown category {nomination['category']!r}")
+            rows['stage_nominations'].append(
+                (
+                    year,
+                    nomination['category'],
+                    source_to_canonical[nomination['filmId']],
+                    nomination.get('nominee', ''),
+                )
+            )
+
+        for source_film_id in payload.get('defaultSeenFilmIds') or []:
+            rows['stage_default_seen'].append((year, source_to_canonical.get(source_film_id, source_film_id)))
+
+    rows['stage_films'] = films.changed_rows()
+    for table, table_rows in rows.items():
+        _stage(cur, table, table_rows)
+    for sql in MERGE_SQL + (PRUNE_SQL if prune else ()):
+        cur.execute(sql)
+    for table in STAGING_TABLES:
+        cur.execute(f'DROP TABLE temp.{table}')
@@ -0,0 +1,193 @@
+import threading
+import time
+
+from db import content_version, pooled_connection, read_transaction, release_pooled_connection
+from poster_pack import poster_packs
+from settings import YearSettings
+
+
+class CatalogFilm:
+    __slots__ = (
+        'id',
+        'title',
+        'watch_url',
+        'free_to_watch',
+        'scraped_poster_url',
+        'admin_poster_url',
+        'poster_digest',
+    )
+
+    def __init__(self, row, poster_digest):
+        self.id = row['id']
+        self.title = row['title']
+        self.watch_url = row['override_url']
+        self.free_to_watch = bool(row['free_to_watch'])
+        self.scraped_poster_url = row['scraped_poster_url']
+        self.admin_poster_url = row['admin_poster_url']
+        self.poster_digest = poster_digest
+
+
+class CatalogCategory:
+    __slots__ = ('id', 'name', 'year_started', 'year_ended', 'film_ids')
+
+    def __init__(self, row, film_ids):
+        self.id = row['id']
+        self.name = row['name']
+        self.year_started = row['year_started']
+        self.year_ended = row['year_ended']
+        self.film_ids = film_ids
+
+
+class YearCatalog:
+    """Read-only snapshot of one year's nominee data and admin overrides.
+
+    Built in one read transaction and never mutated; a content version bump
+    makes year_catalog() build a replacement and swap it in. Poster digests
+    come from the year's pack as it stands at build time; writers rebuild
+    the pack before bumping the version.
+    """
+
+    __slots__ = (
+        'year',
+        'version',
+        'categories',
+        'categories_by_name',
+        'category_names_by_id',
+        'films',
+        'films_by_id',
+        'nominations',
+        'winners_by_category',
+        'settings',
+    )
+
+    def __init__(self, conn, year, version):
+        self.year = year
+        self.version = version
+
+        film_rows = conn.execute(
+            '''
+            SELECT f.id, f.title, wl.url AS override_url,
+                   wlbl.free_to_watch AS free_to_watch,
+                   sp.url AS scraped_poster_url, ap.url AS admin_poster_url
+            FROM film_years fy
+            JOIN films f ON f.id = fy.film_id
+            LEFT JOIN admin_watch_links wl ON wl.year = fy.year AND wl.film_id = fy.film_id
+            LEFT JOIN admin_watch_labels wlbl ON wlbl.year = fy.year AND wlbl.film_id = fy.film_id
+            LEFT JOIN scraped_posters sp ON sp.year = fy.year AND sp.film_id = fy.film_id
+            LEFT JOIN admin_posters ap ON ap.year = fy.year AND ap.film_id = fy.film_id
+            WHERE fy.year = ?
+            ORDER BY f.title
+            ''',
+            (year,),
+        ).fetchall()
+        pack = poster_packs.refresh(year)
+        entries = pack.entries if pack else {}
+        self.films = tuple(
+            CatalogFilm(row, entries[row['id']].digest if row['id'] in entries else None) for row in film_rows
+        )
+        self.films_by_id = {film.id: film for film in self.films}
+
+        nomination_rows = conn.execute(
+            '''
+            SELECT n.category_id, c.name AS category, n.film_id, n.nominee
+            FROM nominations n
+            JOIN categories c ON c.id = n.category_id
+            WHERE n.year = ?
+            ORDER BY n.id
+            ''',
+            (year,),
+        ).fetchall()
+        self.nominations = tuple((row['category'], row['film_id'], row['nominee']) for row in nomination_rows)
+
+        film_order = {film.id: position for position, film in enumerate(self.films)}
+        films_by_category = {}
+        for row in nomination_rows:
+            if row['film_id'] in film_order:
+                films_by_category.setdefault(row['category_id'], set()).add(row['film_id'])
+
+        category_rows = conn.execute(
+            'SELECT id, name, year_started, year_ended FROM categories WHERE year = ? ORDER BY id',
+            (year,),
+        ).fetchall()
+        self.categories = tuple(
+            CatalogCategory(row, tuple(sorted(films_by_category.get(row['id'], ()), key=film_order.__getitem__)))
+            for row in category_rows
+        )
+        self.categories_by_name = {category.name: category for category in self.categories}
+        self.category_names_by_id = {category.id: category.name for category in self.categories}
+
+        winner_rows = conn.execute(
+            'SELECT category_id, film_id FROM category_winners WHERE year = ?',
+            (year,),
+        ).fetchall()
+        self.winners_by_category = {
+            self.category_names_by_id[row['category_id']]: row['film_id']
+            for row in winner_rows
+            if row['category_id'] in self.category_names_by_id
+        }
+
+        self.settings = YearSettings(conn, year)
+
+    def category_id(self, name):
+        category = self.categories_by_name.get(name)
+        return category.id if category else None
+
+    def films_for(self, category_name):
+        category = self.categories_by_name.get(category_name)
+        if category is None:
+            return ()
+        return tuple(self.films_by_id[film_id] for film_id in category.film_ids)
+
+
+CATALOG_RECHECK_SECONDS = 1.0
+
+_catalogs = {}
+_checked_at = {}
+_catalog_lock = threading.Lock()
+
+
+def year_catalog(conn, year):
+    """Return the current catalog for a year, rebuilding it if its version moved.
+
+    conn should be inside a read transaction so the version check and any
+    rebuild see the same snapshot.
+    """
+    epoch, version, _ = content_version(conn, year)
+    key = (epoch, version)
+    if not epoch:
+        # No version row: the year doesn't exist. Years come from the query
+        # string, so only real ones are kept.
+        return YearCatalog(conn, year, key)
+    _checked_at[year] = time.monotonic()
+    catalog = _catalogs.get(year)
+    if catalog is not None and catalog.version == key:
+        return catalog
+    with _catalog_lock:
+        catalog = _catalogs.get(year)
+        if catalog is None or catalog.version != key:
+            catalog = YearCatalog(conn, year, key)
+            _catalogs[year] = catalog
+    return catalog
+
+
+def recent_year_catalog(year):
+    """Like year_catalog, but skips the version query if it ran within the last second.
+
+    For hot static-ish paths (poster redirects) that tolerate a moment of staleness.
+    """
+    catalog = _catalogs.get(year)
+    if catalog is not None and time.monotonic() - _checked_at.get(year, 0) < CATALOG_RECHECK_SECONDS:
+        return catalog
+    return year_catalog(pooled_connection(), year)
+
+
+def warm_catalogs():
+    """Load every year's catalog; run before a server process reports ready."""
+    try:
+        with read_transaction() as conn:
+            years = [row['year'] for row in conn.execute('SELECT year FROM years').fetchall()]
+            for year in years:
+                year_catalog(conn, year)
+    finally:
+        release_pooled_connection()
+    return years
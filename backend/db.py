@@ -1,19 +1,212 @@
+import os
+import queue
 import sqlite3
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 
+from scoring import rebuild_user_scores
+
 DB_PATH = Path(__file__).resolve().parent.parent / 'data' / 'oscars.db'
+DB_POOL_SIZE = max(1, int(os.getenv('OSCAR_DB_POOL_SIZE', '16')))
+DB_BUSY_TIMEOUT_MS = int(os.getenv('OSCAR_DB_BUSY_TIMEOUT_MS', '5000'))
+DB_CACHE_SIZE_KIB = int(os.getenv('OSCAR_DB_CACHE_SIZE_KIB', '16384'))
+DB_MMAP_SIZE_BYTES = int(os.getenv('OSCAR_DB_MMAP_SIZE_BYTES', str(128 * 1024 * 1024)))
+DB_STATEMENT_CACHE_SIZE = 256
+DB_POOL_TIMEOUT_MS = int(os.getenv('OSCAR_DB_POOL_TIMEOUT_MS', '5000'))
+
 
+class PoolExhausted(Exception):
+    pass
 
-def connect():
-    conn = sqlite3.connect(DB_PATH)
+
+def connect(check_same_thread=True, path=None):
+    conn = sqlite3.connect(
+        path or DB_PATH,
+        timeout=DB_BUSY_TIMEOUT_MS / 1000,
+        cached_statements=DB_STATEMENT_CACHE_SIZE,
+        check_same_thread=check_same_thread,
+    )
     conn.row_factory = sqlite3.Row
     conn.execute('PRAGMA foreign_keys = ON')
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute('PRAGMA synchronous = NORMAL')
+    conn.execute(f'PRAGMA busy_timeout = {DB_BUSY_TIMEOUT_MS}')
+    # Negative cache_size is in KiB rather than pages.
+    conn.execute(f'PRAGMA cache_size = -{DB_CACHE_SIZE_KIB}')
+    conn.execute(f'PRAGMA mmap_size = {DB_MMAP_SIZE_BYTES}')
+    conn.execute('PRAGMA temp_store = MEMORY')
+    return conn
+
+
+class ConnectionPool:
+    """Bounded set of long-lived connections shared by server threads.
+
+    Connections are configured once, then checked out by a request thread and
+    returned when the request finishes, so handlers never pay connect/PRAGMA
+    costs on the hot path. acquire() raises PoolExhausted when none comes
+    free within DB_POOL_TIMEOUT_MS.
+    """
+
+    def __init__(self, size=DB_POOL_SIZE):
+        self._size = size
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self._size:
+                self._created += 1
+                return connect(check_same_thread=False)
+        try:
+            return self._idle.get(timeout=DB_POOL_TIMEOUT_MS / 1000)
+        except queue.Empty:
+            raise PoolExhausted() from None
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+_local = threading.local()
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool()
+    return _pool
+
+
+def pooled_connection():
+    """Return the connection checked out by the current thread.
+
+    The first call in a request acquires one from the pool; later calls in the
+    same request reuse it until release_pooled_connection() hands it back.
+    """
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        conn = _get_pool().acquire()
+        _local.conn = conn
     return conn
 
 
-def init_db():
-    conn = connect()
+def release_pooled_connection():
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        return
+    _local.conn = None
+    _get_pool().release(conn)
+
+
+@contextmanager
+def read_transaction():
+    """Run a block of reads against one consistent WAL snapshot."""
+    conn = pooled_connection()
+    if conn.in_transaction:
+        yield conn
+        return
+    conn.execute('BEGIN')
+    try:
+        yield conn
+    finally:
+        if conn.in_transaction:
+            conn.commit()
+
+
+def bump_content_version(cur, year, winners=False):
+    """Mark a year's public payload as changed; call inside the write's transaction."""
+    cur.execute(
+        '''
+        INSERT INTO year_content_versions(year, version, winners_version)
+        VALUES(?, 1, ?)
+        ON CONFLICT(year) DO UPDATE SET
+          version=version + 1,
+          winners_version=winners_version + excluded.winners_version
+        ''',
+        (year, 1 if winners else 0),
+    )
+
+
+def bump_all_content_versions(cur, winners=False):
+    for (year,) in cur.execute('SELECT year FROM years').fetchall():
+        bump_content_version(cur, year, winners=winners)
+
+
+def ensure_content_versions(cur):
+    """Give every year a version row, so its ETags carry a real epoch from the first response.
+
+    Years from legacy or restored databases that never had a row would
+    otherwise report epoch 0 and repeat ETags clients already hold.
+    """
+    cur.execute('INSERT OR IGNORE INTO year_content_versions(year) SELECT year FROM years')
+
+
+def content_version(conn, year):
+    """Return (epoch, version, winners_version) for a year.
+
+    epoch is fixed when the row is first created, so counters restarting in a
+    rebuilt database never repeat an ETag handed out by the old one.
+    """
+    row = conn.execute(
+        'SELECT epoch, version, winners_version FROM year_content_versions WHERE year = ?',
+        (year,),
+    ).fetchone()
+    return (row[0], row[1], row[2]) if row else (0, 0, 0)
+
+
+def backfill_auth_expiries(cur):
+    """Fill integer expiries for session/reset rows that only carry the text column.
+
+    Covers databases created before expires_at_epoch existed and rows restored
+    from older admin-state exports.
+    """
+    for table in ('admin_sessions', 'admin_password_resets'):
+        cur.execute(
+            f'''
+            UPDATE {table}
+            SET expires_at_epoch = CAST(strftime('%s', expires_at) AS INTEGER)
+            WHERE expires_at_epoch IS NULL
+            '''
+        )
+
+
+def rebuild_audit_action_counts(cur):
+    """Recompute per-month action counters from admin_audit_logs."""
+    cur.execute('DELETE FROM admin_audit_action_counts')
+    cur.execute(
+        '''
+        INSERT INTO admin_audit_action_counts(created_month, action, count)
+        SELECT substr(created_at, 1, 7), action, COUNT(*)
+        FROM admin_audit_logs
+        GROUP BY substr(created_at, 1, 7), action
+        '''
+    )
+
+
+def init_db(path=None):
+    conn = connect(path=path)
     cur = conn.cursor()
+    has_user_scores = bool(
+        cur.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'user_scores'"
+        ).fetchone()
+    )
+    has_audit_counts = bool(
+        cur.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'admin_audit_action_counts'"
+        ).fetchone()
+    )
 
     cur.executescript(
         '''
@@ -36,6 +229,7 @@ def init_db():
           title TEXT NOT NULL,
           external_id TEXT
         );
+        CREATE INDEX IF NOT EXISTS idx_films_title ON films(title);
 
         CREATE TABLE IF NOT EXISTS film_years (
           year INTEGER NOT NULL REFERENCES years(year) ON DELETE CASCADE,
@@ -79,6 +273,30 @@ def init_db():
           PRIMARY KEY(user_key, year, category_id)
         );
 
+        CREATE TABLE IF NOT EXISTS user_write_seqs (
+          user_key TEXT NOT NULL,
+          client_id TEXT NOT NULL,
+          target TEXT NOT NULL,
+          last_seq INTEGER NOT NULL,
+          updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+          PRIMARY KEY(user_key, client_id, target)
+        );
+
+        CREATE TABLE IF NOT EXISTS user_scores (
+          year INTEGER NOT NULL REFERENCES years(year) ON DELETE CASCADE,
+          user_key TEXT NOT NULL,
+          correct INTEGER NOT NULL DEFAULT 0,
+          decided INTEGER NOT NULL DEFAULT 0,
+          PRIMARY KEY(year, user_key)
+        );
+
+        CREATE TABLE IF NOT EXISTS user_score_histogram (
+          year INTEGER NOT NULL REFERENCES years(year) ON DELETE CASCADE,
+          correct INTEGER NOT NULL,
+          users INTEGER NOT NULL DEFAULT 0,
+          PRIMARY KEY(year, correct)
+        );
+
         CREATE TABLE IF NOT EXISTS category_winners (
           year INTEGER NOT NULL REFERENCES years(year) ON DELETE CASCADE,
           category_id INTEGER NOT NULL REFERENCES categories(id) ON DELETE CASCADE,
@@ -87,6 +305,21 @@ def init_db():
           PRIMARY KEY(year, category_id)
         );
 
+        CREATE TABLE IF NOT EXISTS live_events (
+          id INTEGER PRIMARY KEY AUTOINCREMENT,
+          year INTEGER NOT NULL,
+          kind TEXT NOT NULL,
+          payload TEXT NOT NULL,
+          created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE TABLE IF NOT EXISTS year_content_versions (
+          year INTEGER PRIMARY KEY REFERENCES years(year) ON DELETE CASCADE,
+          version INTEGER NOT NULL DEFAULT 0,
+          winners_version INTEGER NOT NULL DEFAULT 0,
+          epoch INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER))
+        );
+
         CREATE TABLE IF NOT EXISTS admin_watch_links (
           year INTEGER NOT NULL REFERENCES years(year) ON DELETE CASCADE,
           film_id TEXT NOT NULL REFERENCES films(id) ON DELETE CASCADE,
@@ -160,6 +393,7 @@ def init_db():
           user_id INTEGER NOT NULL REFERENCES admin_users(id) ON DELETE CASCADE,
           csrf_token TEXT NOT NULL DEFAULT '',
           expires_at TEXT NOT NULL,
+          expires_at_epoch INTEGER,
           created_at TEXT DEFAULT CURRENT_TIMESTAMP
         );
 
@@ -167,6 +401,7 @@ def init_db():
           token_hash TEXT PRIMARY KEY,
           user_id INTEGER NOT NULL REFERENCES admin_users(id) ON DELETE CASCADE,
           expires_at TEXT NOT NULL,
+          expires_at_epoch INTEGER,
           used_at TEXT,
           created_at TEXT DEFAULT CURRENT_TIMESTAMP
         );
@@ -183,6 +418,42 @@ def init_db():
           created_at TEXT DEFAULT CURRENT_TIMESTAMP
         );
 
+        CREATE TABLE IF NOT EXISTS admin_audit_action_counts (
+          created_month TEXT NOT NULL,
+          action TEXT NOT NULL,
+          count INTEGER NOT NULL DEFAULT 0,
+          PRIMARY KEY(created_month, action)
+        );
+
+        CREATE TABLE IF NOT EXISTS watch_link_cache (
+          title_key TEXT PRIMARY KEY,
+          url TEXT,
+          fetched_at_epoch INTEGER NOT NULL,
+          expires_at_epoch INTEGER NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS watch_link_audits (
+          url TEXT PRIMARY KEY,
+          release_year INTEGER,
+          http_status INTEGER,
+          content_hash TEXT,
+          error TEXT,
+          checked_at_epoch INTEGER NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS poster_blobs (
+          year INTEGER NOT NULL REFERENCES years(year) ON DELETE CASCADE,
+          film_id TEXT NOT NULL REFERENCES films(id) ON DELETE CASCADE,
+          external_id TEXT NOT NULL,
+          sha256 TEXT NOT NULL,
+          source TEXT NOT NULL,
+          source_url TEXT,
+          updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+          PRIMARY KEY(year, film_id)
+        );
+        CREATE INDEX IF NOT EXISTS idx_poster_blobs_external_id ON poster_blobs(external_id, source);
+        CREATE INDEX IF NOT EXISTS idx_poster_blobs_sha256 ON poster_blobs(sha256);
+
         CREATE TABLE IF NOT EXISTS year_import_runs (
           id INTEGER PRIMARY KEY AUTOINCREMENT,
           year INTEGER NOT NULL,
@@ -193,6 +464,29 @@ def init_db():
           details TEXT DEFAULT '',
           imported_at TEXT DEFAULT CURRENT_TIMESTAMP
         );
+
+        CREATE TABLE IF NOT EXISTS scrape_runs (
+          id INTEGER PRIMARY KEY AUTOINCREMENT,
+          kind TEXT NOT NULL,
+          year INTEGER NOT NULL,
+          options TEXT DEFAULT '',
+          status TEXT NOT NULL,
+          started_at TEXT DEFAULT CURRENT_TIMESTAMP,
+          finished_at TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_scrape_runs_kind_year ON scrape_runs(kind, year, id);
+
+        CREATE TABLE IF NOT EXISTS scrape_items (
+          run_id INTEGER NOT NULL REFERENCES scrape_runs(id) ON DELETE CASCADE,
+          film_id TEXT NOT NULL,
+          status TEXT NOT NULL,
+          attempts INTEGER NOT NULL DEFAULT 0,
+          result TEXT,
+          last_error TEXT,
+          updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+          PRIMARY KEY(run_id, film_id)
+        );
+        CREATE INDEX IF NOT EXISTS idx_scrape_items_run_status ON scrape_items(run_id, status);
         '''
     )
 
@@ -215,6 +509,14 @@ def init_db():
         WHERE external_id IS NULL OR external_id = ''
         '''
     )
+    cur.execute(
+        '''
+        CREATE INDEX IF NOT EXISTS idx_user_picks_year_category
+        ON user_picks(year, category_id, film_id)
+        '''
+    )
+    if not has_user_scores:
+        rebuild_user_scores(cur)
     # Repair legacy admin sessions created before CSRF tokens were enforced.
     cur.execute(
         '''
@@ -236,6 +538,23 @@ def init_db():
     except sqlite3.OperationalError:
         pass
 
+    # Batch seqs used to be one high-water mark per client; they only dedupe retries, so start over.
+    seq_cols = [r[1] for r in cur.execute('PRAGMA table_info(user_write_seqs)').fetchall()]
+    if seq_cols and 'target' not in seq_cols:
+        cur.executescript(
+            '''
+            DROP TABLE IF EXISTS user_write_seqs;
+            CREATE TABLE IF NOT EXISTS user_write_seqs (
+              user_key TEXT NOT NULL,
+              client_id TEXT NOT NULL,
+              target TEXT NOT NULL,
+              last_seq INTEGER NOT NULL,
+              updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+              PRIMARY KEY(user_key, client_id, target)
+            );
+            '''
+        )
+
     reset_cols = [r[1] for r in cur.execute('PRAGMA table_info(admin_password_resets)').fetchall()]
     if reset_cols and 'token_hash' not in reset_cols:
         cur.executescript(
@@ -245,11 +564,44 @@ def init_db():
               token_hash TEXT PRIMARY KEY,
               user_id INTEGER NOT NULL REFERENCES admin_users(id) ON DELETE CASCADE,
               expires_at TEXT NOT NULL,
+              expires_at_epoch INTEGER,
               used_at TEXT,
               created_at TEXT DEFAULT CURRENT_TIMESTAMP
             );
             '''
         )
 
+    for table in ('admin_sessions', 'admin_password_resets'):
+        try:
+            cur.execute(f'ALTER TABLE {table} ADD COLUMN expires_at_epoch INTEGER')
+        except sqlite3.OperationalError:
+            pass
+    backfill_auth_expiries(cur)
+    cur.execute(
+        '''
+        CREATE INDEX IF NOT EXISTS idx_admin_sessions_expires
+        ON admin_sessions(expires_at_epoch)
+        '''
+    )
+    cur.execute(
+        '''
+        CREATE INDEX IF NOT EXISTS idx_admin_password_resets_expires
+        ON admin_password_resets(expires_at_epoch)
+        '''
+    )
+    # Audit browsing filters by action/success/date and pages by id. The
+    # composite covers action alone; success on its own is not selective.
+    cur.executescript(
+        '''
+        DROP INDEX IF EXISTS idx_admin_audit_logs_action;
+        DROP INDEX IF EXISTS idx_admin_audit_logs_success;
+        CREATE INDEX IF NOT EXISTS idx_admin_audit_logs_action_success ON admin_audit_logs(action, success);
+        CREATE INDEX IF NOT EXISTS idx_admin_audit_logs_created_at ON admin_audit_logs(created_at);
+        '''
+    )
+    if not has_audit_counts:
+        rebuild_audit_action_counts(cur)
+    ensure_content_versions(cur)
+
     conn.commit()
     conn.close()
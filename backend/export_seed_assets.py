@@ -5,6 +5,9 @@ import shutil
 import sqlite3
 from pathlib import Path
 
+from db import init_db
+from poster_store import BLOB_DIR_NAME, sync_year_files
+
 TABLES = [
     'admin_watch_links',
     'admin_watch_labels',
@@ -14,6 +17,7 @@ TABLES = [
     'admin_event_modes',
     'admin_voting_locks',
     'category_winners',
+    'poster_blobs',
 ]
 
 
@@ -23,11 +27,13 @@ def _table_columns(cur, table):
 
 
 def _copy_tree(src: Path, dst: Path):
-    if not src.exists():
+    if not (src / BLOB_DIR_NAME).exists():
         return
     if dst.exists():
         shutil.rmtree(dst)
-    shutil.copytree(src, dst)
+    # Only the blob store ships: year folders are re-linked from poster_blobs
+    # and packs rebuilt from them on import.
+    shutil.copytree(src / BLOB_DIR_NAME, dst / BLOB_DIR_NAME, ignore=shutil.ignore_patterns('*.tmp*'))
 
 
 def main():
@@ -45,9 +51,13 @@ def main():
     poster_src = Path(args.poster_src)
     poster_out = Path(args.poster_out)
 
+    init_db(db_path)
     conn = sqlite3.connect(db_path)
     conn.row_factory = sqlite3.Row
     cur = conn.cursor()
+    # Older caches may hold year files that were never hashed into the store.
+    sync_year_files(cur, poster_src)
+    conn.commit()
 
     years = sorted(
         r['year'] for r in cur.execute('SELECT DISTINCT year FROM film_years ORDER BY year').fetchall()
@@ -0,0 +1,367 @@
+import gzip
+import hashlib
+import http.client
+import json
+import os
+import random
+import threading
+import time
+import zlib
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit
+
+BROWSER_USER_AGENT = (
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) '
+    'AppleWebKit/537.36 (KHTML, like Gecko) '
+    'Chrome/122.0.0.0 Safari/537.36'
+)
+HTML_HEADERS = {
+    'User-Agent': BROWSER_USER_AGENT,
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+}
+IMAGE_HEADERS = {
+    'User-Agent': BROWSER_USER_AGENT,
+    'Accept': 'image/avif,image/webp,image/apng,image/*,*/*;q=0.8',
+    'Referer': 'https://www.imdb.com/',
+}
+FETCH_MAX_REDIRECTS = 5
+FETCH_MAX_IDLE_PER_HOST = 8
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+RETRY_BASE_SECONDS = 0.5
+RETRY_MAX_SECONDS = 8.0
+HTTP_CACHE_ROOT = Path(__file__).resolve().parent.parent / 'data' / 'http_cache'
+HTTP_CACHE_MAX_AGE_HOURS = 24
+HTTP_CACHE_KEEP_DAYS = float(os.getenv('OSCAR_HTTP_CACHE_KEEP_DAYS', '30'))
+HTTP_CACHE_MAX_BYTES = int(float(os.getenv('OSCAR_HTTP_CACHE_MAX_MB', '512')) * 1024 * 1024)
+
+
+class FetchError(Exception):
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class OfflineMiss(FetchError):
+    """Raised in offline mode for a URL the response cache has never stored."""
+
+
+class CachedResponse:
+    __slots__ = ('final_url', 'body', 'etag', 'last_modified', 'stored_at')
+
+    def __init__(self, final_url, body, etag, last_modified, stored_at):
+        self.final_url = final_url
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at
+
+
+class ResponseCache:
+    """Successful scraper responses on disk, keyed by request URL.
+
+    Each entry is one file: a JSON header line (final URL after redirects,
+    ETag, Last-Modified) followed by the decoded body; the file's mtime is
+    when it was last fetched or revalidated. Entries younger than max_age
+    are used as is, older ones are revalidated with a conditional request.
+    In offline mode only stored entries are served, whatever their age.
+    prune() bounds the directory by entry age and total size.
+    """
+
+    def __init__(self, root=HTTP_CACHE_ROOT, max_age=HTTP_CACHE_MAX_AGE_HOURS * 3600, offline=False):
+        self.root = Path(root)
+        self.max_age = max_age
+        self.offline = offline
+        self.stats = Counter()
+
+    def _path(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return self.root / key[:2] / f'{key}.resp'
+
+    def get(self, url):
+        path = self._path(url)
+        try:
+            with open(path, 'rb') as handle:
+                meta = json.loads(handle.readline())
+                body = handle.read()
+                stored_at = os.fstat(handle.fileno()).st_mtime
+        except (OSError, ValueError):
+            return None
+        return CachedResponse(meta['final_url'], body, meta.get('etag'), meta.get('last_modified'), stored_at)
+
+    def is_fresh(self, entry):
+        return time.time() - entry.stored_at < self.max_age
+
+    def put(self, url, final_url, body, response_headers):
+        path = self._path(url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {
+            'url': url,
+            'final_url': final_url,
+            'etag': response_headers.get('etag'),
+            'last_modified': response_headers.get('last-modified'),
+        }
+        tmp = path.with_name(f'{path.name}.tmp{os.getpid()}.{threading.get_ident()}')
+        with open(tmp, 'wb') as handle:
+            handle.write(json.dumps(meta, separators=(',', ':')).encode('utf-8') + b'\n')
+            handle.write(body)
+        os.replace(tmp, path)
+
+    def touch(self, url):
+        try:
+            os.utime(self._path(url))
+        except OSError:
+            pass
+
+    def prune(self, keep_seconds=HTTP_CACHE_KEEP_DAYS * 86400, max_bytes=HTTP_CACHE_MAX_BYTES):
+        """Delete entries not fetched or revalidated within keep_seconds, then the oldest until under max_bytes."""
+        if not self.root.is_dir():
+            return 0
+        cutoff = time.time() - keep_seconds
+        removed = 0
+        entries = []
+        # Temp files of interrupted writes only go by age; a fresh one may still be renamed.
+        for path in self.root.glob('*/*.resp*'):
+            try:
+                stat = path.stat()
+                if stat.st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+                elif path.suffix == '.resp':
+                    entries.append((stat.st_mtime, stat.st_size, path))
+            except OSError:
+                continue
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        self.stats['pruned'] += removed
+        return removed
+
+    def summary(self):
+        return ', '.join(
+            f'{name} {self.stats[name]}' for name in ('fresh', 'revalidated', 'stored', 'offline', 'pruned')
+        )
+
+
+class HttpFetcher:
+    """Keep-alive HTTP(S) client shared by the scrapers and the server.
+
+    Idle connections are pooled per host and handed to one thread at a
+    time. Bodies are requested gzip-compressed. Connection errors, 429 and
+    5xx responses are retried with jittered exponential backoff (honouring
+    Retry-After), and requests to one host are spaced at least
+    min_interval seconds apart across all threads.
+    """
+
+    def __init__(self, min_interval=0.0, retries=2, cache=None):
+        self.min_interval = min_interval
+        self.retries = retries
+        self.cache = cache
+        self._idle = {}
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def fetch(self, url, headers=None, timeout=10, retries=None):
+        """GET url following redirects; returns (final_url, body bytes). Raises FetchError on 4xx/5xx."""
+        retries = self.retries if retries is None else retries
+        headers = dict(headers or HTML_HEADERS)
+        cache = self.cache
+        cached = cache.get(url) if cache is not None else None
+        if cache is not None and cache.offline:
+            if cached is None:
+                raise OfflineMiss(f'Not in the response cache: {url}')
+            cache.stats['offline'] += 1
+            return cached.final_url, cached.body
+        if cached is not None:
+            if cache.is_fresh(cached):
+                cache.stats['fresh'] += 1
+                return cached.final_url, cached.body
+            if cached.etag:
+                headers['If-None-Match'] = cached.etag
+            if cached.last_modified:
+                headers['If-Modified-Since'] = cached.last_modified
+
+        final_url, status, response_headers, body = self._follow(url, headers, timeout, retries)
+        if status == 304 and cached is not None:
+            cache.touch(url)
+            cache.stats['revalidated'] += 1
+            return cached.final_url, cached.body
+        if status >= 400:
+            raise FetchError(f'HTTP Error {status} for {final_url}', status=status)
+        if cache is not None:
+            cache.put(url, final_url, body, response_headers)
+            cache.stats['stored'] += 1
+        return final_url, body
+
+    def _follow(self, url, headers, timeout, retries):
+        for _ in range(FETCH_MAX_REDIRECTS + 1):
+            status, response_headers, body = self._request_with_retries(url, headers, timeout, retries)
+            location = response_headers.get('location')
+            if status in (301, 302, 303, 307, 308) and location:
+                url = urljoin(url, location)
+                continue
+            return url, status, response_headers, body
+        raise FetchError(f'Too many redirects for {url}')
+
+    def fetch_html(self, url, timeout=10, retries=None):
+        return self.fetch(url, HTML_HEADERS, timeout, retries)[1].decode('utf-8', errors='ignore')
+
+    def fetch_bytes(self, url, timeout=10, headers=None, retries=None):
+        return self.fetch(url, headers or IMAGE_HEADERS, timeout, retries)[1]
+
+    def _request_with_retries(self, url, headers, timeout, retries):
+        attempt = 0
+        while True:
+            try:
+                status, response_headers, body = self._request(url, headers, timeout)
+            except (OSError, http.client.HTTPException) as exc:
+                if attempt >= retries:
+                    raise FetchError(f'{type(exc).__name__}: {exc} for {url}') from exc
+                retry_after = None
+            else:
+                if status not in RETRY_STATUSES or attempt >= retries:
+                    return status, response_headers, body
+                retry_after = response_headers.get('retry-after')
+            attempt += 1
+            time.sleep(self._backoff(attempt, retry_after))
+
+    @staticmethod
+    def _backoff(attempt, retry_after):
+        if retry_after and retry_after.isdigit():
+            return min(RETRY_MAX_SECONDS, float(retry_after))
+        delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** (attempt - 1))
+        return random.uniform(delay / 2, delay)
+
+    def _request(self, url, headers, timeout):
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise FetchError(f'Unsupported URL: {url}')
+        key = (parts.scheme, parts.hostname, parts.port)
+        path = parts.path or '/'
+        if parts.query:
+            path = f'{path}?{parts.query}'
+
+        request_headers = dict(headers)
+        request_headers['Accept-Encoding'] = 'gzip, deflate'
+        self._wait_for_slot(parts.hostname)
+        conn, reused = self._checkout(key, timeout)
+        try:
+            response, body = self._exchange(conn, path, request_headers)
+        except (ConnectionResetError, BrokenPipeError):
+            if not reused:
+                raise
+            # The server dropped an idle keep-alive connection; that is not a failed attempt.
+            conn, _ = self._checkout(key, timeout, fresh=True)
+            response, body = self._exchange(conn, path, request_headers)
+        response_headers = {name.lower(): value for name, value in response.getheaders()}
+        if response.will_close:
+            conn.close()
+        else:
+            self._checkin(key, conn)
+        return response.status, response_headers, _decode_body(body, response_headers.get('content-encoding', ''))
+
+    @staticmethod
+    def _exchange(conn, path, headers):
+        try:
+            conn.request('GET', path, headers=headers)
+            response = conn.getresponse()
+            return response, response.read()
+        except Exception:
+            conn.close()
+            raise
+
+    def _wait_for_slot(self, host):
+        if self.min_interval <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    def _checkout(self, key, timeout, fresh=False):
+        conn = None
+        if not fresh:
+            with self._lock:
+                idle = self._idle.get(key)
+                conn = idle.pop() if idle else None
+        if conn is None:
+            scheme, host, port = key
+            connection_class = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+            return connection_class(host, port, timeout=timeout), False
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        return conn, True
+
+    def _checkin(self, key, conn):
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < FETCH_MAX_IDLE_PER_HOST:
+                idle.append(conn)
+                return
+        conn.close()
+
+
+def _decode_body(body, content_encoding):
+    encoding = content_encoding.strip().lower()
+    if encoding == 'gzip':
+        return gzip.decompress(body)
+    if encoding == 'deflate':
+        try:
+            return zlib.decompress(body)
+        except zlib.error:
+            # Some servers send raw deflate without the zlib wrapper.
+            return zlib.decompress(body, -zlib.MAX_WBITS)
+    return body
+
+
+def add_cache_arguments(parser):
+    parser.add_argument(
+        '--cache-max-age',
+        type=float,
+        default=HTTP_CACHE_MAX_AGE_HOURS,
+        help='Hours a cached response is used without revalidating (0 always revalidates).',
+    )
+    parser.add_argument('--no-cache', action='store_true', help='Bypass the on-disk response cache.')
+    parser.add_argument('--offline', action='store_true', help='Replay cached responses only; no network.')
+
+
+def configure_cache(fetcher, args):
+    """Attach the on-disk cache according to add_cache_arguments() flags; returns it or None."""
+    if args.no_cache and not args.offline:
+        fetcher.cache = None
+    else:
+        fetcher.cache = ResponseCache(max_age=args.cache_max_age * 3600, offline=args.offline)
+        if not args.offline:
+            # Offline replays keep their snapshot intact.
+            fetcher.cache.prune()
+    return fetcher.cache
+
+
+def run_concurrently(func, items, workers):
+    """Call func(item) on a bounded thread pool; yield (item, result, error) as each finishes.
+
+    Callers keep SQLite writes in their own thread and only push the
+    network-bound part through here.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(func, item): item for item in items}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as exc:
+                yield futures[future], None, exc
+
+
+http_fetcher = HttpFetcher()
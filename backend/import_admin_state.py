@@ -4,6 +4,8 @@ import json
 import sqlite3
 from pathlib import Path
 
+from db import backfill_auth_expiries, bump_all_content_versions, rebuild_audit_action_counts
+
 TABLE_ORDER = [
     'admin_users',
     'admin_sessions',
@@ -51,6 +53,10 @@ def main():
         )
 
     cur.execute('PRAGMA foreign_keys = ON')
+    backfill_auth_expiries(cur)
+    rebuild_audit_action_counts(cur)
+    # Restored links, posters and banners change the public payloads.
+    bump_all_content_versions(cur)
     conn.commit()
     conn.close()
     print(f'Restored admin state from {in_path}')
@@ -1,10 +1,16 @@
 #!/usr/bin/env python3
 import argparse
 import json
+import os
 import shutil
 import sqlite3
 from pathlib import Path
 
+from db import bump_all_content_versions, init_db
+from poster_pack import build_stale_packs
+from poster_store import sync_year_files
+from scoring import rebuild_user_scores
+
 TABLES = [
     'admin_watch_links',
     'admin_watch_labels',
@@ -14,6 +20,7 @@ TABLES = [
     'admin_event_modes',
     'admin_voting_locks',
     'category_winners',
+    'poster_blobs',
 ]
 
 
@@ -28,7 +35,10 @@ def _copy_tree(src: Path, dst: Path):
             target.mkdir(parents=True, exist_ok=True)
         else:
             target.parent.mkdir(parents=True, exist_ok=True)
-            shutil.copy2(path, target)
+            # Year files are hard links into the blob store; replace, never write through them.
+            tmp = target.with_name(f'{target.name}.tmp{os.getpid()}')
+            shutil.copy2(path, tmp)
+            os.replace(tmp, target)
     return True
 
 
@@ -54,6 +64,9 @@ def main():
     payload = _load_payload(in_path)
     years = payload.get('meta', {}).get('years') or []
 
+    copied = _copy_tree(poster_src, poster_out)
+
+    init_db(db_path)
     conn = sqlite3.connect(db_path)
     cur = conn.cursor()
     cur.execute('PRAGMA foreign_keys = ON')
@@ -77,15 +90,26 @@ def main():
                 [tuple(row.get(c) for c in cols) for row in rows],
             )
 
+    # Link year folders to the imported blobs; seeds from before the blob
+    # store carry plain year folders, which are hashed in instead.
+    linked, adopted = sync_year_files(cur, poster_out)
+    conn.commit()
+    # Packs are rebuilt before the version bump so servers see the new poster digests.
+    rebuilt = build_stale_packs(poster_out)
+
+    # Imported winners change every user's score, so re-derive the rollups.
+    rebuild_user_scores(cur)
+    bump_all_content_versions(cur, winners=True)
     conn.commit()
     conn.close()
 
-    copied = _copy_tree(poster_src, poster_out)
     print(f'Imported seed asset JSON: {in_path}')
     if copied:
         print(f'Copied poster cache: {poster_src} -> {poster_out}')
     else:
         print(f'Poster cache source not found: {poster_src}')
+    print(f'Linked posters: {linked}, adopted: {adopted}')
+    print(f"Rebuilt poster packs: {', '.join(map(str, rebuilt)) or 'none'}")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,207 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+
+from db import connect
+
+LIVE_EVENTS_POLL_SECONDS = max(50, int(os.getenv('OSCAR_EVENTS_POLL_MS', '250'))) / 1000
+LIVE_EVENTS_HEARTBEAT_SECONDS = max(1, int(os.getenv('OSCAR_EVENTS_HEARTBEAT_SECONDS', '15')))
+LIVE_EVENTS_MAX_STREAMS = max(1, int(os.getenv('OSCAR_EVENTS_MAX_STREAMS', '500')))
+LIVE_EVENTS_BUFFER_SIZE = 1000
+LIVE_EVENTS_RETENTION_HOURS = 24
+LIVE_EVENTS_PRUNE_INTERVAL_SECONDS = 60 * 60
+
+
+def publish_event(cur, year, kind, data):
+    """Queue a live event; call inside the transaction of the write it describes.
+
+    Events are an outbox in SQLite, so every server process sees them once
+    the write commits, whichever process made it.
+    """
+    cur.execute(
+        'INSERT INTO live_events(year, kind, payload) VALUES(?, ?, ?)',
+        (year, kind, json.dumps(data, separators=(',', ':'))),
+    )
+
+
+class LiveEvent:
+    __slots__ = ('id', 'year', 'kind', 'payload')
+
+    def __init__(self, event_id, year, kind, payload):
+        self.id = event_id
+        self.year = year
+        self.kind = kind
+        self.payload = payload
+
+
+class EventBroker:
+    """Tails live_events on one thread and fans new rows out to SSE streams.
+
+    Recent events stay in a ring buffer so reconnecting clients can resume
+    from Last-Event-ID without touching the database. Anything older than
+    the buffer is reported as a gap and the client re-syncs.
+    """
+
+    def __init__(self):
+        self._events = deque(maxlen=LIVE_EVENTS_BUFFER_SIZE)
+        self._floor_id = 0
+        self._last_id = 0
+        self._streams = 0
+        self._cond = threading.Condition()
+        self._async_waiters = set()
+        self._wake = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    @property
+    def last_id(self):
+        return self._last_id
+
+    def start(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            conn = connect(check_same_thread=False)
+            rows = conn.execute(
+                '''
+                SELECT id, year, kind, payload
+                FROM live_events
+                ORDER BY id DESC
+                LIMIT ?
+                ''',
+                (LIVE_EVENTS_BUFFER_SIZE,),
+            ).fetchall()
+            rows.reverse()
+            max_row = conn.execute('SELECT COALESCE(MAX(id), 0) AS id FROM live_events').fetchone()
+            self._floor_id = rows[0]['id'] - 1 if rows else max_row['id']
+            self._last_id = self._floor_id
+            self._append(rows)
+            self._thread = threading.Thread(target=self._run, args=(conn,), name='live-events', daemon=True)
+            self._thread.start()
+
+    def notify(self):
+        """Poll now instead of waiting for the next tick (after a local commit)."""
+        self._wake.set()
+
+    def open_stream(self):
+        with self._cond:
+            if self._streams >= LIVE_EVENTS_MAX_STREAMS:
+                return False
+            self._streams += 1
+            return True
+
+    def close_stream(self):
+        with self._cond:
+            self._streams -= 1
+
+    def events_after(self, cursor, year, timeout):
+        """Wait up to timeout for events past cursor.
+
+        Returns (events for year, new cursor, gap). gap is True when the
+        client's cursor is outside the buffered window and it must re-sync.
+        """
+        with self._cond:
+            if cursor == self._last_id:
+                self._cond.wait(timeout)
+            return self._collect(cursor, year)
+
+    async def events_after_async(self, cursor, year, timeout):
+        """Coroutine flavour of events_after for the asyncio engine."""
+        with self._cond:
+            if cursor != self._last_id:
+                return self._collect(cursor, year)
+            waiter = asyncio.get_running_loop().create_future()
+            self._async_waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._cond:
+                self._async_waiters.discard(waiter)
+        with self._cond:
+            return self._collect(cursor, year)
+
+    def _collect(self, cursor, year):
+        if cursor < self._floor_id or cursor > self._last_id:
+            return [], self._last_id, True
+        events = []
+        for event in reversed(self._events):
+            if event.id <= cursor:
+                break
+            if event.year == year:
+                events.append(event)
+        events.reverse()
+        return events, self._last_id, False
+
+    def _append(self, rows):
+        if not rows:
+            return
+        with self._cond:
+            for row in rows:
+                if len(self._events) == self._events.maxlen:
+                    self._floor_id = self._events[0].id
+                self._events.append(LiveEvent(row['id'], row['year'], row['kind'], row['payload']))
+                self._last_id = row['id']
+            self._cond.notify_all()
+            waiters, self._async_waiters = self._async_waiters, set()
+        for waiter in waiters:
+            waiter.get_loop().call_soon_threadsafe(_wake_waiter, waiter)
+
+    def _prune(self, conn):
+        conn.execute(
+            "DELETE FROM live_events WHERE created_at < datetime('now', ?)",
+            (f'-{LIVE_EVENTS_RETENTION_HOURS} hours',),
+        )
+        conn.commit()
+
+    def _run(self, conn):
+        next_prune_at = 0
+        while True:
+            self._wake.wait(LIVE_EVENTS_POLL_SECONDS)
+            self._wake.clear()
+            try:
+                rows = conn.execute(
+                    '''
+                    SELECT id, year, kind, payload
+                    FROM live_events
+                    WHERE id > ?
+                    ORDER BY id
+                    LIMIT ?
+                    ''',
+                    (self._last_id, LIVE_EVENTS_BUFFER_SIZE),
+                ).fetchall()
+                self._append(rows)
+                if len(rows) == LIVE_EVENTS_BUFFER_SIZE:
+                    self._wake.set()
+                now_ts = time.time()
+                if now_ts >= next_prune_at:
+                    next_prune_at = now_ts + LIVE_EVENTS_PRUNE_INTERVAL_SECONDS
+                    self._prune(conn)
+            except sqlite3.Error:
+                conn.rollback()
+                time.sleep(LIVE_EVENTS_POLL_SECONDS)
+
+
+def _wake_waiter(waiter):
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+def format_events(events, cursor, gap):
+    """Encode one batch from events_after as SSE frames (b'' if empty)."""
+    chunks = []
+    if gap:
+        chunks.append(f'id: {cursor}\nevent: resync\ndata: {{}}\n\n')
+    for event in events:
+        chunks.append(f'id: {event.id}\nevent: {event.kind}\ndata: {event.payload}\n\n')
+    return ''.join(chunks).encode('utf-8')
+
+
+event_broker = EventBroker()
@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+import argparse
+import contextlib
+import fcntl
+import hashlib
+import io
+import json
+import mimetypes
+import mmap
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+POSTER_CACHE_ROOT = Path(__file__).resolve().parent.parent / 'data' / 'poster_cache'
+PACK_MAGIC = b'OSCPACK1'
+PACK_HEADER = struct.Struct('>8sI')
+PACK_RECHECK_SECONDS = 1.0
+# Thumbnails render 72 CSS px wide; these cover 1x to 3x screens plus the admin grid.
+POSTER_VARIANT_WIDTHS = tuple(
+    sorted({int(width) for width in os.getenv('OSCAR_POSTER_WIDTHS', '80,160,240').split(',') if width.strip()})
+)
+# Most compact first; negotiation takes the first one the client accepts.
+VARIANT_FORMATS = (
+    ('AVIF', 'image/avif', {'quality': 55}),
+    ('WEBP', 'image/webp', {'quality': 80, 'method': 6}),
+    ('JPEG', 'image/jpeg', {'quality': 82, 'optimize': True, 'progressive': True}),
+)
+
+
+def pack_path(year, root=POSTER_CACHE_ROOT):
+    return Path(root) / f'{year}.pack'
+
+
+def _source_files(source_dir):
+    return sorted(path for path in source_dir.glob('*.jpg') if path.is_file())
+
+
+def _signature(files):
+    return [[path.name, stat.st_size, stat.st_mtime_ns] for path, stat in ((p, p.stat()) for p in files)]
+
+
+def variant_config():
+    """Widths and formats this host can encode; packs built with others are stale."""
+    if Image is None:
+        return {'widths': [], 'formats': []}
+    Image.init()
+    return {
+        'widths': list(POSTER_VARIANT_WIDTHS),
+        'formats': [name for name, _, _ in VARIANT_FORMATS if name in Image.SAVE],
+    }
+
+
+@contextlib.contextmanager
+def _pack_lock(year, root):
+    # flock is per open file, so this serializes threads as well as processes.
+    root.mkdir(parents=True, exist_ok=True)
+    with open(root / f'{year}.pack.lock', 'a') as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        yield
+
+
+def _encode_variants(data, config):
+    """Downscaled copies of one poster as [width, content type, bytes] lists.
+
+    Widths at or above the original are skipped, as is any encoding that
+    comes out no smaller than the original file.
+    """
+    if not config['formats']:
+        return []
+    try:
+        with Image.open(io.BytesIO(data)) as source:
+            source.load()
+            image = source.convert('RGB')
+    except (OSError, ValueError):
+        return []
+    variants = []
+    for width in config['widths']:
+        if width >= image.width:
+            continue
+        height = max(1, round(image.height * width / image.width))
+        resized = image.resize((width, height), Image.LANCZOS)
+        for name, content_type, options in VARIANT_FORMATS:
+            if name not in config['formats']:
+                continue
+            buffer = io.BytesIO()
+            resized.save(buffer, name, **options)
+            encoded = buffer.getvalue()
+            if len(encoded) < len(data):
+                variants.append([width, content_type, encoded])
+    return variants
+
+
+def _previous_variants(target, config):
+    """Variant bytes from the current pack, keyed by source digest, so unchanged posters skip re-encoding."""
+    try:
+        with open(target, 'rb') as handle:
+            index, data_start = _read_index(handle)
+            if index.get('variant_config') != config:
+                return {}
+            reused = {}
+            for film_id, variants in index.get('variants', {}).items():
+                digest = index['films'][film_id][2]
+                encoded = []
+                for width, content_type, offset, length, _ in variants:
+                    handle.seek(data_start + offset)
+                    encoded.append([width, content_type, handle.read(length)])
+                reused[digest] = encoded
+            return reused
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+def build_pack(year, root=POSTER_CACHE_ROOT):
+    """Compile <root>/<year>/*.jpg into <root>/<year>.pack.
+
+    Layout: magic, index length, JSON index, then the image bytes back to
+    back. The index maps film id to [offset, length, digest, content type],
+    offsets relative to the end of the index. When Pillow is installed,
+    'variants' maps film id to downscaled copies as [width, content type,
+    offset, length, digest]. The pack is written to a temp file and
+    renamed, so readers never see a partial pack. Builds of one year hold
+    <root>/<year>.pack.lock, so the last build to finish has read the
+    latest source files.
+    """
+    root = Path(root)
+    with _pack_lock(year, root):
+        return _build_pack(year, root)
+
+
+def _build_pack(year, root):
+    source_dir = root / str(year)
+    target = pack_path(year, root)
+    files = _source_files(source_dir) if source_dir.is_dir() else []
+    if not files:
+        target.unlink(missing_ok=True)
+        return 0
+
+    config = variant_config()
+    previous = _previous_variants(target, config)
+    films = {}
+    variants = {}
+    blobs = []
+    offset = 0
+    for path in files:
+        data = path.read_bytes()
+        content_type = mimetypes.guess_type(path.name)[0] or 'image/jpeg'
+        digest = hashlib.sha256(data).hexdigest()[:20]
+        films[path.stem] = [offset, len(data), digest, content_type]
+        blobs.append(data)
+        offset += len(data)
+        encoded = previous[digest] if digest in previous else _encode_variants(data, config)
+        if encoded:
+            variants[path.stem] = []
+            for width, variant_type, variant_data in encoded:
+                variant_digest = hashlib.sha256(variant_data).hexdigest()[:20]
+                variants[path.stem].append([width, variant_type, offset, len(variant_data), variant_digest])
+                blobs.append(variant_data)
+                offset += len(variant_data)
+    index = json.dumps(
+        {
+            'year': year,
+            'films': films,
+            'variants': variants,
+            'variant_config': config,
+            'source': _signature(files),
+        },
+        separators=(',', ':'),
+    ).encode('utf-8')
+
+    tmp = target.with_name(f'{target.name}.tmp{os.getpid()}.{threading.get_ident()}')
+    with open(tmp, 'wb') as handle:
+        handle.write(PACK_HEADER.pack(PACK_MAGIC, len(index)))
+        handle.write(index)
+        for data in blobs:
+            handle.write(data)
+    os.replace(tmp, target)
+    return len(films)
+
+
+def _read_index(handle):
+    magic, index_len = PACK_HEADER.unpack(handle.read(PACK_HEADER.size))
+    if magic != PACK_MAGIC:
+        raise ValueError('not a poster pack')
+    return json.loads(handle.read(index_len)), PACK_HEADER.size + index_len
+
+
+def build_stale_packs(root=POSTER_CACHE_ROOT):
+    """Rebuild packs whose source folder changed since they were built."""
+    root = Path(root)
+    if not root.is_dir():
+        return []
+    rebuilt = []
+    for source_dir in sorted(root.iterdir()):
+        if not source_dir.is_dir() or not source_dir.name.isdigit():
+            continue
+        year = int(source_dir.name)
+        target = pack_path(year, root)
+        try:
+            with open(target, 'rb') as handle:
+                index, _ = _read_index(handle)
+            stale = (
+                index.get('source') != _signature(_source_files(source_dir))
+                or index.get('variant_config') != variant_config()
+            )
+        except (OSError, ValueError):
+            stale = True
+        if stale:
+            build_pack(year, root)
+            rebuilt.append(year)
+    return rebuilt
+
+
+class PosterEntry:
+    __slots__ = ('offset', 'length', 'digest', 'etag', 'content_type', 'width', 'variants')
+
+    def __init__(self, offset, length, digest, content_type, width=None, variants=()):
+        self.offset = offset
+        self.length = length
+        self.digest = digest
+        self.etag = f'"poster-{digest}"'
+        self.content_type = content_type
+        self.width = width
+        self.variants = variants
+
+    def negotiate(self, width, accept):
+        """Pick the smallest variant at least width wide in a format the client accepts.
+
+        Without a width, or when no variant is wide enough, the original is served.
+        """
+        if not width or not self.variants:
+            return self
+        accepted = _accepted_types(accept)
+        for variant in self.variants:
+            if variant.width >= width and variant.content_type in accepted:
+                return variant
+        return self
+
+
+def _accepted_types(header):
+    accepted = {'image/jpeg'}
+    for part in (header or '').split(','):
+        media_type, _, params = part.strip().partition(';')
+        media_type = media_type.strip().lower()
+        if not media_type:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(media_type)
+    return accepted
+
+
+class PosterPack:
+    """One year's pack, memory-mapped read-only.
+
+    file stays open for socket.sendfile; view() serves engines without a
+    real socket.
+    """
+
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        index, data_start = _read_index(self.file)
+        stat = os.fstat(self.file.fileno())
+        self.identity = (stat.st_ino, stat.st_mtime_ns)
+        self._map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        variants = index.get('variants', {})
+        self.entries = {
+            film_id: PosterEntry(
+                data_start + offset,
+                length,
+                digest,
+                content_type,
+                variants=self._variant_entries(data_start, variants.get(film_id, ())),
+            )
+            for film_id, (offset, length, digest, content_type) in index['films'].items()
+        }
+
+    @staticmethod
+    def _variant_entries(data_start, variants):
+        # Ordered by width, then by format preference, so negotiate() can stop at the first fit.
+        formats = [content_type for _, content_type, _ in VARIANT_FORMATS]
+        return tuple(
+            PosterEntry(data_start + offset, length, digest, content_type, width=width)
+            for width, content_type, offset, length, digest in sorted(
+                variants, key=lambda variant: (variant[0], formats.index(variant[1]))
+            )
+        )
+
+    def view(self, offset, length):
+        return memoryview(self._map)[offset:offset + length]
+
+
+class PosterPacks:
+    """Per-process registry of mapped packs, swapped when a pack is rebuilt.
+
+    Each year's pack file is re-checked at most once per
+    PACK_RECHECK_SECONDS, so a poster request normally touches no file
+    at all. Only years that have a pack are kept.
+    """
+
+    def __init__(self, root=POSTER_CACHE_ROOT):
+        self.root = Path(root)
+        self._packs = {}
+        self._checked_at = {}
+        self._lock = threading.Lock()
+
+    def get(self, year):
+        now = time.monotonic()
+        if now - self._checked_at.get(year, float('-inf')) < PACK_RECHECK_SECONDS:
+            return self._packs.get(year)
+        with self._lock:
+            current = self._packs.get(year)
+            try:
+                stat = os.stat(pack_path(year, self.root))
+            except OSError:
+                # Misses aren't remembered: the year comes from the request.
+                self._packs.pop(year, None)
+                self._checked_at.pop(year, None)
+                return None
+            self._checked_at[year] = now
+            if current is None or current.identity != (stat.st_ino, stat.st_mtime_ns):
+                try:
+                    current = PosterPack(pack_path(year, self.root))
+                except (OSError, ValueError):
+                    current = None
+                # Replaced packs close once in-flight responses drop them.
+                self._packs[year] = current
+            return current
+
+    def refresh(self, year):
+        self._checked_at.pop(year, None)
+        return self.get(year)
+
+
+poster_packs = PosterPacks()
+
+
+class PackBuilder:
+    """Rebuilds packs on a background thread instead of the request path.
+
+    schedule() marks a year stale and returns at once. Years scheduled
+    again while their build runs are built once more afterwards, so no
+    edit is missed. on_built(year) runs after each rebuild.
+    """
+
+    def __init__(self, root=POSTER_CACHE_ROOT):
+        self.root = Path(root)
+        self.on_built = None
+        self._pending = {}
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def schedule(self, year):
+        with self._cond:
+            self._pending[year] = None
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='poster-pack-builder', daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                year = next(iter(self._pending))
+                del self._pending[year]
+            try:
+                build_pack(year, self.root)
+                poster_packs.refresh(year)
+                if self.on_built is not None:
+                    self.on_built(year)
+            except Exception as exc:
+                print(f'Poster pack build for {year} failed: {exc}', flush=True)
+
+
+pack_builder = PackBuilder()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile cached poster images into per-year pack files.')
+    parser.add_argument('--year', type=int, help='Rebuild one year (default: every stale year).')
+    parser.add_argument('--root', default=str(POSTER_CACHE_ROOT))
+    args = parser.parse_args()
+
+    if args.year is not None:
+        count = build_pack(args.year, args.root)
+        print(f'Packed {count} posters for {args.year}')
+    else:
+        years = build_stale_packs(args.root)
+        print(f"Rebuilt packs: {', '.join(map(str, years)) or 'none'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+import argparse
+import hashlib
+import os
+import shutil
+import threading
+from pathlib import Path
+
+from db import connect, init_db
+from poster_pack import POSTER_CACHE_ROOT
+
+BLOB_DIR_NAME = 'blobs'
+
+
+def blob_path(sha256, root=POSTER_CACHE_ROOT):
+    return Path(root) / BLOB_DIR_NAME / sha256[:2] / f'{sha256}.jpg'
+
+
+def year_path(year, film_id, root=POSTER_CACHE_ROOT):
+    return Path(root) / str(year) / f'{film_id}.jpg'
+
+
+def _tmp_path(target):
+    return target.with_name(f'{target.name}.tmp{os.getpid()}.{threading.get_ident()}')
+
+
+def _same_file(a, b):
+    try:
+        return os.path.samefile(a, b)
+    except OSError:
+        return False
+
+
+def _link(source, target):
+    """Atomically point target at source's bytes: a hard link, or a copy where links aren't supported."""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = _tmp_path(target)
+    try:
+        os.link(source, tmp)
+    except OSError:
+        shutil.copyfile(source, tmp)
+    os.replace(tmp, target)
+
+
+def put_blob(data, root=POSTER_CACHE_ROOT):
+    """Store image bytes under their SHA-256 and return the digest; existing blobs are left as is."""
+    sha256 = hashlib.sha256(data).hexdigest()
+    target = blob_path(sha256, root)
+    if not target.exists():
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = _tmp_path(target)
+        tmp.write_bytes(data)
+        os.replace(tmp, target)
+    return sha256
+
+
+def link_poster(year, film_id, sha256, root=POSTER_CACHE_ROOT):
+    """Expose a blob as <root>/<year>/<film_id>.jpg, the layout poster packs are built from."""
+    source = blob_path(sha256, root)
+    target = year_path(year, film_id, root)
+    if not _same_file(source, target):
+        _link(source, target)
+
+
+def record_poster(cur, year, film_id, sha256, source, source_url=None):
+    cur.execute(
+        '''
+        INSERT INTO poster_blobs(year, film_id, external_id, sha256, source, source_url)
+        SELECT ?, id, external_id, ?, ?, ? FROM films WHERE id = ?
+        ON CONFLICT(year, film_id) DO UPDATE SET
+          external_id=excluded.external_id,
+          sha256=excluded.sha256,
+          source=excluded.source,
+          source_url=excluded.source_url,
+          updated_at=CURRENT_TIMESTAMP
+        ''',
+        (year, sha256, source, source_url, film_id),
+    )
+
+
+def forget_poster(cur, year, film_id):
+    cur.execute('DELETE FROM poster_blobs WHERE year = ? AND film_id = ?', (year, film_id))
+
+
+def find_scraped_blob(cur, film_id, root=POSTER_CACHE_ROOT):
+    """Return (sha256, source_url) of a scraped poster stored for this film's external_id in any year."""
+    rows = cur.execute(
+        '''
+        SELECT pb.sha256, pb.source_url
+        FROM films f
+        JOIN poster_blobs pb ON pb.external_id = f.external_id
+        WHERE f.id = ? AND pb.source = 'lookup'
+        ORDER BY pb.year DESC
+        ''',
+        (film_id,),
+    ).fetchall()
+    for sha256, source_url in rows:
+        if blob_path(sha256, root).exists():
+            return sha256, source_url
+    return None
+
+
+def sync_year_files(cur, root=POSTER_CACHE_ROOT):
+    """Reconcile the per-year poster files with poster_blobs.
+
+    Mapped films get their year file re-linked to the blob. Year files with
+    no mapping (older caches, seeds exported before the blob store) are
+    hashed into the store and recorded, as admin or lookup posters depending
+    on which URL the film has. Returns (linked, adopted).
+    """
+    root = Path(root)
+    linked = 0
+    mapped = set()
+    for year, film_id, sha256 in cur.execute('SELECT year, film_id, sha256 FROM poster_blobs').fetchall():
+        source = blob_path(sha256, root)
+        target = year_path(year, film_id, root)
+        if source.exists():
+            if not _same_file(source, target):
+                _link(source, target)
+                linked += 1
+            mapped.add((year, film_id))
+        elif not target.exists():
+            forget_poster(cur, year, film_id)
+
+    adopted = 0
+    rows = cur.execute(
+        '''
+        SELECT fy.year, fy.film_id, ap.url AS admin_url, sp.url AS scraped_url
+        FROM film_years fy
+        LEFT JOIN admin_posters ap ON ap.year = fy.year AND ap.film_id = fy.film_id
+        LEFT JOIN scraped_posters sp ON sp.year = fy.year AND sp.film_id = fy.film_id
+        '''
+    ).fetchall()
+    for year, film_id, admin_url, scraped_url in rows:
+        target = year_path(year, film_id, root)
+        if (year, film_id) in mapped or not target.is_file():
+            continue
+        sha256 = hashlib.sha256(target.read_bytes()).hexdigest()
+        source = blob_path(sha256, root)
+        if source.exists():
+            _link(source, target)
+        else:
+            _link(target, source)
+        record_poster(cur, year, film_id, sha256, 'admin' if admin_url else 'lookup', admin_url or scraped_url)
+        adopted += 1
+    return linked, adopted
+
+
+def prune_blobs(cur, root=POSTER_CACHE_ROOT):
+    """Delete blobs that no mapping row and no year file refers to."""
+    blob_root = Path(root) / BLOB_DIR_NAME
+    if not blob_root.is_dir():
+        return 0
+    referenced = {row[0] for row in cur.execute('SELECT DISTINCT sha256 FROM poster_blobs').fetchall()}
+    pruned = 0
+    for path in blob_root.glob('*/*.jpg'):
+        if path.stem not in referenced and path.stat().st_nlink <= 1:
+            path.unlink(missing_ok=True)
+            pruned += 1
+    return pruned
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Reconcile the content-addressed poster store with the year folders.')
+    parser.add_argument('--root', default=str(POSTER_CACHE_ROOT))
+    args = parser.parse_args()
+
+    init_db()
+    conn = connect()
+    linked, adopted = sync_year_files(conn, args.root)
+    pruned = prune_blobs(conn, args.root)
+    conn.commit()
+    conn.close()
+    print(f'Linked: {linked}')
+    print(f'Adopted: {adopted}')
+    print(f'Pruned blobs: {pruned}')
+
+
+if __name__ == '__main__':
+    main()
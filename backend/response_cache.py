@@ -0,0 +1,106 @@
+import gzip
+import json
+import os
+import threading
+from collections import OrderedDict
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+RESPONSE_CACHE_MAX_ENTRIES = max(1, int(os.getenv('OSCAR_RESPONSE_CACHE_ENTRIES', '256')))
+# Small bodies gain nothing from compression once headers are counted.
+COMPRESS_MIN_BYTES = 1024
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 9
+
+
+def encode_json(payload):
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+
+class EncodedResponse:
+    """One JSON body with every content-coding variant computed up front."""
+
+    __slots__ = ('body', 'gzip_body', 'br_body', 'etag')
+
+    def __init__(self, payload, etag=None):
+        self.body = encode_json(payload)
+        self.etag = etag
+        self.gzip_body = None
+        self.br_body = None
+        if len(self.body) >= COMPRESS_MIN_BYTES:
+            self.gzip_body = gzip.compress(self.body, compresslevel=GZIP_LEVEL, mtime=0)
+            if brotli is not None:
+                self.br_body = brotli.compress(self.body, quality=BROTLI_QUALITY)
+
+    def negotiate(self, accept_encoding):
+        """Return (content_encoding, body) for an Accept-Encoding header."""
+        accepted = _accepted_encodings(accept_encoding)
+        if self.br_body is not None and 'br' in accepted:
+            return 'br', self.br_body
+        if self.gzip_body is not None and 'gzip' in accepted:
+            return 'gzip', self.gzip_body
+        return None, self.body
+
+
+def _accepted_encodings(header):
+    accepted = set()
+    for part in (header or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(coding)
+    if '*' in accepted:
+        accepted.update({'br', 'gzip'})
+    return accepted
+
+
+class ResponseCache:
+    """LRU of EncodedResponse objects, each tagged with the version it was built from.
+
+    A lookup with a different version is a miss, so callers never need to
+    invalidate entries explicitly.
+    """
+
+    def __init__(self, max_entries=RESPONSE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, version, response):
+        with self._lock:
+            self._entries[key] = (version, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return response
+
+
+response_cache = ResponseCache()
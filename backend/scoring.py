@@ -0,0 +1,302 @@
+import hashlib
+import math
+import threading
+import time
+
+LEADERBOARD_PERCENTILES = (50, 75, 90, 99)
+
+
+def _shift_histogram_bucket(cur, year, old_correct, new_correct):
+    # A bucket of None means the user is not ranked (no decided picks).
+    if old_correct == new_correct:
+        return
+    if old_correct is not None:
+        cur.execute(
+            '''
+            UPDATE user_score_histogram
+            SET users = users - 1
+            WHERE year = ? AND correct = ?
+            ''',
+            (year, old_correct),
+        )
+        cur.execute(
+            'DELETE FROM user_score_histogram WHERE year = ? AND correct = ? AND users <= 0',
+            (year, old_correct),
+        )
+    if new_correct is not None:
+        cur.execute(
+            '''
+            INSERT INTO user_score_histogram(year, correct, users)
+            VALUES(?, ?, 1)
+            ON CONFLICT(year, correct) DO UPDATE SET
+              users=users + 1
+            ''',
+            (year, new_correct),
+        )
+
+
+def _rebuild_histogram(cur, year):
+    cur.execute('DELETE FROM user_score_histogram WHERE year = ?', (year,))
+    cur.execute(
+        '''
+        INSERT INTO user_score_histogram(year, correct, users)
+        SELECT year, correct, COUNT(*)
+        FROM user_scores
+        WHERE year = ? AND decided > 0
+        GROUP BY correct
+        ''',
+        (year,),
+    )
+
+
+def record_pick_change(cur, year, user_key, category_id, old_film_id, new_film_id):
+    """Apply one user's pick change to user_scores and the score histogram.
+
+    Must run in the same transaction as the user_picks write.
+    """
+    if old_film_id == new_film_id:
+        return
+    winner_row = cur.execute(
+        'SELECT film_id FROM category_winners WHERE year = ? AND category_id = ?',
+        (year, category_id),
+    ).fetchone()
+    if not winner_row:
+        return
+    winner_film_id = winner_row[0]
+
+    decided_delta = (new_film_id is not None) - (old_film_id is not None)
+    correct_delta = (new_film_id == winner_film_id) - (old_film_id == winner_film_id)
+    if not decided_delta and not correct_delta:
+        return
+
+    score_row = cur.execute(
+        'SELECT correct, decided FROM user_scores WHERE year = ? AND user_key = ?',
+        (year, user_key),
+    ).fetchone()
+    correct, decided = (score_row[0], score_row[1]) if score_row else (0, 0)
+    new_correct = correct + correct_delta
+    new_decided = decided + decided_delta
+
+    cur.execute(
+        '''
+        INSERT INTO user_scores(year, user_key, correct, decided)
+        VALUES(?, ?, ?, ?)
+        ON CONFLICT(year, user_key) DO UPDATE SET
+          correct=excluded.correct,
+          decided=excluded.decided
+        ''',
+        (year, user_key, new_correct, new_decided),
+    )
+    _shift_histogram_bucket(
+        cur,
+        year,
+        correct if decided > 0 else None,
+        new_correct if new_decided > 0 else None,
+    )
+
+
+def record_winner_change(cur, year, category_id, old_film_id, new_film_id):
+    """Re-score every user with a pick in the category after a winner change.
+
+    Must run in the same transaction as the category_winners write.
+    """
+    if old_film_id == new_film_id:
+        return
+    cur.execute(
+        '''
+        INSERT OR IGNORE INTO user_scores(year, user_key)
+        SELECT year, user_key
+        FROM user_picks
+        WHERE year = ? AND category_id = ?
+        ''',
+        (year, category_id),
+    )
+    cur.execute(
+        '''
+        UPDATE user_scores
+        SET decided = decided + ?,
+            correct = correct + (
+              SELECT (up.film_id IS ?) - (up.film_id IS ?)
+              FROM user_picks up
+              WHERE up.year = user_scores.year
+                AND up.user_key = user_scores.user_key
+                AND up.category_id = ?
+            )
+        WHERE year = ?
+          AND user_key IN (
+            SELECT user_key FROM user_picks WHERE year = ? AND category_id = ?
+          )
+        ''',
+        (
+            (new_film_id is not None) - (old_film_id is not None),
+            new_film_id,
+            old_film_id,
+            category_id,
+            year,
+            year,
+            category_id,
+        ),
+    )
+    _rebuild_histogram(cur, year)
+
+
+def rebuild_user_scores(cur, year=None):
+    """Recompute user_scores and the histogram from user_picks and winners."""
+    if year is None:
+        years = [row[0] for row in cur.execute('SELECT year FROM years').fetchall()]
+    else:
+        years = [year]
+    for y in years:
+        cur.execute('DELETE FROM user_scores WHERE year = ?', (y,))
+        cur.execute(
+            '''
+            INSERT INTO user_scores(year, user_key, correct, decided)
+            SELECT
+              up.year,
+              up.user_key,
+              SUM(CASE WHEN up.film_id = cw.film_id THEN 1 ELSE 0 END),
+              COUNT(*)
+            FROM user_picks up
+            JOIN category_winners cw
+              ON cw.year = up.year
+             AND cw.category_id = up.category_id
+            WHERE up.year = ?
+            GROUP BY up.user_key
+            ''',
+            (y,),
+        )
+        _rebuild_histogram(cur, y)
+
+
+def score_standing(conn, year, user_key):
+    """Return correct count, rank, ties and percentile from the histogram."""
+    score_row = conn.execute(
+        'SELECT correct, decided FROM user_scores WHERE year = ? AND user_key = ?',
+        (year, user_key),
+    ).fetchone()
+    user_correct = score_row['correct'] if score_row else 0
+    is_ranked = bool(score_row and score_row['decided'] > 0)
+
+    buckets = conn.execute(
+        'SELECT correct, users FROM user_score_histogram WHERE year = ? AND users > 0',
+        (year,),
+    ).fetchall()
+    ranked_user_count = 0
+    above = 0
+    below = 0
+    same = 0
+    for bucket in buckets:
+        users = bucket['users']
+        ranked_user_count += users
+        if bucket['correct'] > user_correct:
+            above += users
+        elif bucket['correct'] < user_correct:
+            below += users
+        else:
+            same += users
+
+    total_others = ranked_user_count - (1 if is_ranked else 0)
+    return {
+        'userCorrectCount': user_correct,
+        'betterThanPercent': round((below / total_others) * 100) if total_others else 0,
+        'comparedUserCount': total_others,
+        'rankPosition': 1 + above if ranked_user_count else 1,
+        'rankedUserCount': ranked_user_count,
+        'tiedUserCount': same if ranked_user_count else 1,
+    }
+
+
+class LeaderboardSnapshot:
+    """Immutable ranking of every scored user for one year.
+
+    Rows are ordered best-first; ranks use competition ranking so tied users
+    share the same rank.
+    """
+
+    __slots__ = ('year', 'winners_version', 'winner_count', 'rows', 'index_by_user', 'cut_points', 'built_at')
+
+    def __init__(self, year, winners_version, winner_count, scored_users):
+        ranked = []
+        index_by_user = {}
+        rank = 0
+        previous_correct = None
+        for position, (user_key, correct) in enumerate(scored_users):
+            if correct != previous_correct:
+                rank = position + 1
+                previous_correct = correct
+            index_by_user[user_key] = position
+            ranked.append((rank, correct, _public_player_id(user_key)))
+
+        self.year = year
+        self.winners_version = winners_version
+        self.winner_count = winner_count
+        self.rows = tuple(ranked)
+        self.index_by_user = index_by_user
+        self.cut_points = tuple(
+            (percentile, self._score_at_percentile(percentile)) for percentile in LEADERBOARD_PERCENTILES
+        )
+        self.built_at = time.time()
+
+    def _score_at_percentile(self, percentile):
+        # Lowest score that still places a user at or above the percentile.
+        if not self.rows:
+            return 0
+        position = max(0, math.ceil(len(self.rows) * (100 - percentile) / 100) - 1)
+        return self.rows[position][1]
+
+    def page(self, offset, limit):
+        return self.rows[offset:offset + limit]
+
+    def around(self, index, radius):
+        start = max(0, index - radius)
+        return start, self.rows[start:index + radius + 1]
+
+
+def _public_player_id(user_key):
+    # userKey doubles as the write credential for picks, so never publish it.
+    return hashlib.sha256(user_key.encode('utf-8')).hexdigest()[:8]
+
+
+def _build_leaderboard(conn, year, winners_version):
+    winner_count = conn.execute(
+        'SELECT COUNT(*) AS count FROM category_winners WHERE year = ?',
+        (year,),
+    ).fetchone()['count']
+    scored_users = conn.execute(
+        '''
+        SELECT user_key, correct
+        FROM user_scores
+        WHERE year = ? AND decided > 0
+        ORDER BY correct DESC, user_key
+        ''',
+        (year,),
+    ).fetchall()
+    return LeaderboardSnapshot(
+        year,
+        winners_version,
+        winner_count,
+        [(row['user_key'], row['correct']) for row in scored_users],
+    )
+
+
+_leaderboards = {}
+_leaderboard_lock = threading.Lock()
+
+
+def leaderboard_snapshot(conn, year, winners_version):
+    """Return the snapshot for the year, rebuilding it when winners changed.
+
+    winners_version comes from year_content_versions, so a winner update made
+    by any process (or an import) retires the cached snapshot. Only years
+    in the years table are cached.
+    """
+    snapshot = _leaderboards.get(year)
+    if snapshot is not None and snapshot.winners_version == winners_version:
+        return snapshot
+    with _leaderboard_lock:
+        snapshot = _leaderboards.get(year)
+        if snapshot is None or snapshot.winners_version != winners_version:
+            snapshot = _build_leaderboard(conn, year, winners_version)
+            if conn.execute('SELECT 1 FROM years WHERE year = ?', (year,)).fetchone():
+                _leaderboards[year] = snapshot
+    return snapshot
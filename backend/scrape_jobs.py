@@ -0,0 +1,170 @@
+import json
+import sys
+import time
+
+SCRAPE_MAX_ATTEMPTS = 3
+
+
+def emit(event, **fields):
+    """Write one progress record as a JSON line on stdout."""
+    record = {'event': event, 'ts': round(time.time(), 3)}
+    record.update(fields)
+    sys.stdout.write(json.dumps(record, separators=(',', ':')) + '\n')
+    sys.stdout.flush()
+
+
+def add_job_arguments(parser):
+    parser.add_argument(
+        '--new-run',
+        action='store_true',
+        help='Start a new run instead of resuming the last unfinished one.',
+    )
+    parser.add_argument(
+        '--max-attempts',
+        type=int,
+        default=SCRAPE_MAX_ATTEMPTS,
+        help='Give up on a film after this many failed attempts.',
+    )
+
+
+class ScrapeJob:
+    """One scraper pass over a year's films, journaled in scrape_runs / scrape_items.
+
+    Every film gets an item row when the run is created; record() updates
+    it in the caller's transaction, so an item is marked done exactly when
+    its data write commits. Starting the same kind of scrape again with the
+    same options resumes the latest unfinished run: films added since get
+    items, pending items are picked up and failed ones retried, while
+    finished items are left alone. Different options (or --new-run) close
+    the unfinished run as 'superseded' and start a new one.
+    """
+
+    def __init__(self, conn, run_id, kind, year, max_attempts):
+        self.conn = conn
+        self.run_id = run_id
+        self.kind = kind
+        self.year = year
+        self.max_attempts = max_attempts
+
+    @classmethod
+    def start(
+        cls,
+        conn,
+        kind,
+        year,
+        film_ids,
+        skipped_ids=(),
+        options=None,
+        new_run=False,
+        max_attempts=SCRAPE_MAX_ATTEMPTS,
+    ):
+        """Resume the latest unfinished run for (kind, year), or create one over film_ids.
+
+        skipped_ids are journaled as 'skipped' up front (e.g. films that
+        already have data and no --force).
+        """
+        options = json.dumps(options or {}, sort_keys=True)
+        skipped_ids = set(skipped_ids)
+        items = [(film_id, 'skipped' if film_id in skipped_ids else 'pending') for film_id in film_ids]
+        row = conn.execute(
+            '''
+            SELECT id, options FROM scrape_runs
+            WHERE kind = ? AND year = ? AND status NOT IN ('done', 'superseded')
+            ORDER BY id DESC
+            LIMIT 1
+            ''',
+            (kind, year),
+        ).fetchone()
+        if row is not None and not new_run and row[1] == options:
+            run_id = row[0]
+            conn.execute("UPDATE scrape_runs SET status = 'running', finished_at = NULL WHERE id = ?", (run_id,))
+            # Films added to the year since the run was created.
+            added = conn.executemany(
+                'INSERT OR IGNORE INTO scrape_items(run_id, film_id, status) VALUES(?, ?, ?)',
+                [(run_id, film_id, status) for film_id, status in items],
+            ).rowcount
+            conn.commit()
+            job = cls(conn, run_id, kind, year, max_attempts)
+            emit('run', run=run_id, kind=kind, year=year, resumed=True, todo=len(job.todo()), added=added)
+            return job
+
+        conn.execute(
+            '''
+            UPDATE scrape_runs SET status = 'superseded', finished_at = CURRENT_TIMESTAMP
+            WHERE kind = ? AND year = ? AND status NOT IN ('done', 'superseded')
+            ''',
+            (kind, year),
+        )
+        cur = conn.execute(
+            "INSERT INTO scrape_runs(kind, year, options, status) VALUES(?, ?, ?, 'running')",
+            (kind, year, options),
+        )
+        run_id = cur.lastrowid
+        conn.executemany(
+            'INSERT INTO scrape_items(run_id, film_id, status) VALUES(?, ?, ?)',
+            [(run_id, film_id, status) for film_id, status in items],
+        )
+        conn.commit()
+        job = cls(conn, run_id, kind, year, max_attempts)
+        emit(
+            'run',
+            run=run_id,
+            kind=kind,
+            year=year,
+            resumed=False,
+            todo=len(job.todo()),
+            skipped=len(skipped_ids),
+            superseded=row[0] if row is not None else None,
+        )
+        return job
+
+    def todo(self):
+        """Film ids still to process: pending, or failed with attempts left."""
+        rows = self.conn.execute(
+            '''
+            SELECT film_id FROM scrape_items
+            WHERE run_id = ? AND (status = 'pending' OR (status = 'error' AND attempts < ?))
+            ''',
+            (self.run_id, self.max_attempts),
+        ).fetchall()
+        return {row[0] for row in rows}
+
+    def record(self, film_id, status, result=None, error=None, title=None):
+        """Journal a film's outcome; the caller commits it with the film's data."""
+        self.conn.execute(
+            '''
+            UPDATE scrape_items
+            SET status = ?, attempts = attempts + 1, result = ?, last_error = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE run_id = ? AND film_id = ?
+            ''',
+            (status, result, str(error) if error is not None else None, self.run_id, film_id),
+        )
+        fields = {'run': self.run_id, 'film': film_id, 'status': status}
+        if title is not None:
+            fields['title'] = title
+        if result is not None:
+            fields['result'] = result
+        if error is not None:
+            fields['error'] = str(error)
+        emit('item', **fields)
+
+    def finish(self, **extra):
+        """Close the run: 'done' once nothing is left to retry, else 'incomplete'.
+
+        Returns status counts; extra fields are added to the summary record.
+        """
+        counts = {
+            row[0]: row[1]
+            for row in self.conn.execute(
+                'SELECT status, COUNT(*) FROM scrape_items WHERE run_id = ? GROUP BY status',
+                (self.run_id,),
+            ).fetchall()
+        }
+        status = 'done' if not self.todo() else 'incomplete'
+        self.conn.execute(
+            'UPDATE scrape_runs SET status = ?, finished_at = CURRENT_TIMESTAMP WHERE id = ?',
+            (status, self.run_id),
+        )
+        self.conn.commit()
+        emit('summary', run=self.run_id, kind=self.kind, year=self.year, status=status, counts=counts, **extra)
+        return counts
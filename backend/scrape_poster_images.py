@@ -1,13 +1,15 @@
 import argparse
 import re
 import socket
-import time
 from html import unescape
 from pathlib import Path
 from urllib.parse import quote_plus, urljoin
-from urllib.request import Request, urlopen
 
-from db import connect, init_db
+from db import bump_content_version, connect, init_db
+from http_fetch import OfflineMiss, add_cache_arguments, configure_cache, http_fetcher, run_concurrently
+from poster_pack import build_pack
+from poster_store import find_scraped_blob, link_poster, prune_blobs, put_blob, record_poster
+from scrape_jobs import ScrapeJob, add_job_arguments, emit
 
 TITLE_DB_BASE = 'https://www.imdb.com'
 TITLE_DB_FIND = 'https://www.imdb.com/find/?q={query}&s=tt'
@@ -15,39 +17,6 @@ POSTER_CACHE_ROOT = Path(__file__).resolve().parent.parent / 'data' / 'poster_ca
 REQUIRED_HOSTS = ('www.imdb.com', 'm.media-amazon.com')
 
 
-def fetch_html(url, timeout=8):
-    req = Request(
-        url,
-        headers={
-            'User-Agent': (
-                'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) '
-                'AppleWebKit/537.36 (KHTML, like Gecko) '
-                'Chrome/122.0.0.0 Safari/537.36'
-            ),
-            'Accept-Language': 'en-US,en;q=0.9',
-        },
-    )
-    with urlopen(req, timeout=timeout) as response:
-        return response.read().decode('utf-8', errors='ignore')
-
-
-def download_binary(url, timeout=8):
-    req = Request(
-        url,
-        headers={
-            'User-Agent': (
-                'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) '
-                'AppleWebKit/537.36 (KHTML, like Gecko) '
-                'Chrome/122.0.0.0 Safari/537.36'
-            ),
-            'Accept': 'image/avif,image/webp,image/apng,image/*,*/*;q=0.8',
-            'Referer': 'https://www.imdb.com/',
-        },
-    )
-    with urlopen(req, timeout=timeout) as response:
-        return response.read()
-
-
 def extract_first_title_url(find_html):
     # Prefer canonical title links like /title/tt1234567/
     match = re.search(r'href="(/title/tt\d+/[^"]*)"', find_html)
@@ -72,12 +41,12 @@ def extract_poster_url(title_html):
 
 def scrape_first_title_db_poster(title, timeout=8):
     find_url = TITLE_DB_FIND.format(query=quote_plus(title))
-    find_html = fetch_html(find_url, timeout=timeout)
+    find_html = http_fetcher.fetch_html(find_url, timeout=timeout)
     title_url = extract_first_title_url(find_html)
     if not title_url:
         return None
 
-    title_html = fetch_html(title_url, timeout=timeout)
+    title_html = http_fetcher.fetch_html(title_url, timeout=timeout)
     poster_url = extract_poster_url(title_html)
     return poster_url
 
@@ -90,33 +59,61 @@ def _can_resolve(host):
         return False
 
 
-def cache_poster(year, film_id, poster_url, timeout=8):
-    data = download_binary(poster_url, timeout=timeout)
-    target = POSTER_CACHE_ROOT / str(year) / f'{film_id}.jpg'
-    target.parent.mkdir(parents=True, exist_ok=True)
-    target.write_bytes(data)
-    return target
+def fetch_poster(title, with_image, timeout=8):
+    """Network half of one film: (poster_url, image bytes, download error). Runs on the worker pool."""
+    poster_url = scrape_first_title_db_poster(title, timeout=timeout)
+    if not poster_url or not with_image:
+        return poster_url, None, None
+    try:
+        return poster_url, http_fetcher.fetch_bytes(poster_url, timeout=timeout), None
+    except OfflineMiss:
+        # An image missing from the replay cache says nothing about the poster.
+        raise
+    except Exception as exc:
+        return poster_url, None, exc
+
+
+def cache_poster(cur, year, film_id, poster_url, data):
+    sha256 = put_blob(data, POSTER_CACHE_ROOT)
+    link_poster(year, film_id, sha256, POSTER_CACHE_ROOT)
+    record_poster(cur, year, film_id, sha256, 'lookup', poster_url)
+    return sha256
+
+
+def record_scraped_url(cur, year, film_id, poster_url):
+    cur.execute(
+        '''
+        INSERT INTO scraped_posters(year, film_id, url, source)
+        VALUES(?, ?, ?, 'lookup')
+        ON CONFLICT(year, film_id) DO UPDATE SET
+          url=excluded.url,
+          source=excluded.source,
+          updated_at=CURRENT_TIMESTAMP
+        ''',
+        (year, film_id, poster_url),
+    )
 
 
 def main():
     parser = argparse.ArgumentParser(description='Scrape poster URLs by film title.')
     parser.add_argument('--year', type=int, default=2026)
-    parser.add_argument('--delay', type=float, default=0.4)
+    parser.add_argument('--delay', type=float, default=0.4, help='Minimum seconds between requests to one host.')
+    parser.add_argument('--workers', type=int, default=4)
     parser.add_argument('--timeout', type=float, default=8)
     parser.add_argument('--force', action='store_true')
+    add_cache_arguments(parser)
+    add_job_arguments(parser)
     args = parser.parse_args()
+    http_fetcher.min_interval = args.delay
+    cache = configure_cache(http_fetcher, args)
 
     init_db()
-    missing_hosts = [host for host in REQUIRED_HOSTS if not _can_resolve(host)]
+    missing_hosts = [] if args.offline else [host for host in REQUIRED_HOSTS if not _can_resolve(host)]
     if missing_hosts:
-        print(
-            'FATAL network preflight failed: cannot resolve required hosts: '
-            + ', '.join(missing_hosts),
-            flush=True,
-        )
-        print(
-            'No changes were made. Check DNS/network and rerun.',
-            flush=True,
+        emit(
+            'fatal',
+            error='network preflight failed: cannot resolve required hosts; no changes were made',
+            hosts=missing_hosts,
         )
         return 2
 
@@ -134,73 +131,95 @@ def main():
         (args.year,),
     ).fetchall()
 
-    updated = 0
-    missing = 0
-    skipped = 0
+    scraped = {
+        row['film_id']
+        for row in cur.execute('SELECT film_id FROM scraped_posters WHERE year = ?', (args.year,)).fetchall()
+    }
+    job = ScrapeJob.start(
+        conn,
+        'posters',
+        args.year,
+        [row['film_id'] for row in films],
+        skipped_ids=set() if args.force else scraped,
+        options={'force': args.force},
+        new_run=args.new_run,
+        max_attempts=args.max_attempts,
+    )
+    todo = job.todo()
 
+    # Cross-year reuse needs no network; the rest go to the fetch pool.
+    pending = []
     for row in films:
         year = row['year']
         film_id = row['film_id']
         title = row['title']
+        if film_id not in todo:
+            continue
 
-        existing = cur.execute(
-            'SELECT url FROM scraped_posters WHERE year = ? AND film_id = ?',
-            (year, film_id),
-        ).fetchone()
+        # The cached file of an overridden film holds the admin's image; leave it alone.
+        has_override = bool(
+            cur.execute(
+                'SELECT 1 FROM admin_posters WHERE year = ? AND film_id = ?',
+                (year, film_id),
+            ).fetchone()
+        )
 
-        if existing and not args.force:
-            skipped += 1
-            print(f'SKIP  {film_id} {title}', flush=True)
+        # A poster already scraped for the same external_id in another year needs no fetch.
+        blob = None if args.force else find_scraped_blob(cur, film_id, POSTER_CACHE_ROOT)
+        if blob:
+            sha256, poster_url = blob
+            if not has_override:
+                link_poster(year, film_id, sha256, POSTER_CACHE_ROOT)
+                record_poster(cur, year, film_id, sha256, 'lookup', poster_url)
+            if poster_url:
+                record_scraped_url(cur, year, film_id, poster_url)
+            bump_content_version(cur, year)
+            job.record(film_id, 'reused', result=sha256, title=title)
+            conn.commit()
             continue
 
-        try:
-            poster_url = scrape_first_title_db_poster(title, timeout=args.timeout)
-        except Exception as exc:
-            print(f'ERR   {film_id} {title}: {exc}', flush=True)
-            # Network/provider errors should not delete existing cached posters.
-            continue
+        pending.append((year, film_id, title, has_override))
 
-        if poster_url:
+    results = run_concurrently(
+        lambda film: fetch_poster(film[2], with_image=not film[3], timeout=args.timeout),
+        pending,
+        args.workers,
+    )
+    for (year, film_id, title, has_override), result, error in results:
+        poster_url, data, download_error = result or (None, None, None)
+        error = error or download_error
+        if error is None and poster_url:
             try:
-                cache_poster(year, film_id, poster_url, timeout=args.timeout)
-                cur.execute(
-                    '''
-                    INSERT INTO scraped_posters(year, film_id, url, source)
-                    VALUES(?, ?, ?, 'lookup')
-                    ON CONFLICT(year, film_id) DO UPDATE SET
-                      url=excluded.url,
-                      source=excluded.source,
-                      updated_at=CURRENT_TIMESTAMP
-                    ''',
-                    (year, film_id, poster_url),
-                )
-                updated += 1
-                print(f'OK    {film_id} {title} -> {poster_url[:90]}', flush=True)
+                if not has_override:
+                    cache_poster(cur, year, film_id, poster_url, data)
+                record_scraped_url(cur, year, film_id, poster_url)
+                bump_content_version(cur, year)
             except Exception as exc:
-                poster_url = None
-                print(f'ERR   {film_id} {title}: cache failed ({exc})', flush=True)
-
-        if not poster_url:
-            target = POSTER_CACHE_ROOT / str(year) / f'{film_id}.jpg'
-            if target.exists():
-                target.unlink()
-            cur.execute(
-                'DELETE FROM scraped_posters WHERE year = ? AND film_id = ?',
-                (year, film_id),
-            )
-            missing += 1
-            print(f'NONE  {film_id} {title}', flush=True)
-
+                conn.rollback()
+                error = exc
+        if error is not None:
+            # Failures are retried by the next run; nothing already cached is removed.
+            job.record(film_id, 'error', error=error, title=title)
+        elif poster_url:
+            job.record(film_id, 'ok', result=poster_url, title=title)
+        else:
+            # No match is journaled, not applied: an earlier poster stays in place.
+            job.record(film_id, 'none', title=title)
         conn.commit()
-        time.sleep(args.delay)
 
-    print('---', flush=True)
-    print(f'Updated: {updated}', flush=True)
-    print(f'Missing: {missing}', flush=True)
-    print(f'Skipped: {skipped}', flush=True)
+    packed = build_pack(args.year, POSTER_CACHE_ROOT)
+    # Catalogs rebuilt for this version pick up the new poster digests.
+    bump_content_version(cur, args.year)
+    conn.commit()
+    pruned = prune_blobs(cur, POSTER_CACHE_ROOT)
 
+    counts = job.finish(
+        packed=packed,
+        pruned_blobs=pruned,
+        http_cache=dict(cache.stats) if cache is not None else None,
+    )
     conn.close()
-    return 0
+    return 0 if not counts.get('error') else 1
 
 
 if __name__ == '__main__':
@@ -1,56 +1,9 @@
 import argparse
-import re
-import time
-from html import unescape
-from urllib.parse import quote_plus
-from urllib.request import Request, urlopen
 
-from db import connect, init_db
-
-WATCH_BASE = 'https://www.justwatch.com'
-WATCH_SEARCH = 'https://www.justwatch.com/us/search?q={query}'
-
-
-def fetch_html(url, timeout=10):
-    req = Request(
-        url,
-        headers={
-            'User-Agent': (
-                'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) '
-                'AppleWebKit/537.36 (KHTML, like Gecko) '
-                'Chrome/122.0.0.0 Safari/537.36'
-            ),
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-        },
-    )
-    with urlopen(req, timeout=timeout) as response:
-        return response.read().decode('utf-8', errors='ignore')
-
-
-def extract_first_result_url(search_html):
-    patterns = [
-        r'href="(/us/(?:movie|tv-show)/[^"#?]+)"',
-        r'"url":"(\\/us\\/(?:movie|tv-show)\\/[^"\\]+)"',
-        r'"fullPath":"(\\/us\\/(?:movie|tv-show)\\/[^"\\]+)"',
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, search_html)
-        if not match:
-            continue
-        path = unescape(match.group(1)).replace('\\/', '/')
-        if not path.startswith('/us/'):
-            continue
-        return f'{WATCH_BASE}{path}'
-
-    return None
-
-
-def scrape_first_watch_result(title, timeout=10):
-    url = WATCH_SEARCH.format(query=quote_plus(title))
-    html = fetch_html(url, timeout=timeout)
-    return extract_first_result_url(html)
+from db import bump_content_version, connect, init_db
+from http_fetch import add_cache_arguments, configure_cache, http_fetcher, run_concurrently
+from scrape_jobs import ScrapeJob, add_job_arguments
+from watch_links import scrape_first_watch_result, store_resolution
 
 
 def main():
@@ -58,10 +11,15 @@ def main():
         description='Scrape first watch-provider search result URL for each film and store as watch-link override.'
     )
     parser.add_argument('--year', type=int, default=2026)
-    parser.add_argument('--delay', type=float, default=0.35)
+    parser.add_argument('--delay', type=float, default=0.35, help='Minimum seconds between requests to one host.')
+    parser.add_argument('--workers', type=int, default=4)
     parser.add_argument('--timeout', type=float, default=10)
     parser.add_argument('--force', action='store_true')
+    add_cache_arguments(parser)
+    add_job_arguments(parser)
     args = parser.parse_args()
+    http_fetcher.min_interval = args.delay
+    cache = configure_cache(http_fetcher, args)
 
     init_db()
     conn = connect()
@@ -78,30 +36,36 @@ def main():
         (args.year,),
     ).fetchall()
 
-    updated = 0
-    skipped = 0
-    missing = 0
-
-    for row in films:
-        year = row['year']
-        film_id = row['film_id']
-        title = row['title']
+    overridden = {
+        row['film_id']
+        for row in cur.execute('SELECT film_id FROM admin_watch_links WHERE year = ?', (args.year,)).fetchall()
+    }
+    job = ScrapeJob.start(
+        conn,
+        'watch_links',
+        args.year,
+        [row['film_id'] for row in films],
+        skipped_ids=set() if args.force else overridden,
+        options={'force': args.force},
+        new_run=args.new_run,
+        max_attempts=args.max_attempts,
+    )
+    todo = job.todo()
+    pending = [(row['year'], row['film_id'], row['title']) for row in films if row['film_id'] in todo]
 
-        existing = cur.execute(
-            'SELECT url FROM admin_watch_links WHERE year = ? AND film_id = ?',
-            (year, film_id),
-        ).fetchone()
-        if existing and not args.force:
-            skipped += 1
-            print(f'SKIP  {film_id} {title} (has override)', flush=True)
+    results = run_concurrently(
+        lambda film: scrape_first_watch_result(film[2], timeout=args.timeout),
+        pending,
+        args.workers,
+    )
+    for (year, film_id, title), result_url, error in results:
+        if error is not None:
+            job.record(film_id, 'error', error=error, title=title)
+            conn.commit()
             continue
 
-        try:
-            result_url = scrape_first_watch_result(title, timeout=args.timeout)
-        except Exception as exc:
-            result_url = None
-            print(f'ERR   {film_id} {title}: {exc}', flush=True)
-
+        # Seeds the server's /where-to-watch cache, including misses.
+        store_resolution(cur, title, result_url)
         if result_url:
             cur.execute(
                 '''
@@ -113,21 +77,16 @@ def main():
                 ''',
                 (year, film_id, result_url),
             )
-            conn.commit()
-            updated += 1
-            print(f'OK    {film_id} {title} -> {result_url}', flush=True)
+            bump_content_version(cur, year)
+            job.record(film_id, 'ok', result=result_url, title=title)
         else:
-            missing += 1
-            print(f'NONE  {film_id} {title}', flush=True)
-
-        time.sleep(args.delay)
+            job.record(film_id, 'none', title=title)
+        conn.commit()
 
-    print('---', flush=True)
-    print(f'Updated: {updated}', flush=True)
-    print(f'Skipped: {skipped}', flush=True)
-    print(f'Missing: {missing}', flush=True)
+    counts = job.finish(http_cache=dict(cache.stats) if cache is not None else None)
     conn.close()
+    return 0 if not counts.get('error') else 1
 
 
 if __name__ == '__main__':
-    main()
+    raise SystemExit(main())
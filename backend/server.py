@@ -1,20 +1,51 @@
 import json
-import mimetypes
 import os
 import re
 import smtplib
+import sqlite3
 import hmac
 import hashlib
 import secrets
+import signal
+import sys
+import threading
 import time
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from datetime import date, timedelta
 from http import HTTPStatus
 from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from email.message import EmailMessage
 from urllib.parse import parse_qs, quote_plus, urlparse
-from urllib.request import Request, urlopen
 
-from db import connect, init_db
+from audit_log import audit_log
+from catalog import recent_year_catalog, warm_catalogs, year_catalog
+from db import (
+    DB_POOL_TIMEOUT_MS,
+    PoolExhausted,
+    bump_content_version,
+    connect,
+    content_version,
+    init_db,
+    pooled_connection,
+    read_transaction,
+    release_pooled_connection,
+)
+from http_fetch import http_fetcher
+from live_events import LIVE_EVENTS_HEARTBEAT_SECONDS, event_broker, format_events, publish_event
+from poster_pack import build_stale_packs, pack_builder, poster_packs
+from poster_store import forget_poster, link_poster, put_blob, record_poster, sync_year_files
+from response_cache import EncodedResponse, encode_json, response_cache
+from settings import settings_cache
+from supervisor import WORKER_GRACE_SECONDS, Supervisor, worker_ready_callback
+from watch_links import WATCH_SEARCH, resolve_watch_url, warm_watch_link_cache
+from write_queue import WriteQueueFull, group_writer
+from scoring import (
+    leaderboard_snapshot,
+    record_pick_change,
+    record_winner_change,
+    score_standing,
+)
 
 ROOT = Path(__file__).resolve().parent.parent
 WEB_ROOT = ROOT / 'web'
@@ -33,13 +64,26 @@ SMTP_PASS = os.getenv('OSCAR_SMTP_PASS', '').strip()
 SMTP_STARTTLS = os.getenv('OSCAR_SMTP_STARTTLS', '').lower() in {'1', 'true', 'yes'}
 ADMIN_SESSION_COOKIE = 'oscars_admin_session'
 ADMIN_SESSION_TTL_SECONDS = 60 * 60 * 24 * 14
+ADMIN_SESSION_CACHE_SECONDS = max(0, int(os.getenv('OSCAR_ADMIN_SESSION_CACHE_SECONDS', '30')))
+ADMIN_RESET_TTL_SECONDS = 60 * 60
 LOGIN_RATE_LIMIT_WINDOW_SECONDS = 15 * 60
 LOGIN_RATE_LIMIT_MAX_ATTEMPTS = 10
 LOGIN_LOCKOUT_SECONDS = 15 * 60
 RESET_RATE_LIMIT_WINDOW_SECONDS = 15 * 60
 RESET_RATE_LIMIT_MAX_ATTEMPTS = 5
 MAX_JSON_BODY_BYTES = 1024 * 1024
-AUDIT_LOG_RETENTION_DAYS = max(1, int(os.getenv('OSCAR_AUDIT_RETENTION_DAYS', '90')))
+SERVER_ENGINE = os.getenv('OSCAR_ENGINE', 'threading').strip().lower()
+SERVER_WORKERS = max(1, int(os.getenv('OSCAR_WORKERS', '1')))
+# Bump whenever the /api/nominees or /api/years payload changes shape or meaning
+# (2: content-hashed posterUrl), so clients don't keep old JSON on a 304.
+CONTENT_SCHEMA_VERSION = 2
+CONTENT_ETAG_SALT = hashlib.sha256(f'{CONTENT_SCHEMA_VERSION}:{DEFAULT_BANNER_TEXT}'.encode('utf-8')).hexdigest()[:8]
+USER_BATCH_MAX_MUTATIONS = 500
+USER_WRITE_SEQ_RETENTION_HOURS = 24
+USER_WRITE_ACK_TIMEOUT_SECONDS = 30
+LEADERBOARD_DEFAULT_LIMIT = 25
+LEADERBOARD_MAX_LIMIT = 100
+LEADERBOARD_AROUND_RADIUS = 5
 
 
 def slugify_title(title):
@@ -55,10 +99,40 @@ class OscarHandler(SimpleHTTPRequestHandler):
     _login_attempts_by_key = {}
     _login_lockouts = {}
     _reset_attempts_by_key = {}
+    # token -> (admin, cached_until); see _current_admin.
+    _admin_session_cache = {}
+    # Routes that block on outbound calls (JustWatch, SMTP, poster downloads).
+    outbound_io_routes = frozenset(
+        {
+            ('GET', '/where-to-watch'),
+            ('PUT', '/api/admin/poster'),
+            ('POST', '/api/admin-auth/request-reset'),
+            ('POST', '/api/contact'),
+        }
+    )
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, directory=str(WEB_ROOT), **kwargs)
 
+    def handle_one_request(self):
+        # Every DB touch in a request shares one pooled connection; hand it
+        # back once the response is written so idle keep-alive threads hold none.
+        self._request_admin = None
+        self._request_admin_resolved = False
+        try:
+            super().handle_one_request()
+        except PoolExhausted:
+            self.log_error('No database connection came free within %d ms', DB_POOL_TIMEOUT_MS)
+            self.close_connection = True
+            self._json(
+                {'ok': False, 'error': 'Server busy; retry shortly.'},
+                status=HTTPStatus.SERVICE_UNAVAILABLE,
+                extra_headers={'Retry-After': '1'},
+            )
+            self.wfile.flush()
+        finally:
+            release_pooled_connection()
+
     @staticmethod
     def _poster_cache_path(year, film_id):
         return POSTER_CACHE_ROOT / str(year) / f'{film_id}.jpg'
@@ -85,7 +159,7 @@ class OscarHandler(SimpleHTTPRequestHandler):
             return None
 
     def _json(self, payload, status=HTTPStatus.OK, extra_headers=None):
-        encoded = json.dumps(payload).encode('utf-8')
+        encoded = encode_json(payload)
         self.send_response(status)
         self.send_header('Content-Type', 'application/json; charset=utf-8')
         self.send_header('Content-Length', str(len(encoded)))
@@ -95,6 +169,39 @@ class OscarHandler(SimpleHTTPRequestHandler):
         self.end_headers()
         self.wfile.write(encoded)
 
+    def _send_encoded(self, response, status=HTTPStatus.OK):
+        encoding, body = response.negotiate(self.headers.get('Accept-Encoding', ''))
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Vary', 'Accept-Encoding')
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        if response.etag:
+            self.send_header('ETag', response.etag)
+            self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _etag_matches(self, etag):
+        header = self.headers.get('If-None-Match', '')
+        if not header:
+            return False
+        for candidate in header.split(','):
+            candidate = candidate.strip()
+            if candidate.startswith('W/'):
+                candidate = candidate[2:]
+            if candidate == '*' or candidate == etag:
+                return True
+        return False
+
+    def _not_modified(self, etag):
+        self.send_response(HTTPStatus.NOT_MODIFIED)
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Vary', 'Accept-Encoding')
+        self.end_headers()
+
     def _redirect(self, location, status=HTTPStatus.FOUND):
         self.send_response(status)
         self.send_header('Location', location)
@@ -136,23 +243,36 @@ class OscarHandler(SimpleHTTPRequestHandler):
             return False
 
     def _current_admin(self):
+        # Resolved once per request; every handler after _require_admin_api reuses it.
+        if not self._request_admin_resolved:
+            self._request_admin = self._resolve_admin_session()
+            self._request_admin_resolved = True
+        return self._request_admin
+
+    def _resolve_admin_session(self):
         token = self._parse_cookies().get(ADMIN_SESSION_COOKIE)
         if not token:
             return None
-        conn = connect()
+        # Sessions are cached briefly per process. Local logout/reset evicts at
+        # once; revocations from other processes land within the cache TTL.
+        now_ts = time.time()
+        cached = self._admin_session_cache.get(token)
+        if cached and cached[1] > now_ts:
+            return cached[0]
+        conn = pooled_connection()
         row = conn.execute(
             '''
-            SELECT au.id, au.email, s.csrf_token
+            SELECT au.id, au.email, s.csrf_token, s.expires_at_epoch
             FROM admin_sessions s
             JOIN admin_users au ON au.id = s.user_id
-            WHERE s.token = ? AND datetime(s.expires_at) > datetime('now')
+            WHERE s.token = ? AND s.expires_at_epoch > ?
             ''',
-            (token,),
+            (token, int(now_ts)),
         ).fetchone()
         if not row:
-            conn.close()
+            self._admin_session_cache.pop(token, None)
             return None
-        admin = dict(row)
+        admin = {'id': row['id'], 'email': row['email'], 'csrf_token': row['csrf_token']}
         if not (admin.get('csrf_token') or '').strip():
             new_csrf = secrets.token_urlsafe(24)
             conn.execute(
@@ -161,9 +281,15 @@ class OscarHandler(SimpleHTTPRequestHandler):
             )
             conn.commit()
             admin['csrf_token'] = new_csrf
-        conn.close()
+        self._admin_session_cache[token] = (admin, min(now_ts + ADMIN_SESSION_CACHE_SECONDS, row['expires_at_epoch']))
         return admin
 
+    @classmethod
+    def _evict_admin_sessions(cls, token=None, user_id=None):
+        for cached_token, (admin, _) in list(cls._admin_session_cache.items()):
+            if cached_token == token or (user_id is not None and admin['id'] == user_id):
+                cls._admin_session_cache.pop(cached_token, None)
+
     def _require_admin_api(self, require_csrf=False):
         admin = self._current_admin()
         if not admin:
@@ -261,55 +387,38 @@ class OscarHandler(SimpleHTTPRequestHandler):
         self._prune_admin_auth_artifacts()
         token = secrets.token_urlsafe(32)
         csrf_token = secrets.token_urlsafe(24)
-        conn = connect()
+        expires_ts = int(time.time()) + ADMIN_SESSION_TTL_SECONDS
+        conn = pooled_connection()
         conn.execute(
             '''
-            INSERT INTO admin_sessions(token, user_id, csrf_token, expires_at)
-            VALUES(?, ?, ?, datetime('now', '+14 days'))
+            INSERT INTO admin_sessions(token, user_id, csrf_token, expires_at, expires_at_epoch)
+            VALUES(?, ?, ?, datetime(?, 'unixepoch'), ?)
             ''',
-            (token, user_id, csrf_token),
+            (token, user_id, csrf_token, expires_ts, expires_ts),
         )
         conn.commit()
-        conn.close()
         return token, csrf_token
 
     def _prune_admin_auth_artifacts(self):
-        conn = connect()
-        conn.execute(
-            '''
-            DELETE FROM admin_sessions
-            WHERE datetime(expires_at) <= datetime('now')
-            '''
-        )
-        conn.execute(
-            '''
-            DELETE FROM admin_password_resets
-            WHERE used_at IS NOT NULL OR datetime(expires_at) <= datetime('now')
-            '''
-        )
-        conn.commit()
-        conn.close()
-
-    def _prune_admin_audit_logs(self):
-        conn = connect()
-        conn.execute(
-            '''
-            DELETE FROM admin_audit_logs
-            WHERE datetime(created_at) < datetime('now', ?)
-            ''',
-            (f'-{AUDIT_LOG_RETENTION_DAYS} days',),
-        )
+        now_ts = time.time()
+        for token, (_, cached_until) in list(self._admin_session_cache.items()):
+            if cached_until <= now_ts:
+                self._admin_session_cache.pop(token, None)
+        conn = pooled_connection()
+        conn.execute('DELETE FROM admin_sessions WHERE expires_at_epoch <= ?', (int(now_ts),))
+        conn.execute('DELETE FROM admin_password_resets WHERE expires_at_epoch <= ?', (int(now_ts),))
+        conn.execute('DELETE FROM admin_password_resets WHERE used_at IS NOT NULL')
         conn.commit()
-        conn.close()
 
     def _clear_admin_session(self):
         token = self._parse_cookies().get(ADMIN_SESSION_COOKIE)
         if not token:
             return
-        conn = connect()
+        conn = pooled_connection()
         conn.execute('DELETE FROM admin_sessions WHERE token = ?', (token,))
         conn.commit()
-        conn.close()
+        self._evict_admin_sessions(token=token)
+        self._request_admin = None
 
     def _base_url(self):
         host = self.headers.get('Host', '127.0.0.1:8000')
@@ -319,31 +428,20 @@ class OscarHandler(SimpleHTTPRequestHandler):
 
     def _audit_admin(self, action, success=True, admin=None, actor_email='', details=None):
         try:
-            self._prune_admin_audit_logs()
             admin_id = None
             if admin and admin.get('id'):
                 admin_id = admin['id']
                 actor_email = actor_email or admin.get('email', '')
             payload = details if isinstance(details, dict) else {'note': str(details or '')}
-            conn = connect()
-            conn.execute(
-                '''
-                INSERT INTO admin_audit_logs(
-                  admin_user_id, action, success, actor_email, request_ip, user_agent, details
-                ) VALUES(?, ?, ?, ?, ?, ?, ?)
-                ''',
-                (
-                    admin_id,
-                    action,
-                    1 if success else 0,
-                    actor_email or '',
-                    self._client_ip(),
-                    self.headers.get('User-Agent', ''),
-                    json.dumps(payload, separators=(',', ':'), ensure_ascii=True),
-                ),
+            audit_log.record(
+                admin_id,
+                action,
+                success,
+                actor_email or '',
+                self._client_ip(),
+                self.headers.get('User-Agent', ''),
+                json.dumps(payload, separators=(',', ':'), ensure_ascii=True),
             )
-            conn.commit()
-            conn.close()
         except Exception:
             pass
 
@@ -357,46 +455,11 @@ class OscarHandler(SimpleHTTPRequestHandler):
             smtp.send_message(email_message)
 
     @staticmethod
-    def _first_watch_result_url(title):
-        search_url = f'https://www.justwatch.com/us/search?q={quote_plus(title)}'
-
-        try:
-            req = Request(
-                search_url,
-                headers={
-                    'User-Agent': (
-                        'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) '
-                        'AppleWebKit/537.36 (KHTML, like Gecko) '
-                        'Chrome/122.0.0.0 Safari/537.36'
-                    ),
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                },
-            )
-            with urlopen(req, timeout=12) as response:
-                html = response.read().decode('utf-8', errors='ignore')
-        except Exception:
-            slug = slugify_title(title)
-            if slug:
-                return f'https://www.justwatch.com/us/movie/{slug}'
-            return search_url
-
-        patterns = [
-            r'href="(/us/(?:movie|tv-show)/[^"#?]+)"',
-            r'"url":"(\\/us\\/(?:movie|tv-show)\\/[^"\\]+)"',
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, html)
-            if not match:
-                continue
-            path = match.group(1).replace('\\/', '/')
-            if not path.startswith('/us/'):
-                continue
-            return f'https://www.justwatch.com{path}'
-
+    def _watch_fallback_url(title):
         slug = slugify_title(title)
         if slug:
             return f'https://www.justwatch.com/us/movie/{slug}'
-        return search_url
+        return WATCH_SEARCH.format(query=quote_plus(title))
 
     def do_GET(self):
         parsed = urlparse(self.path)
@@ -413,7 +476,7 @@ class OscarHandler(SimpleHTTPRequestHandler):
         title = (query.get('title', [''])[0] or '').strip()
         if not title:
             return self._redirect('https://www.justwatch.com/us')
-        target = self._first_watch_result_url(title)
+        target = resolve_watch_url(title) or self._watch_fallback_url(title)
         return self._redirect(target)
 
     def do_PUT(self):
@@ -443,6 +506,10 @@ class OscarHandler(SimpleHTTPRequestHandler):
                 return
             year = int(query.get('year', ['2026'])[0])
             return self._get_admin_dashboard(year)
+        if parsed.path == '/api/admin/metrics':
+            if not self._require_admin_api():
+                return
+            return self._get_admin_metrics()
         if parsed.path == '/api/nominees':
             year = int(query.get('year', ['2026'])[0])
             category = query.get('category', ['__ALL__'])[0]
@@ -451,10 +518,19 @@ class OscarHandler(SimpleHTTPRequestHandler):
             year = int(query.get('year', ['2026'])[0])
             user_key = query.get('userKey', [''])[0]
             return self._get_user_state(year, user_key)
+        if parsed.path == '/api/leaderboard':
+            year = int(query.get('year', ['2026'])[0])
+            return self._get_leaderboard(year, query)
+        if parsed.path == '/api/events':
+            year = int(query.get('year', ['2026'])[0])
+            return self._get_events(year, query)
         if parsed.path == '/api/poster-image':
             year = int(query.get('year', ['2026'])[0])
             film_id = query.get('filmId', [''])[0]
-            return self._get_poster_image(year, film_id)
+            digest = query.get('v', [''])[0]
+            width_raw = query.get('w', [''])[0]
+            width = int(width_raw) if width_raw.isdigit() else None
+            return self._get_poster_image(year, film_id, digest, width)
 
         self.send_error(HTTPStatus.NOT_FOUND)
 
@@ -537,6 +613,11 @@ class OscarHandler(SimpleHTTPRequestHandler):
             if body is None:
                 return
             return self._post_contact(body)
+        if parsed.path == '/api/user-state/batch':
+            body = self._read_json_body()
+            if body is None:
+                return
+            return self._post_user_state_batch(body)
         self.send_error(HTTPStatus.NOT_FOUND)
 
     def _get_admin_auth_session(self):
@@ -567,12 +648,11 @@ class OscarHandler(SimpleHTTPRequestHandler):
                 status=HTTPStatus.TOO_MANY_REQUESTS,
             )
             return
-        conn = connect()
+        conn = pooled_connection()
         row = conn.execute(
             'SELECT id, email, password_hash FROM admin_users WHERE lower(email) = ?',
             (email,),
         ).fetchone()
-        conn.close()
 
         if not row or not self._verify_password(password, row['password_hash']):
             self._record_login_attempt(email, False)
@@ -672,7 +752,7 @@ class OscarHandler(SimpleHTTPRequestHandler):
             )
             return
 
-        conn = connect()
+        conn = pooled_connection()
         row = conn.execute(
             'SELECT id, email FROM admin_users WHERE lower(email) = ?',
             (email,),
@@ -681,20 +761,22 @@ class OscarHandler(SimpleHTTPRequestHandler):
         if row:
             token = secrets.token_urlsafe(48)
             token_hash = self._token_hash(token)
+            expires_ts = int(time.time()) + ADMIN_RESET_TTL_SECONDS
             conn.execute(
                 '''
-                INSERT INTO admin_password_resets(token_hash, user_id, expires_at)
-                VALUES(?, ?, datetime('now', '+60 minutes'))
+                INSERT INTO admin_password_resets(token_hash, user_id, expires_at, expires_at_epoch)
+                VALUES(?, ?, datetime(?, 'unixepoch'), ?)
                 ''',
-                (token_hash, row['id']),
+                (token_hash, row['id'], expires_ts, expires_ts),
             )
             conn.commit()
+            # Outbound calls never hold a pooled connection.
+            release_pooled_connection()
             try:
                 self._send_admin_reset_email(row['email'], token)
                 sent = True
             except Exception:
                 pass
-        conn.close()
         self._audit_admin(
             'admin_password_reset_request',
             success=True,
@@ -732,18 +814,17 @@ class OscarHandler(SimpleHTTPRequestHandler):
             )
             return
 
-        conn = connect()
+        conn = pooled_connection()
         token_hash = self._token_hash(token)
         reset_row = conn.execute(
             '''
             SELECT token_hash, user_id
             FROM admin_password_resets
-            WHERE token_hash = ? AND used_at IS NULL AND datetime(expires_at) > datetime('now')
+            WHERE token_hash = ? AND used_at IS NULL AND expires_at_epoch > ?
             ''',
-            (token_hash,),
+            (token_hash, int(time.time())),
         ).fetchone()
         if not reset_row:
-            conn.close()
             self._audit_admin(
                 'admin_password_reset_submit',
                 success=False,
@@ -771,11 +852,11 @@ class OscarHandler(SimpleHTTPRequestHandler):
         )
         conn.execute('DELETE FROM admin_sessions WHERE user_id = ?', (reset_row['user_id'],))
         conn.commit()
+        self._evict_admin_sessions(user_id=reset_row['user_id'])
         admin_row = conn.execute(
             'SELECT id, email FROM admin_users WHERE id = ?',
             (reset_row['user_id'],),
         ).fetchone()
-        conn.close()
 
         new_token, csrf_token = self._create_admin_session(reset_row['user_id'])
         self._audit_admin(
@@ -796,59 +877,65 @@ class OscarHandler(SimpleHTTPRequestHandler):
         )
 
     def _get_years(self):
-        conn = connect()
-        rows = conn.execute('SELECT year, label FROM years ORDER BY year DESC').fetchall()
-        conn.close()
-        self._json({'years': [dict(row) for row in rows]})
+        with read_transaction() as conn:
+            versions = conn.execute(
+                '''
+                SELECT
+                  (SELECT COUNT(*) FROM years) AS year_count,
+                  (SELECT COALESCE(MAX(epoch), 0) FROM year_content_versions) AS epoch,
+                  (SELECT COALESCE(SUM(version), 0) FROM year_content_versions) AS version_total
+                '''
+            ).fetchone()
+            etag = (
+                f'"years-{versions["year_count"]}-{versions["epoch"]}.{versions["version_total"]}'
+                f'-{CONTENT_ETAG_SALT}"'
+            )
+            if self._etag_matches(etag):
+                return self._not_modified(etag)
+            response = response_cache.get(('years',), etag)
+            rows = None if response else conn.execute('SELECT year, label FROM years ORDER BY year DESC').fetchall()
+        if response is None:
+            response = response_cache.put(
+                ('years',),
+                etag,
+                EncodedResponse({'years': [dict(row) for row in rows]}, etag=etag),
+            )
+        self._send_encoded(response)
 
     def _get_admin_dashboard(self, year):
         admin = self._current_admin()
-        conn = connect()
-        unique_users_row = conn.execute(
-            'SELECT COUNT(DISTINCT user_key) AS count FROM user_picks WHERE year = ?',
-            (year,),
-        ).fetchone()
-        total_picks_row = conn.execute(
-            'SELECT COUNT(*) AS count FROM user_picks WHERE year = ?',
-            (year,),
-        ).fetchone()
-        winner_categories_row = conn.execute(
-            'SELECT COUNT(*) AS count FROM category_winners WHERE year = ?',
-            (year,),
-        ).fetchone()
-        user_scores_row = conn.execute(
-            '''
-            WITH winner_categories AS (
-              SELECT category_id, film_id
-              FROM category_winners
-              WHERE year = ?
-            ),
-            user_scores AS (
-              SELECT
-                up.user_key AS user_key,
-                SUM(CASE WHEN up.film_id = wc.film_id THEN 1 ELSE 0 END) AS correct
-              FROM user_picks up
-              JOIN winner_categories wc ON wc.category_id = up.category_id
-              WHERE up.year = ?
-              GROUP BY up.user_key
-            )
-            SELECT COUNT(*) AS count
-            FROM user_scores
-            ''',
-            (year, year),
-        ).fetchone()
-        conn.close()
+        with read_transaction() as conn:
+            unique_users_row = conn.execute(
+                'SELECT COUNT(DISTINCT user_key) AS count FROM user_picks WHERE year = ?',
+                (year,),
+            ).fetchone()
+            total_picks_row = conn.execute(
+                'SELECT COUNT(*) AS count FROM user_picks WHERE year = ?',
+                (year,),
+            ).fetchone()
+            winner_categories_row = conn.execute(
+                'SELECT COUNT(*) AS count FROM category_winners WHERE year = ?',
+                (year,),
+            ).fetchone()
+            users_compared_row = conn.execute(
+                'SELECT COALESCE(SUM(users), 0) AS count FROM user_score_histogram WHERE year = ?',
+                (year,),
+            ).fetchone()
 
         payload = {
             'year': year,
             'uniqueUsers': unique_users_row['count'] if unique_users_row else 0,
-            'usersCompared': user_scores_row['count'] if user_scores_row else 0,
+            'usersCompared': users_compared_row['count'] if users_compared_row else 0,
             'totalPicks': total_picks_row['count'] if total_picks_row else 0,
             'winnerCategories': winner_categories_row['count'] if winner_categories_row else 0,
         }
         self._audit_admin('admin_dashboard_view', success=True, admin=admin, details={'year': year})
         self._json(payload)
 
+    def _get_admin_metrics(self):
+        # Counters are per process; with OSCAR_WORKERS > 1 each worker reports its own.
+        self._json({'pid': os.getpid(), 'userWrites': group_writer.metrics(), 'auditLog': audit_log.metrics()})
+
     def _get_admin_audit_logs(self, query):
         admin = self._current_admin()
         action = (query.get('action', [''])[0] or '').strip()
@@ -858,6 +945,13 @@ class OscarHandler(SimpleHTTPRequestHandler):
             limit = max(1, min(int(limit_raw), 500))
         except ValueError:
             limit = 100
+        try:
+            before_id = int(query.get('before_id', ['0'])[0] or 0)
+            date_from = self._audit_date(query.get('from', [''])[0])
+            date_to = self._audit_date(query.get('to', [''])[0])
+        except ValueError:
+            self._json({'ok': False, 'error': 'Invalid audit log filter.'}, status=HTTPStatus.BAD_REQUEST)
+            return
 
         clauses = []
         params = []
@@ -867,28 +961,39 @@ class OscarHandler(SimpleHTTPRequestHandler):
         if success_raw in {'0', '1'}:
             clauses.append('success = ?')
             params.append(int(success_raw))
+        if before_id > 0:
+            clauses.append('id < ?')
+            params.append(before_id)
+        if date_from:
+            clauses.append('created_at >= ?')
+            params.append(date_from.isoformat())
+        if date_to:
+            # to is inclusive of the whole day.
+            clauses.append('created_at < ?')
+            params.append((date_to + timedelta(days=1)).isoformat())
         where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
 
-        conn = connect()
-        rows = conn.execute(
-            f'''
-            SELECT id, admin_user_id, action, success, actor_email, request_ip, user_agent, details, created_at
-            FROM admin_audit_logs
-            {where}
-            ORDER BY id DESC
-            LIMIT ?
-            ''',
-            (*params, limit),
-        ).fetchall()
-        actions = conn.execute(
-            '''
-            SELECT action, COUNT(*) AS count
-            FROM admin_audit_logs
-            GROUP BY action
-            ORDER BY action
-            '''
-        ).fetchall()
-        conn.close()
+        with read_transaction() as conn:
+            rows = conn.execute(
+                f'''
+                SELECT id, admin_user_id, action, success, actor_email, request_ip, user_agent, details, created_at
+                FROM admin_audit_logs
+                {where}
+                ORDER BY id DESC
+                LIMIT ?
+                ''',
+                (*params, limit + 1),
+            ).fetchall()
+            actions = conn.execute(
+                '''
+                SELECT action, SUM(count) AS count
+                FROM admin_audit_action_counts
+                GROUP BY action
+                ORDER BY action
+                '''
+            ).fetchall()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
 
         logs = []
         for row in rows:
@@ -915,280 +1020,245 @@ class OscarHandler(SimpleHTTPRequestHandler):
             'admin_audit_logs_view',
             success=True,
             admin=admin,
-            details={'limit': limit, 'action': action, 'success': success_raw},
+            details={'limit': limit, 'action': action, 'success': success_raw, 'beforeId': before_id},
         )
         self._json(
             {
                 'logs': logs,
                 'actions': [dict(row) for row in actions],
-                'filters': {'action': action, 'success': success_raw, 'limit': limit},
+                'filters': {
+                    'action': action,
+                    'success': success_raw,
+                    'limit': limit,
+                    'beforeId': before_id or None,
+                    'from': date_from.isoformat() if date_from else '',
+                    'to': date_to.isoformat() if date_to else '',
+                },
+                'nextBeforeId': logs[-1]['id'] if has_more else None,
             }
         )
 
-    def _get_nominees(self, year, category):
-        conn = connect()
-        categories = conn.execute(
-            'SELECT name, year_started, year_ended FROM categories WHERE year = ? ORDER BY id',
-            (year,),
-        ).fetchall()
-
-        if category == '__ALL__':
-            film_rows = conn.execute(
-                '''
-                SELECT f.id, f.title, wl.url AS override_url,
-                       wlbl.free_to_watch AS free_to_watch,
-                       sp.url AS scraped_poster_url, ap.url AS admin_poster_url
-                FROM film_years fy
-                JOIN films f ON f.id = fy.film_id
-                LEFT JOIN admin_watch_links wl ON wl.year = fy.year AND wl.film_id = fy.film_id
-                LEFT JOIN admin_watch_labels wlbl ON wlbl.year = fy.year AND wlbl.film_id = fy.film_id
-                LEFT JOIN scraped_posters sp ON sp.year = fy.year AND sp.film_id = fy.film_id
-                LEFT JOIN admin_posters ap ON ap.year = fy.year AND ap.film_id = fy.film_id
-                WHERE fy.year = ?
-                ORDER BY f.title
-                ''',
-                (year,),
-            ).fetchall()
-        else:
-            film_rows = conn.execute(
-                '''
-                SELECT DISTINCT f.id, f.title, wl.url AS override_url,
-                       wlbl.free_to_watch AS free_to_watch,
-                       sp.url AS scraped_poster_url, ap.url AS admin_poster_url
-                FROM nominations n
-                JOIN categories c ON c.id = n.category_id
-                JOIN films f ON f.id = n.film_id
-                JOIN film_years fy ON fy.year = n.year AND fy.film_id = n.film_id
-                LEFT JOIN admin_watch_links wl ON wl.year = fy.year AND wl.film_id = fy.film_id
-                LEFT JOIN admin_watch_labels wlbl ON wlbl.year = fy.year AND wlbl.film_id = fy.film_id
-                LEFT JOIN scraped_posters sp ON sp.year = fy.year AND sp.film_id = fy.film_id
-                LEFT JOIN admin_posters ap ON ap.year = fy.year AND ap.film_id = fy.film_id
-                WHERE n.year = ? AND c.name = ?
-                ORDER BY f.title
-                ''',
-                (year, category),
-            ).fetchall()
-
-        nominations = conn.execute(
-            '''
-            SELECT c.name AS category, n.film_id AS filmId, n.nominee
-            FROM nominations n
-            JOIN categories c ON c.id = n.category_id
-            WHERE n.year = ?
-            ORDER BY n.id
-            ''',
-            (year,),
-        ).fetchall()
-
-        winners = conn.execute(
-            '''
-            SELECT c.name AS category, cw.film_id AS filmId
-            FROM category_winners cw
-            JOIN categories c ON c.id = cw.category_id
-            WHERE cw.year = ?
-            ''',
-            (year,),
-        ).fetchall()
-
-        banner = conn.execute(
-            'SELECT enabled, text FROM admin_banners WHERE year = ?',
-            (year,),
-        ).fetchone()
-        event_mode = conn.execute(
-            'SELECT enabled FROM admin_event_modes WHERE year = ?',
-            (year,),
-        ).fetchone()
-        voting_lock = conn.execute(
-            'SELECT enabled FROM admin_voting_locks WHERE year = ?',
-            (year,),
-        ).fetchone()
+    @staticmethod
+    def _audit_date(raw):
+        raw = (raw or '').strip()
+        return date.fromisoformat(raw) if raw else None
 
-        conn.close()
+    def _get_nominees(self, year, category):
+        with read_transaction() as conn:
+            catalog = year_catalog(conn, year)
+        epoch, version = catalog.version
+        if not epoch or (category != '__ALL__' and catalog.category_id(category) is None):
+            # Both come from the query string: unknown ones are answered uncached
+            # and uncompressed so they can't churn the cache or burn CPU.
+            return self._json(self._nominees_payload(catalog, category))
+        category_tag = hashlib.sha256(category.encode('utf-8')).hexdigest()[:8]
+        etag = f'"nominees-{year}-{category_tag}-{epoch}.{version}-{CONTENT_ETAG_SALT}"'
+        if self._etag_matches(etag):
+            return self._not_modified(etag)
+        cache_key = ('nominees', year, category)
+        response = response_cache.get(cache_key, etag)
+        if response is None:
+            payload = self._nominees_payload(catalog, category)
+            response = response_cache.put(cache_key, etag, EncodedResponse(payload, etag=etag))
+        self._send_encoded(response)
 
-        films = []
-        for row in film_rows:
-            films.append(
+    @staticmethod
+    def _nominees_payload(catalog, category):
+        films = catalog.films if category == '__ALL__' else catalog.films_for(category)
+        settings = catalog.settings
+        return {
+            'year': catalog.year,
+            'categories': [
                 {
-                    'id': row['id'],
-                    'title': row['title'],
-                    'whereToWatchUrl': row['override_url'],
-                    'whereToWatchOverrideUrl': row['override_url'],
-                    'freeToWatch': bool(row['free_to_watch']),
-                    'posterUrl': row['admin_poster_url'] or row['scraped_poster_url'],
-                    'posterOverrideUrl': row['admin_poster_url'],
+                    'name': c.name,
+                    'yearStarted': c.year_started,
+                    'yearEnded': c.year_ended,
                 }
-            )
-
-        payload = {
-            'year': year,
-            'categories': [
+                for c in catalog.categories
+            ],
+            'films': [
                 {
-                    'name': c['name'],
-                    'yearStarted': c['year_started'],
-                    'yearEnded': c['year_ended'],
+                    'id': film.id,
+                    'title': film.title,
+                    'whereToWatchUrl': film.watch_url,
+                    'whereToWatchOverrideUrl': film.watch_url,
+                    'freeToWatch': film.free_to_watch,
+                    'posterUrl': OscarHandler._poster_url(catalog.year, film),
+                    'posterOverrideUrl': film.admin_poster_url,
                 }
-                for c in categories
+                for film in films
             ],
-            'films': films,
-            'nominations': [dict(row) for row in nominations],
-            'winnersByCategory': {row['category']: row['filmId'] for row in winners},
-            'eventMode': bool(event_mode['enabled']) if event_mode else False,
-            'votingLocked': bool(voting_lock['enabled']) if voting_lock else False,
+            'nominations': [
+                {'category': category_name, 'filmId': film_id, 'nominee': nominee}
+                for category_name, film_id, nominee in catalog.nominations
+            ],
+            'winnersByCategory': dict(catalog.winners_by_category),
+            'eventMode': settings.event_mode,
+            'votingLocked': settings.voting_locked,
             'banner': {
-                'enabled': bool(banner['enabled']) if banner else True,
-                'text': (banner['text'] if banner and banner['text'] else DEFAULT_BANNER_TEXT),
+                'enabled': settings.banner_enabled,
+                'text': settings.banner_text or DEFAULT_BANNER_TEXT,
             },
         }
-        self._json(payload)
 
     def _get_user_state(self, year, user_key_hint=''):
         user_key = user_key_hint or DEFAULT_USER_KEY
-        conn = connect()
-        rows = conn.execute(
-            'SELECT film_id FROM user_seen WHERE year = ? AND user_key = ? AND seen = 1',
-            (year, user_key),
-        ).fetchall()
+        with read_transaction() as conn:
+            rows = conn.execute(
+                'SELECT film_id FROM user_seen WHERE year = ? AND user_key = ? AND seen = 1',
+                (year, user_key),
+            ).fetchall()
 
-        picks = conn.execute(
-            '''
-            SELECT c.name AS category, up.film_id AS filmId
-            FROM user_picks up
-            JOIN categories c ON c.id = up.category_id
-            WHERE up.year = ? AND up.user_key = ?
-            ''',
-            (year, user_key),
-        ).fetchall()
+            picks = conn.execute(
+                'SELECT category_id, film_id FROM user_picks WHERE year = ? AND user_key = ?',
+                (year, user_key),
+            ).fetchall()
+            catalog = year_catalog(conn, year)
+            standing = score_standing(conn, year, user_key)
 
-        winner_count_row = conn.execute(
-            'SELECT COUNT(*) AS count FROM category_winners WHERE year = ?',
-            (year,),
-        ).fetchone()
-        winner_count = winner_count_row['count'] if winner_count_row else 0
+        category_names = catalog.category_names_by_id
+        self._json(
+            {
+                'seenFilmIds': [row['film_id'] for row in rows],
+                'picksByCategory': {
+                    category_names[row['category_id']]: row['film_id']
+                    for row in picks
+                    if row['category_id'] in category_names
+                },
+                'performance': {'winnerCategoryCount': len(catalog.winners_by_category), **standing},
+            }
+        )
 
-        user_correct_row = conn.execute(
-            '''
-            SELECT COUNT(*) AS correct
-            FROM user_picks up
-            JOIN category_winners cw
-              ON cw.year = up.year
-             AND cw.category_id = up.category_id
-             AND cw.film_id = up.film_id
-            WHERE up.year = ? AND up.user_key = ?
-            ''',
-            (year, user_key),
-        ).fetchone()
-        user_correct = user_correct_row['correct'] if user_correct_row else 0
+    def _get_leaderboard(self, year, query):
+        try:
+            offset = max(0, int(query.get('offset', ['0'])[0]))
+            limit = max(1, min(int(query.get('limit', [str(LEADERBOARD_DEFAULT_LIMIT)])[0]), LEADERBOARD_MAX_LIMIT))
+        except ValueError:
+            self._json({'ok': False, 'error': 'offset and limit must be integers.'}, status=HTTPStatus.BAD_REQUEST)
+            return
+        user_key = (query.get('userKey', [''])[0] or '').strip()
 
-        other_scores = conn.execute(
-            '''
-            WITH winner_categories AS (
-              SELECT category_id, film_id
-              FROM category_winners
-              WHERE year = ?
-            ),
-            user_scores AS (
-              SELECT
-                up.user_key AS user_key,
-                SUM(CASE WHEN up.film_id = wc.film_id THEN 1 ELSE 0 END) AS correct
-              FROM user_picks up
-              JOIN winner_categories wc ON wc.category_id = up.category_id
-              WHERE up.year = ?
-              GROUP BY up.user_key
-            )
-            SELECT
-              SUM(CASE WHEN correct < ? THEN 1 ELSE 0 END) AS beaten,
-              COUNT(*) AS total_others
-            FROM user_scores
-            WHERE user_key <> ?
-            ''',
-            (year, year, user_correct, user_key),
-        ).fetchone()
-        beaten = other_scores['beaten'] if other_scores else 0
-        total_others = other_scores['total_others'] if other_scores else 0
-        better_than_percent = (
-            round((beaten / total_others) * 100) if total_others else 0
-        )
+        with read_transaction() as conn:
+            _, _, winners_version = content_version(conn, year)
+            snapshot = leaderboard_snapshot(conn, year, winners_version)
 
-        rank_row = conn.execute(
-            '''
-            WITH winner_categories AS (
-              SELECT category_id, film_id
-              FROM category_winners
-              WHERE year = ?
-            ),
-            user_scores AS (
-              SELECT
-                up.user_key AS user_key,
-                SUM(CASE WHEN up.film_id = wc.film_id THEN 1 ELSE 0 END) AS correct
-              FROM user_picks up
-              JOIN winner_categories wc ON wc.category_id = up.category_id
-              WHERE up.year = ?
-              GROUP BY up.user_key
-            ),
-            current_score AS (
-              SELECT COALESCE(
-                (SELECT correct FROM user_scores WHERE user_key = ?),
-                0
-              ) AS correct
-            )
-            SELECT
-              1 + COALESCE(SUM(CASE WHEN us.correct > (SELECT correct FROM current_score) THEN 1 ELSE 0 END), 0) AS rank_position,
-              COUNT(*) AS ranked_user_count,
-              COALESCE(SUM(CASE WHEN us.correct = (SELECT correct FROM current_score) THEN 1 ELSE 0 END), 0) AS tied_user_count
-            FROM user_scores us
-            ''',
-            (year, year, user_key),
-        ).fetchone()
-        rank_position = rank_row['rank_position'] if rank_row and rank_row['ranked_user_count'] else 1
-        ranked_user_count = rank_row['ranked_user_count'] if rank_row else 0
-        tied_user_count = rank_row['tied_user_count'] if rank_row and rank_row['ranked_user_count'] else 1
+        index = snapshot.index_by_user.get(user_key) if user_key else None
+
+        def entries(start, rows):
+            return [
+                {'rank': rank, 'correct': correct, 'player': player, 'isMe': start + i == index}
+                for i, (rank, correct, player) in enumerate(rows)
+            ]
+
+        me = None
+        around = []
+        if index is not None:
+            me = entries(index, snapshot.rows[index:index + 1])[0]
+            start, window = snapshot.around(index, LEADERBOARD_AROUND_RADIUS)
+            around = entries(start, window)
 
-        conn.close()
         self._json(
             {
-                'seenFilmIds': [row['film_id'] for row in rows],
-                'picksByCategory': {row['category']: row['filmId'] for row in picks},
-                'performance': {
-                    'winnerCategoryCount': winner_count,
-                    'userCorrectCount': user_correct,
-                    'betterThanPercent': better_than_percent,
-                    'comparedUserCount': total_others,
-                    'rankPosition': rank_position,
-                    'rankedUserCount': ranked_user_count,
-                    'tiedUserCount': tied_user_count,
-                },
+                'year': year,
+                'winnerCategoryCount': snapshot.winner_count,
+                'rankedUserCount': len(snapshot.rows),
+                'offset': offset,
+                'limit': limit,
+                'entries': entries(offset, snapshot.page(offset, limit)),
+                'cutPoints': [
+                    {'percentile': percentile, 'correct': correct}
+                    for percentile, correct in snapshot.cut_points
+                ],
+                'me': me,
+                'around': around,
             }
         )
 
+    def _get_events(self, year, query):
+        last_event_id = self.headers.get('Last-Event-ID') or query.get('lastEventId', [''])[0]
+        event_broker.start()
+        try:
+            cursor = int(last_event_id)
+        except ValueError:
+            cursor = event_broker.last_id
+        if not event_broker.open_stream():
+            self._json(
+                {'ok': False, 'error': 'Too many live streams; poll instead.'},
+                status=HTTPStatus.SERVICE_UNAVAILABLE,
+                extra_headers={'Retry-After': str(LIVE_EVENTS_HEARTBEAT_SECONDS)},
+            )
+            return
+
+        # A stream can stay open for hours; it must not pin a DB connection.
+        release_pooled_connection()
+        self.close_connection = True
+        try:
+            self.send_response(HTTPStatus.OK)
+            self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('X-Accel-Buffering', 'no')
+            self.end_headers()
+            self.wfile.write(b'retry: 3000\n\n')
+            self.wfile.flush()
+            last_write = time.monotonic()
+            while True:
+                events, cursor, gap = event_broker.events_after(cursor, year, LIVE_EVENTS_HEARTBEAT_SECONDS)
+                frames = format_events(events, cursor, gap)
+                if not frames and time.monotonic() - last_write >= LIVE_EVENTS_HEARTBEAT_SECONDS:
+                    frames = b': heartbeat\n\n'
+                if frames:
+                    self.wfile.write(frames)
+                    self.wfile.flush()
+                    last_write = time.monotonic()
+        except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError):
+            pass
+        finally:
+            event_broker.close_stream()
+
     def _put_user_state(self, body):
         year = int(body.get('year'))
         user_key = body.get('userKey') or DEFAULT_USER_KEY
         film_id = body.get('filmId')
         seen = 1 if body.get('seen') else 0
 
-        conn = connect()
-        conn.execute(
-            '''
-            INSERT INTO user_seen(user_key, year, film_id, seen)
-            VALUES(?, ?, ?, ?)
-            ON CONFLICT(user_key, year, film_id) DO UPDATE SET
-              seen=excluded.seen,
-              updated_at=CURRENT_TIMESTAMP
-            ''',
-            (user_key, year, film_id, seen),
+        def write(conn):
+            conn.execute(
+                '''
+                INSERT INTO user_seen(user_key, year, film_id, seen)
+                VALUES(?, ?, ?, ?)
+                ON CONFLICT(user_key, year, film_id) DO UPDATE SET
+                  seen=excluded.seen,
+                  updated_at=CURRENT_TIMESTAMP
+                ''',
+                (user_key, year, film_id, seen),
+            )
+
+        committed, _ = self._submit_user_write(write)
+        if committed:
+            self._json({'ok': True})
+
+    def _submit_user_write(self, work):
+        """Run work(conn) on the group-commit writer; returns (committed, result).
+
+        On failure the error response has already been sent. The writer has
+        its own connection, so the request's is handed back while waiting.
+        """
+        release_pooled_connection()
+        try:
+            return True, group_writer.submit(work).result(timeout=USER_WRITE_ACK_TIMEOUT_SECONDS)
+        except WriteQueueFull:
+            error = 'Too many pending writes; retry shortly.'
+        except (FuturesTimeoutError, sqlite3.OperationalError):
+            error = 'Write did not commit in time; retry shortly.'
+        self._json(
+            {'ok': False, 'error': error},
+            status=HTTPStatus.SERVICE_UNAVAILABLE,
+            extra_headers={'Retry-After': '1'},
         )
-        conn.commit()
-        conn.close()
-        self._json({'ok': True})
+        return False, None
 
     def _category_id(self, year, category_name):
-        conn = connect()
-        row = conn.execute(
-            'SELECT id FROM categories WHERE year = ? AND name = ?',
-            (year, category_name),
-        ).fetchone()
-        conn.close()
-        return row['id'] if row else None
+        return year_catalog(pooled_connection(), year).category_id(category_name)
 
     def _put_user_pick(self, body):
         year = int(body.get('year'))
@@ -1201,21 +1271,63 @@ class OscarHandler(SimpleHTTPRequestHandler):
         if not category_id:
             self._json({'ok': False, 'error': 'Unknown category'}, status=HTTPStatus.BAD_REQUEST)
             return
+        # The cached switch turns most locked requests away without queueing a write.
+        if settings_cache.get(year).voting_locked:
+            self._json({'ok': False, 'error': 'Voting is locked'}, status=HTTPStatus.FORBIDDEN)
+            return
 
-        conn = connect()
-        voting_lock_row = conn.execute(
-            'SELECT enabled FROM admin_voting_locks WHERE year = ?',
-            (year,),
-        ).fetchone()
-        if voting_lock_row and voting_lock_row['enabled']:
-            conn.close()
-            self._json(
-                {'ok': False, 'error': 'Voting is locked'},
-                status=HTTPStatus.FORBIDDEN,
-            )
+        def write(conn):
+            # Re-checked in the write's own transaction: the cache can lag a lock by a poll interval.
+            if self._voting_locked(conn, year):
+                return False
+            previous_film_id = self._current_pick(conn, year, user_key, category_id)
+            if picked:
+                current_film_id = film_id
+            else:
+                current_film_id = None if previous_film_id == film_id else previous_film_id
+            self._write_user_pick(conn, year, user_key, category_id, previous_film_id, current_film_id)
+            return True
+
+        committed, accepted = self._submit_user_write(write)
+        if not committed:
+            return
+        if not accepted:
+            self._json({'ok': False, 'error': 'Voting is locked'}, status=HTTPStatus.FORBIDDEN)
             return
+        self._json({'ok': True})
 
-        if picked:
+    @staticmethod
+    def _voting_locked(conn, year):
+        # Runs on the writer thread. The lock row can't change under the group's
+        # write transaction, so one lookup per year serves every pick in the group.
+        key = ('voting_locked', year)
+        if key not in group_writer.group_state:
+            row = conn.execute(
+                'SELECT enabled FROM admin_voting_locks WHERE year = ?',
+                (year,),
+            ).fetchone()
+            group_writer.group_state[key] = bool(row and row['enabled'])
+        return group_writer.group_state[key]
+
+    @staticmethod
+    def _current_pick(conn, year, user_key, category_id):
+        row = conn.execute(
+            'SELECT film_id FROM user_picks WHERE user_key = ? AND year = ? AND category_id = ?',
+            (user_key, year, category_id),
+        ).fetchone()
+        return row['film_id'] if row else None
+
+    @staticmethod
+    def _write_user_pick(conn, year, user_key, category_id, previous_film_id, film_id):
+        # film_id is the pick's final state; None clears it.
+        if film_id == previous_film_id:
+            return
+        if film_id is None:
+            conn.execute(
+                'DELETE FROM user_picks WHERE user_key = ? AND year = ? AND category_id = ?',
+                (user_key, year, category_id),
+            )
+        else:
             conn.execute(
                 '''
                 INSERT INTO user_picks(user_key, year, category_id, film_id)
@@ -1226,61 +1338,269 @@ class OscarHandler(SimpleHTTPRequestHandler):
                 ''',
                 (user_key, year, category_id, film_id),
             )
-        else:
+        record_pick_change(conn, year, user_key, category_id, previous_film_id, film_id)
+
+    def _post_user_state_batch(self, body):
+        try:
+            year = int(body.get('year'))
+        except (TypeError, ValueError):
+            self._json({'ok': False, 'error': 'year is required.'}, status=HTTPStatus.BAD_REQUEST)
+            return
+        user_key = body.get('userKey') or DEFAULT_USER_KEY
+        client_id = str(body.get('clientId') or '')[:64]
+        mutations = body.get('mutations')
+        if not client_id or not isinstance(mutations, list):
+            self._json(
+                {'ok': False, 'error': 'clientId and mutations are required.'},
+                status=HTTPStatus.BAD_REQUEST,
+            )
+            return
+        if len(mutations) > USER_BATCH_MAX_MUTATIONS:
+            self._json(
+                {'ok': False, 'error': f'At most {USER_BATCH_MAX_MUTATIONS} mutations per batch.'},
+                status=HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+            )
+            return
+        error = self._user_batch_error(user_key, mutations)
+        if error:
+            self._json({'ok': False, 'error': error}, status=HTTPStatus.BAD_REQUEST)
+            return
+        mutations = sorted(mutations, key=lambda m: m['seq'])
+
+        catalog = year_catalog(pooled_connection(), year)
+        voting_locked = settings_cache.get(year).voting_locked
+        committed, outcome = self._submit_user_write(
+            lambda conn: self._apply_user_batch(conn, catalog, voting_locked, user_key, client_id, mutations)
+        )
+        if committed:
+            applied_seq, results = outcome
+            self._json({'ok': True, 'appliedSeq': applied_seq, 'results': results})
+
+    @staticmethod
+    def _user_batch_error(user_key, mutations):
+        # Checked before queueing so a malformed batch gets a 400 naming the field; inside the
+        # writer it would only fail its own savepoint and surface as an error without a response.
+        if not isinstance(user_key, str):
+            return 'userKey must be a string.'
+        for mutation in mutations:
+            if not isinstance(mutation, dict):
+                return 'Every mutation must be an object.'
+            seq = mutation.get('seq')
+            if not isinstance(seq, int) or isinstance(seq, bool) or seq <= 0:
+                return 'Every mutation needs a positive integer seq.'
+            if not isinstance(mutation.get('type'), str):
+                return 'Every mutation needs a type.'
+            film_id = mutation.get('filmId')
+            if film_id is not None and not isinstance(film_id, str):
+                return 'filmId must be a string or null.'
+            if mutation['type'] == 'pick' and not isinstance(mutation.get('category'), str):
+                return 'A pick mutation needs a category.'
+        return None
+
+    @classmethod
+    def _apply_user_batch(cls, conn, catalog, voting_locked, user_key, client_id, mutations):
+        """Apply mutations in seq order; returns (highest seq seen, per-mutation results).
+
+        The last applied seq is kept per target (a film's seen flag or a
+        category's pick), not per client. A batch that arrives after a newer
+        one (a beacon overtaking an in-flight request) still applies its
+        writes to other targets, and never overwrites a newer write to the
+        same target.
+        """
+        year = catalog.year
+        if not voting_locked and any(mutation.get('type') == 'pick' for mutation in mutations):
+            # The caller's flag comes from the settings cache; the lock table is the authority.
+            voting_locked = cls._voting_locked(conn, year)
+        applied = {
+            row['target']: row['last_seq']
+            for row in conn.execute(
+                'SELECT target, last_seq FROM user_write_seqs WHERE user_key = ? AND client_id = ?',
+                (user_key, client_id),
+            ).fetchall()
+        }
+        if not applied:
+            # A new page load means this user's older client ids are finished.
             conn.execute(
                 '''
-                DELETE FROM user_picks
-                WHERE user_key = ? AND year = ? AND category_id = ? AND film_id = ?
+                DELETE FROM user_write_seqs
+                WHERE user_key = ? AND datetime(updated_at) < datetime('now', ?)
                 ''',
-                (user_key, year, category_id, film_id),
+                (user_key, f'-{USER_WRITE_SEQ_RETENTION_HOURS} hours'),
             )
-        conn.commit()
-        conn.close()
-        self._json({'ok': True})
 
-    def _get_poster_image(self, year, film_id):
+        results = []
+        seen_rows = []
+        marks = {}
+        for mutation in mutations:
+            seq = mutation['seq']
+            film_id = mutation.get('filmId')
+            if mutation.get('type') == 'seen':
+                target = f'{year}:seen:{film_id}'
+            elif mutation.get('type') == 'pick':
+                target = f"{year}:pick:{mutation.get('category')}"
+            else:
+                results.append({'seq': seq, 'ok': False, 'error': 'Unknown mutation type'})
+                continue
+            if seq <= applied.get(target, 0):
+                # Retried, or superseded by a newer write to the same target.
+                results.append({'seq': seq, 'ok': True, 'duplicate': True})
+                continue
+            applied[target] = marks[target] = seq
+            if film_id is not None and film_id not in catalog.films_by_id:
+                results.append({'seq': seq, 'ok': False, 'error': 'Unknown film'})
+                continue
+            if mutation['type'] == 'seen':
+                if film_id is None:
+                    results.append({'seq': seq, 'ok': False, 'error': 'Unknown film'})
+                    continue
+                seen_rows.append((user_key, year, film_id, 1 if mutation.get('seen') else 0))
+                results.append({'seq': seq, 'ok': True})
+            else:
+                category_id = catalog.category_id(mutation.get('category'))
+                if not category_id:
+                    results.append({'seq': seq, 'ok': False, 'error': 'Unknown category'})
+                    continue
+                if voting_locked:
+                    results.append({'seq': seq, 'ok': False, 'error': 'Voting is locked'})
+                    continue
+                previous_film_id = cls._current_pick(conn, year, user_key, category_id)
+                cls._write_user_pick(conn, year, user_key, category_id, previous_film_id, film_id)
+                results.append({'seq': seq, 'ok': True})
+
+        if seen_rows:
+            conn.executemany(
+                '''
+                INSERT INTO user_seen(user_key, year, film_id, seen)
+                VALUES(?, ?, ?, ?)
+                ON CONFLICT(user_key, year, film_id) DO UPDATE SET
+                  seen=excluded.seen,
+                  updated_at=CURRENT_TIMESTAMP
+                ''',
+                seen_rows,
+            )
+        conn.executemany(
+            '''
+            INSERT INTO user_write_seqs(user_key, client_id, target, last_seq)
+            VALUES(?, ?, ?, ?)
+            ON CONFLICT(user_key, client_id, target) DO UPDATE SET
+              last_seq=excluded.last_seq,
+              updated_at=CURRENT_TIMESTAMP
+            ''',
+            [(user_key, client_id, target, seq) for target, seq in marks.items()],
+        )
+        return max((mutation['seq'] for mutation in mutations), default=0), results
+
+    @staticmethod
+    def _poster_url(year, film):
+        if film.poster_digest:
+            return f'/api/poster-image?year={year}&filmId={quote_plus(film.id)}&v={film.poster_digest}'
+        return film.admin_poster_url or film.scraped_poster_url
+
+    def _get_poster_image(self, year, film_id, digest='', width=None):
         if not film_id:
             self.send_error(HTTPStatus.BAD_REQUEST, 'filmId is required')
             return
 
-        conn = connect()
-        row = conn.execute(
-            '''
-            SELECT ap.url AS admin_url, sp.url AS scraped_url
-            FROM film_years fy
-            LEFT JOIN admin_posters ap ON ap.year = fy.year AND ap.film_id = fy.film_id
-            LEFT JOIN scraped_posters sp ON sp.year = fy.year AND sp.film_id = fy.film_id
-            WHERE fy.year = ? AND fy.film_id = ?
-            LIMIT 1
-            ''',
-            (year, film_id),
-        ).fetchone()
-        conn.close()
+        pack = poster_packs.get(year)
+        entry = pack.entries.get(film_id) if pack else None
+        if digest and (entry is None or entry.digest != digest):
+            # The pack may have been rebuilt by another process within the last second.
+            pack = poster_packs.refresh(year)
+            entry = pack.entries.get(film_id) if pack else None
+        if digest and entry is not None and entry.digest == digest:
+            # Hashed URLs name exact bytes, so browsers never need to ask again.
+            return self._send_poster(pack, entry, width, 'public, max-age=31536000, immutable')
+
+        film = recent_year_catalog(year).films_by_id.get(film_id)
 
         # Admin override must win immediately so stale cache can't mask overrides.
-        admin_url = (row['admin_url'] if row else '') or ''
+        admin_url = (film.admin_poster_url if film else '') or ''
         admin_url = admin_url.strip()
         if admin_url and urlparse(admin_url).scheme in {'http', 'https'}:
             return self._redirect(admin_url, status=HTTPStatus.TEMPORARY_REDIRECT)
 
-        cache_path = self._poster_cache_path(year, film_id)
-        if not cache_path.exists():
+        if entry is None:
             fallback_url = ''
-            if row:
-                fallback_url = (row['scraped_url'] or '').strip()
+            if film:
+                fallback_url = (film.scraped_poster_url or '').strip()
             if fallback_url and urlparse(fallback_url).scheme in {'http', 'https'}:
                 return self._redirect(fallback_url, status=HTTPStatus.TEMPORARY_REDIRECT)
             self.send_error(HTTPStatus.NOT_FOUND)
             return
+        # A stale hash must not pin the current image under its URL.
+        self._send_poster(pack, entry, width, 'no-cache' if digest else 'public, max-age=86400')
+
+    def _send_poster(self, pack, poster, width, cache_control):
+        entry = poster.negotiate(width, self.headers.get('Accept', ''))
+        vary = bool(width and poster.variants)
+        if self._etag_matches(entry.etag):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header('ETag', entry.etag)
+            self.send_header('Cache-Control', cache_control)
+            if vary:
+                self.send_header('Vary', 'Accept')
+            self.end_headers()
+            return
 
-        body = cache_path.read_bytes()
-        content_type = mimetypes.guess_type(str(cache_path))[0] or 'image/jpeg'
-        self.send_response(HTTPStatus.OK)
-        self.send_header('Content-Type', content_type)
-        self.send_header('Content-Length', str(len(body)))
-        self.send_header('Cache-Control', 'public, max-age=86400')
+        start, end = 0, entry.length - 1
+        status = HTTPStatus.OK
+        range_header = self.headers.get('Range')
+        if range_header and self.headers.get('If-Range', entry.etag) == entry.etag:
+            byte_range = self._byte_range(range_header, entry.length)
+            if byte_range is None:
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header('Content-Range', f'bytes */{entry.length}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            if byte_range != (start, end):
+                start, end = byte_range
+                status = HTTPStatus.PARTIAL_CONTENT
+
+        length = end - start + 1
+        self.send_response(status)
+        self.send_header('Content-Type', entry.content_type)
+        self.send_header('Content-Length', str(length))
+        self.send_header('Cache-Control', cache_control)
+        self.send_header('ETag', entry.etag)
+        self.send_header('Accept-Ranges', 'bytes')
+        if vary:
+            self.send_header('Vary', 'Accept')
+        if status == HTTPStatus.PARTIAL_CONTENT:
+            self.send_header('Content-Range', f'bytes {start}-{end}/{entry.length}')
         self.end_headers()
-        self.wfile.write(body)
+        connection = getattr(self, 'connection', None)
+        if connection is None:
+            # asyncio engine: the response is buffered, copy straight from the map.
+            self.wfile.write(pack.view(entry.offset + start, length))
+            return
+        connection.sendfile(pack.file, entry.offset + start, length)
+
+    @staticmethod
+    def _byte_range(header, size):
+        """Parse a single bytes= range; (start, end) or None if unsatisfiable.
+
+        Multi-range and malformed headers get the whole image, per RFC 9110.
+        """
+        unit, _, spec = header.partition('=')
+        if unit.strip().lower() != 'bytes' or ',' in spec:
+            return 0, size - 1
+        first, _, last = spec.strip().partition('-')
+        try:
+            if not first:
+                suffix = int(last)
+                if suffix <= 0:
+                    return None
+                return max(0, size - suffix), size - 1
+            start = int(first)
+            end = int(last) if last else size - 1
+        except ValueError:
+            return 0, size - 1
+        if start >= size:
+            return None
+        if end < start:
+            return 0, size - 1
+        return start, min(end, size - 1)
 
     def _put_admin_where_to_watch(self, body):
         admin = self._current_admin()
@@ -1290,7 +1610,7 @@ class OscarHandler(SimpleHTTPRequestHandler):
         has_free_to_watch = 'freeToWatch' in body
         free_to_watch = 1 if body.get('freeToWatch') else 0
 
-        conn = connect()
+        conn = pooled_connection()
         if url:
             conn.execute(
                 '''
@@ -1325,8 +1645,8 @@ class OscarHandler(SimpleHTTPRequestHandler):
                     'DELETE FROM admin_watch_labels WHERE year = ? AND film_id = ?',
                     (year, film_id),
                 )
+        bump_content_version(conn, year)
         conn.commit()
-        conn.close()
         self._audit_admin(
             'admin_where_to_watch_update',
             success=True,
@@ -1342,7 +1662,7 @@ class OscarHandler(SimpleHTTPRequestHandler):
         enabled = 1 if body.get('enabled') else 0
         text = (body.get('text') or '').strip()
 
-        conn = connect()
+        conn = pooled_connection()
         conn.execute(
             '''
             INSERT INTO admin_banners(year, enabled, text)
@@ -1353,8 +1673,16 @@ class OscarHandler(SimpleHTTPRequestHandler):
             ''',
             (year, enabled, text),
         )
+        bump_content_version(conn, year)
+        publish_event(
+            conn,
+            year,
+            'banner',
+            {'year': year, 'enabled': bool(enabled), 'text': text or DEFAULT_BANNER_TEXT},
+        )
         conn.commit()
-        conn.close()
+        settings_cache.invalidate(year)
+        event_broker.notify()
         self._audit_admin(
             'admin_banner_update',
             success=True,
@@ -1368,7 +1696,7 @@ class OscarHandler(SimpleHTTPRequestHandler):
         year = int(body.get('year'))
         enabled = 1 if body.get('enabled') else 0
 
-        conn = connect()
+        conn = pooled_connection()
         conn.execute(
             '''
             INSERT INTO admin_event_modes(year, enabled)
@@ -1378,8 +1706,11 @@ class OscarHandler(SimpleHTTPRequestHandler):
             ''',
             (year, enabled),
         )
+        bump_content_version(conn, year)
+        publish_event(conn, year, 'eventMode', {'year': year, 'enabled': bool(enabled)})
         conn.commit()
-        conn.close()
+        settings_cache.invalidate(year)
+        event_broker.notify()
         self._audit_admin(
             'admin_event_mode_update',
             success=True,
@@ -1393,7 +1724,7 @@ class OscarHandler(SimpleHTTPRequestHandler):
         year = int(body.get('year'))
         enabled = 1 if body.get('enabled') else 0
 
-        conn = connect()
+        conn = pooled_connection()
         conn.execute(
             '''
             INSERT INTO admin_voting_locks(year, enabled)
@@ -1403,8 +1734,11 @@ class OscarHandler(SimpleHTTPRequestHandler):
             ''',
             (year, enabled),
         )
+        bump_content_version(conn, year)
+        publish_event(conn, year, 'votingLock', {'year': year, 'enabled': bool(enabled)})
         conn.commit()
-        conn.close()
+        settings_cache.invalidate(year)
+        event_broker.notify()
         self._audit_admin(
             'admin_voting_lock_update',
             success=True,
@@ -1419,7 +1753,23 @@ class OscarHandler(SimpleHTTPRequestHandler):
         film_id = body.get('filmId')
         url = (body.get('url') or '').strip()
 
-        conn = connect()
+        cache_path = self._poster_cache_path(year, film_id)
+        sha256 = None
+        if url:
+            release_pooled_connection()
+            try:
+                # An admin is waiting on this request: fail fast instead of retrying.
+                body_bytes = http_fetcher.fetch_bytes(url, timeout=12, retries=0)
+                sha256 = put_blob(body_bytes)
+                link_poster(year, film_id, sha256)
+            except Exception:
+                sha256 = None
+                if cache_path.exists():
+                    cache_path.unlink()
+        elif cache_path.exists():
+            cache_path.unlink()
+
+        conn = pooled_connection()
         if url:
             conn.execute(
                 '''
@@ -1436,33 +1786,14 @@ class OscarHandler(SimpleHTTPRequestHandler):
                 'DELETE FROM admin_posters WHERE year = ? AND film_id = ?',
                 (year, film_id),
             )
+        if sha256:
+            record_poster(conn, year, film_id, sha256, 'admin', url)
+        else:
+            forget_poster(conn, year, film_id)
+        bump_content_version(conn, year)
         conn.commit()
-        conn.close()
-
-        cache_path = self._poster_cache_path(year, film_id)
-        if url:
-            try:
-                req = Request(
-                    url,
-                    headers={
-                        'User-Agent': (
-                            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) '
-                            'AppleWebKit/537.36 (KHTML, like Gecko) '
-                            'Chrome/122.0.0.0 Safari/537.36'
-                        ),
-                        'Accept': 'image/avif,image/webp,image/apng,image/*,*/*;q=0.8',
-                        'Referer': 'https://www.imdb.com/',
-                    },
-                )
-                with urlopen(req, timeout=12) as response:
-                    body_bytes = response.read()
-                cache_path.parent.mkdir(parents=True, exist_ok=True)
-                cache_path.write_bytes(body_bytes)
-            except Exception:
-                if cache_path.exists():
-                    cache_path.unlink()
-        elif cache_path.exists():
-            cache_path.unlink()
+        # Pages switch to the new poster once the rebuilt pack bumps the version again.
+        pack_builder.schedule(year)
         self._audit_admin(
             'admin_poster_update',
             success=True,
@@ -1490,8 +1821,16 @@ class OscarHandler(SimpleHTTPRequestHandler):
             self._json({'ok': False, 'error': 'Unknown category'}, status=HTTPStatus.BAD_REQUEST)
             return
 
-        conn = connect()
+        conn = pooled_connection()
+        conn.execute('BEGIN IMMEDIATE')
+        previous_row = conn.execute(
+            'SELECT film_id FROM category_winners WHERE year = ? AND category_id = ?',
+            (year, category_id),
+        ).fetchone()
+        previous_film_id = previous_row['film_id'] if previous_row else None
+        current_film_id = previous_film_id
         if winner:
+            current_film_id = film_id
             conn.execute(
                 '''
                 INSERT INTO category_winners(year, category_id, film_id)
@@ -1509,9 +1848,19 @@ class OscarHandler(SimpleHTTPRequestHandler):
                 WHERE year = ? AND category_id = ? AND film_id = ?
                 ''',
                 (year, category_id, film_id),
+            )
+            if previous_film_id == film_id:
+                current_film_id = None
+        record_winner_change(conn, year, category_id, previous_film_id, current_film_id)
+        bump_content_version(conn, year, winners=True)
+        publish_event(
+            conn,
+            year,
+            'winner',
+            {'year': year, 'category': category_name, 'filmId': current_film_id},
         )
         conn.commit()
-        conn.close()
+        event_broker.notify()
         self._audit_admin(
             'admin_winner_update',
             success=True,
@@ -1560,13 +1909,14 @@ class OscarHandler(SimpleHTTPRequestHandler):
 
         sent = True
         send_error = ''
+        release_pooled_connection()
         try:
             self._send_contact_email(name, email, topic or 'General', message)
         except Exception as exc:
             sent = False
             send_error = str(exc)
 
-        conn = connect()
+        conn = pooled_connection()
         conn.execute(
             '''
             INSERT INTO contact_submissions(name, email, topic, message, sent, send_error)
@@ -1575,7 +1925,6 @@ class OscarHandler(SimpleHTTPRequestHandler):
             (name, email, topic, message, 1 if sent else 0, send_error),
         )
         conn.commit()
-        conn.close()
 
         self._json(
             {
@@ -1586,13 +1935,96 @@ class OscarHandler(SimpleHTTPRequestHandler):
         )
 
 
+def _poster_pack_built(year):
+    # Catalogs built for the new version pick up the rebuilt pack's digests.
+    conn = connect()
+    try:
+        bump_content_version(conn, year)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+pack_builder.on_built = _poster_pack_built
+
+
+class WorkerHTTPServer(ThreadingHTTPServer):
+    allow_reuse_port = True
+    # Non-daemon request threads let server_close() wait for in-flight requests.
+    daemon_threads = False
+    block_on_close = True
+
+
+def _serve(host, port, ready=None):
+    for year in warm_catalogs():
+        poster_packs.get(year)
+    audit_log.start()
+    try:
+        if SERVER_ENGINE == 'asyncio':
+            from async_server import serve
+
+            serve(
+                OscarHandler,
+                host,
+                port,
+                directory=str(WEB_ROOT),
+                max_body_bytes=MAX_JSON_BODY_BYTES,
+                reuse_port=ready is not None,
+                ready=ready,
+                grace_seconds=WORKER_GRACE_SECONDS,
+            )
+            return
+        if ready is None:
+            ThreadingHTTPServer((host, port), OscarHandler).serve_forever()
+            return
+
+        server = WorkerHTTPServer((host, port), OscarHandler)
+        signal.signal(
+            signal.SIGTERM,
+            lambda signum, frame: threading.Thread(target=server.shutdown, daemon=True).start(),
+        )
+        ready()
+        server.serve_forever()
+        # Connections already queued on this worker's socket would be reset by
+        # close(); hand them to request threads first.
+        server.socket.setblocking(False)
+        while True:
+            try:
+                request, client_address = server.socket.accept()
+            except (BlockingIOError, InterruptedError):
+                break
+            request.setblocking(True)
+            server.process_request(request, client_address)
+        closer = threading.Thread(target=server.server_close, daemon=True)
+        closer.start()
+        closer.join(WORKER_GRACE_SECONDS)
+    finally:
+        # Buffered audit rows would be lost when a worker exits.
+        audit_log.close(WORKER_GRACE_SECONDS)
+
+
 def run():
-    init_db()
     host = os.getenv('OSCAR_HOST', '127.0.0.1')
     port = int(os.getenv('OSCAR_PORT', '8000'))
-    server = ThreadingHTTPServer((host, port), OscarHandler)
-    print(f'Serving on http://{host}:{port}')
-    server.serve_forever()
+    ready = worker_ready_callback()
+    if ready is not None:
+        # Started by the supervisor: schema changes in a newly deployed build apply before serving.
+        init_db()
+        _serve(host, port, ready=ready)
+        return
+
+    init_db()
+    conn = connect()
+    sync_year_files(conn)
+    conn.commit()
+    build_stale_packs()
+    warm_watch_link_cache(conn)
+    conn.close()
+    print(f'Serving on http://{host}:{port} ({SERVER_ENGINE}, {SERVER_WORKERS} worker(s))', flush=True)
+    if SERVER_WORKERS > 1:
+        Supervisor([sys.executable, str(Path(__file__).resolve())], SERVER_WORKERS).run()
+    else:
+        _serve(host, port)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,79 @@
+import os
+import sqlite3
+import threading
+import time
+
+from db import connect, content_version, read_transaction
+
+SETTINGS_POLL_SECONDS = max(50, int(os.getenv('OSCAR_SETTINGS_POLL_MS', '250'))) / 1000
+
+
+class YearSettings:
+    __slots__ = ('version', 'banner_enabled', 'banner_text', 'event_mode', 'voting_locked')
+
+    def __init__(self, conn, year):
+        epoch, version, _ = content_version(conn, year)
+        self.version = (epoch, version)
+        banner = conn.execute('SELECT enabled, text FROM admin_banners WHERE year = ?', (year,)).fetchone()
+        self.banner_enabled = bool(banner['enabled']) if banner else True
+        self.banner_text = banner['text'] if banner and banner['text'] else None
+        event_mode = conn.execute('SELECT enabled FROM admin_event_modes WHERE year = ?', (year,)).fetchone()
+        self.event_mode = bool(event_mode['enabled']) if event_mode else False
+        voting_lock = conn.execute('SELECT enabled FROM admin_voting_locks WHERE year = ?', (year,)).fetchone()
+        self.voting_locked = bool(voting_lock['enabled']) if voting_lock else False
+
+
+class SettingsCache:
+    """Per-year admin switches (banner, event mode, voting lock) held in memory.
+
+    Local admin writes call invalidate() after commit. A watcher thread
+    polls year_content_versions and drops entries whose version moved, so
+    writes from other workers and import scripts are seen within one poll.
+    Years without a content-version row are not cached.
+    """
+
+    def __init__(self):
+        self._settings = {}
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def get(self, year):
+        settings = self._settings.get(year)
+        if settings is not None:
+            return settings
+        self.start()
+        with read_transaction() as conn:
+            settings = YearSettings(conn, year)
+        if settings.version[0]:
+            self._settings[year] = settings
+        return settings
+
+    def invalidate(self, year):
+        self._settings.pop(year, None)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='settings-watch', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        conn = connect(check_same_thread=False)
+        while True:
+            try:
+                versions = {
+                    row['year']: (row['epoch'], row['version'])
+                    for row in conn.execute('SELECT year, epoch, version FROM year_content_versions').fetchall()
+                }
+            except sqlite3.Error:
+                conn.rollback()
+            else:
+                for year, settings in list(self._settings.items()):
+                    if settings.version != versions.get(year, (0, 0)):
+                        self._settings.pop(year, None)
+            time.sleep(SETTINGS_POLL_SECONDS)
+
+
+settings_cache = SettingsCache()
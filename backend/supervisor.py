@@ -0,0 +1,154 @@
+import os
+import select
+import signal
+import time
+
+WORKER_GRACE_SECONDS = max(1, int(os.getenv('OSCAR_WORKER_GRACE_SECONDS', '10')))
+WORKER_BOOT_TIMEOUT_SECONDS = 15
+WORKER_RESTART_BACKOFF_SECONDS = 1
+SUPERVISOR_TICK_SECONDS = 0.2
+WORKER_READY_FD_ENV = 'OSCAR_WORKER_READY_FD'
+
+
+class Supervisor:
+    """Pre-fork process manager for the HTTP server.
+
+    Every worker binds its own SO_REUSEPORT listener, so the kernel spreads
+    connections across processes. Crashed workers are replaced. SIGHUP
+    replaces workers one at a time: a new worker must report that it is
+    listening before the old one is asked to drain. SIGTERM/SIGINT drain
+    and stop everything.
+
+    Workers are started by exec'ing worker_argv in a fresh interpreter, so
+    a reload runs the code currently on disk. The worker finds its
+    readiness pipe through worker_ready_callback(), must call ready() once
+    its socket is bound, and exits when it receives SIGTERM.
+    """
+
+    def __init__(self, worker_argv, workers):
+        self.worker_argv = list(worker_argv)
+        self.workers = workers
+        self.generation = 0
+        self.pids = {}
+        self._exited = []
+        self._reload_requested = False
+        self._stop_requested = False
+
+    def _spawn(self):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            try:
+                os.close(read_fd)
+                os.set_inheritable(write_fd, True)
+                env = dict(os.environ, **{WORKER_READY_FD_ENV: str(write_fd)})
+                os.execve(self.worker_argv[0], self.worker_argv, env)
+            except BaseException as exc:
+                print(f'Worker exec failed: {exc}', flush=True)
+            os._exit(127)
+
+        os.close(write_fd)
+        self.pids[pid] = self.generation
+        readable, _, _ = select.select([read_fd], [], [], WORKER_BOOT_TIMEOUT_SECONDS)
+        booted = bool(readable) and os.read(read_fd, 1) == b'1'
+        os.close(read_fd)
+        if not booted:
+            print(f'Worker {pid} did not report ready within {WORKER_BOOT_TIMEOUT_SECONDS}s', flush=True)
+        return pid, booted
+
+    def _reap(self):
+        # Exits seen while a roll or shutdown waits are kept for run() to restart.
+        while self.pids:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            generation = self.pids.pop(pid, None)
+            if generation is not None:
+                self._exited.append((pid, generation, status))
+        exited, self._exited = self._exited, []
+        return exited
+
+    def _wait_for_exit(self, pids, timeout):
+        deadline = time.monotonic() + timeout
+        exited = []
+        while time.monotonic() < deadline and any(pid in self.pids for pid in pids):
+            exited += self._reap()
+            time.sleep(SUPERVISOR_TICK_SECONDS)
+        for pid in pids:
+            if pid in self.pids:
+                os.kill(pid, signal.SIGKILL)
+        while any(pid in self.pids for pid in pids):
+            exited += self._reap()
+            time.sleep(SUPERVISOR_TICK_SECONDS / 4)
+        self._exited = exited + self._exited
+
+    def _roll(self):
+        old_pids = [pid for pid, generation in self.pids.items() if generation == self.generation]
+        self.generation += 1
+        print(f'Rolling {len(old_pids)} workers (generation {self.generation})', flush=True)
+        for old_pid in old_pids:
+            new_pid, booted = self._spawn()
+            if not booted:
+                # Keep the old generation serving rather than roll onto a broken build.
+                # The failed worker is untagged so its exit is not restarted.
+                self.pids[new_pid] = None
+                os.kill(new_pid, signal.SIGKILL)
+                self._wait_for_exit([new_pid], WORKER_GRACE_SECONDS)
+                # Workers already replaced stay; every survivor joins the current
+                # generation so crashes are still restarted and the next roll takes them all.
+                for pid in self.pids:
+                    self.pids[pid] = self.generation
+                print('Reload aborted; remaining previous workers kept', flush=True)
+                return
+            if old_pid in self.pids:
+                os.kill(old_pid, signal.SIGTERM)
+                self._wait_for_exit([old_pid], WORKER_GRACE_SECONDS + 5)
+
+    def _request_reload(self, signum, frame):
+        self._reload_requested = True
+
+    def _request_stop(self, signum, frame):
+        self._stop_requested = True
+
+    def run(self):
+        signal.signal(signal.SIGHUP, self._request_reload)
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+        print(f'Supervisor {os.getpid()} starting {self.workers} workers', flush=True)
+        for _ in range(self.workers):
+            self._spawn()
+
+        while not self._stop_requested:
+            for pid, generation, status in self._reap():
+                if generation != self.generation:
+                    continue
+                print(f'Worker {pid} exited (status {status}); restarting', flush=True)
+                time.sleep(WORKER_RESTART_BACKOFF_SECONDS)
+                self._spawn()
+            if self._reload_requested:
+                self._reload_requested = False
+                self._roll()
+            time.sleep(SUPERVISOR_TICK_SECONDS)
+
+        pids = list(self.pids)
+        for pid in pids:
+            os.kill(pid, signal.SIGTERM)
+        self._wait_for_exit(pids, WORKER_GRACE_SECONDS + 5)
+
+
+def worker_ready_callback():
+    """In a worker started by Supervisor, return the ready() callback; elsewhere None."""
+    fd = os.environ.pop(WORKER_READY_FD_ENV, None)
+    if fd is None:
+        return None
+    fd = int(fd)
+    os.set_inheritable(fd, False)
+
+    def ready():
+        os.write(fd, b'1')
+        os.close(fd)
+
+    return ready
@@ -0,0 +1,159 @@
+import os
+import re
+import threading
+import time
+from html import unescape
+from urllib.parse import quote_plus
+
+from db import pooled_connection, release_pooled_connection
+from http_fetch import FETCH_MAX_REDIRECTS, http_fetcher
+
+WATCH_CACHE_TTL_SECONDS = max(60, int(os.getenv('OSCAR_WATCH_CACHE_TTL_HOURS', '168')) * 60 * 60)
+WATCH_CACHE_NEGATIVE_TTL_SECONDS = max(60, int(os.getenv('OSCAR_WATCH_CACHE_NEGATIVE_TTL_MINUTES', '30')) * 60)
+WATCH_FETCH_TIMEOUT_SECONDS = 12
+# No retries on the request path: a visitor is waiting, and a miss is only cached briefly.
+WATCH_FETCH_RETRIES = 0
+# Every redirect hop and retry of the leader's fetch may run into the timeout.
+WATCH_WAIT_SECONDS = WATCH_FETCH_TIMEOUT_SECONDS * (FETCH_MAX_REDIRECTS + 1) * (WATCH_FETCH_RETRIES + 1) + 1
+WATCH_CACHE_PRUNE_SECONDS = 15 * 60
+
+WATCH_BASE = 'https://www.justwatch.com'
+WATCH_SEARCH = 'https://www.justwatch.com/us/search?q={query}'
+
+
+def extract_first_result_url(search_html):
+    patterns = [
+        r'href="(/us/(?:movie|tv-show)/[^"#?]+)"',
+        r'"url":"(\\/us\\/(?:movie|tv-show)\\/[^"\\]+)"',
+        r'"fullPath":"(\\/us\\/(?:movie|tv-show)\\/[^"\\]+)"',
+    ]
+
+    for pattern in patterns:
+        match = re.search(pattern, search_html)
+        if not match:
+            continue
+        path = unescape(match.group(1)).replace('\\/', '/')
+        if not path.startswith('/us/'):
+            continue
+        return f'{WATCH_BASE}{path}'
+
+    return None
+
+
+def scrape_first_watch_result(title, timeout=10, retries=None):
+    url = WATCH_SEARCH.format(query=quote_plus(title))
+    html = http_fetcher.fetch_html(url, timeout=timeout, retries=retries)
+    return extract_first_result_url(html)
+
+
+_inflight = {}
+_inflight_lock = threading.Lock()
+_next_prune_at = 0
+
+
+def title_key(title):
+    return ' '.join((title or '').casefold().split())
+
+
+def store_resolution(cur, title, url, ttl_seconds=None):
+    """Cache a title's JustWatch page; url=None records that the search found nothing.
+
+    Titles come from visitors, so expired rows are deleted here too, at most
+    once per WATCH_CACHE_PRUNE_SECONDS per process.
+    """
+    global _next_prune_at
+    if ttl_seconds is None:
+        ttl_seconds = WATCH_CACHE_TTL_SECONDS if url else WATCH_CACHE_NEGATIVE_TTL_SECONDS
+    now_ts = int(time.time())
+    if now_ts >= _next_prune_at:
+        _next_prune_at = now_ts + WATCH_CACHE_PRUNE_SECONDS
+        cur.execute('DELETE FROM watch_link_cache WHERE expires_at_epoch <= ?', (now_ts,))
+    cur.execute(
+        '''
+        INSERT INTO watch_link_cache(title_key, url, fetched_at_epoch, expires_at_epoch)
+        VALUES(?, ?, ?, ?)
+        ON CONFLICT(title_key) DO UPDATE SET
+          url=excluded.url,
+          fetched_at_epoch=excluded.fetched_at_epoch,
+          expires_at_epoch=excluded.expires_at_epoch
+        ''',
+        (title_key(title), url, now_ts, now_ts + ttl_seconds),
+    )
+
+
+def _cached(conn, key):
+    row = conn.execute(
+        'SELECT url FROM watch_link_cache WHERE title_key = ? AND expires_at_epoch > ?',
+        (key, int(time.time())),
+    ).fetchone()
+    return (True, row['url']) if row else (False, None)
+
+
+def resolve_watch_url(title):
+    """Return the JustWatch page for a title, or None if the search has no match.
+
+    Answers come from watch_link_cache while fresh. On a miss only one
+    thread per process fetches a given title; concurrent callers wait for
+    its answer instead of sending their own upstream request. The pooled
+    connection is handed back before fetching or waiting, so slow lookups
+    don't tie up the pool. A failed fetch returns None without caching it.
+    """
+    key = title_key(title)
+    hit, url = _cached(pooled_connection(), key)
+    if hit:
+        return url
+    release_pooled_connection()
+
+    with _inflight_lock:
+        done = _inflight.get(key)
+        leader = done is None
+        if leader:
+            done = _inflight[key] = threading.Event()
+    if not leader:
+        done.wait(WATCH_WAIT_SECONDS)
+        return _cached(pooled_connection(), key)[1]
+
+    try:
+        try:
+            url = scrape_first_watch_result(title, timeout=WATCH_FETCH_TIMEOUT_SECONDS, retries=WATCH_FETCH_RETRIES)
+        except Exception:
+            # Timeouts and 429s say nothing about the title; only a search without a match is cached.
+            return None
+        conn = pooled_connection()
+        store_resolution(conn, title, url)
+        conn.commit()
+        return url
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+        done.set()
+
+
+def warm_watch_link_cache(conn):
+    """Drop expired entries and seed titles that already have a JustWatch title page override."""
+    now_ts = int(time.time())
+    conn.execute('DELETE FROM watch_link_cache WHERE expires_at_epoch <= ?', (now_ts,))
+    rows = conn.execute(
+        '''
+        SELECT f.title, wl.url
+        FROM admin_watch_links wl
+        JOIN films f ON f.id = wl.film_id
+        WHERE wl.url LIKE 'https://www.justwatch.com/us/movie/%'
+           OR wl.url LIKE 'https://www.justwatch.com/us/tv-show/%'
+        ORDER BY wl.updated_at
+        '''
+    ).fetchall()
+    conn.executemany(
+        '''
+        INSERT INTO watch_link_cache(title_key, url, fetched_at_epoch, expires_at_epoch)
+        VALUES(?, ?, ?, ?)
+        ON CONFLICT(title_key) DO UPDATE SET
+          url=excluded.url,
+          fetched_at_epoch=excluded.fetched_at_epoch,
+          expires_at_epoch=excluded.expires_at_epoch
+        WHERE watch_link_cache.url IS NULL
+        ''',
+        [(title_key(row['title']), row['url'], now_ts, now_ts + WATCH_CACHE_TTL_SECONDS) for row in rows],
+    )
+    conn.commit()
+    return len(rows)
@@ -0,0 +1,149 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+from db import connect
+
+WRITE_GROUP_WINDOW_SECONDS = max(0, int(os.getenv('OSCAR_WRITE_GROUP_MS', '5'))) / 1000
+WRITE_GROUP_MAX_ITEMS = max(1, int(os.getenv('OSCAR_WRITE_GROUP_MAX', '256')))
+WRITE_QUEUE_MAX_ITEMS = max(1, int(os.getenv('OSCAR_WRITE_QUEUE_MAX', '10000')))
+WRITE_LATENCY_SAMPLES = 1024
+
+
+class WriteQueueFull(Exception):
+    pass
+
+
+class _PendingWrite:
+    __slots__ = ('work', 'future', 'queued_at')
+
+    def __init__(self, work):
+        self.work = work
+        self.future = Future()
+        self.queued_at = time.monotonic()
+
+
+def _percentile(samples, percentile):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(len(ordered) * percentile / 100))
+    return round(ordered[index] * 1000, 2)
+
+
+class GroupCommitWriter:
+    """Single writer thread that commits queued user writes in groups.
+
+    work(conn) callables run inside one BEGIN IMMEDIATE transaction per group,
+    each under its own SAVEPOINT so a failing item only rolls back itself.
+    Futures resolve only after the group's COMMIT, so an acknowledged write
+    is durable. group_state is a dict that lives for one group's
+    transaction, for work items that can share a lookup.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue(maxsize=WRITE_QUEUE_MAX_ITEMS)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.group_state = {}
+        self._groups = 0
+        self._items = 0
+        self._failed_groups = 0
+        self._rejected = 0
+        self._largest_group = 0
+        self._commit_seconds = deque(maxlen=WRITE_LATENCY_SAMPLES)
+        self._ack_seconds = deque(maxlen=WRITE_LATENCY_SAMPLES)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='group-commit', daemon=True)
+                self._thread.start()
+
+    def submit(self, work):
+        self.start()
+        pending = _PendingWrite(work)
+        try:
+            self._queue.put_nowait(pending)
+        except queue.Full:
+            with self._stats_lock:
+                self._rejected += 1
+            raise WriteQueueFull() from None
+        return pending.future
+
+    def metrics(self):
+        with self._stats_lock:
+            return {
+                'queueDepth': self._queue.qsize(),
+                'queueCapacity': WRITE_QUEUE_MAX_ITEMS,
+                'groupsCommitted': self._groups,
+                'writesCommitted': self._items,
+                'failedGroups': self._failed_groups,
+                'rejectedWrites': self._rejected,
+                'largestGroup': self._largest_group,
+                'commitMsP50': _percentile(self._commit_seconds, 50),
+                'commitMsP99': _percentile(self._commit_seconds, 99),
+                'ackMsP50': _percentile(self._ack_seconds, 50),
+                'ackMsP99': _percentile(self._ack_seconds, 99),
+            }
+
+    def _next_group(self):
+        group = [self._queue.get()]
+        deadline = time.monotonic() + WRITE_GROUP_WINDOW_SECONDS
+        while len(group) < WRITE_GROUP_MAX_ITEMS:
+            remaining = deadline - time.monotonic()
+            try:
+                group.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return group
+
+    def _run(self):
+        conn = connect(check_same_thread=False)
+        while True:
+            group = self._next_group()
+            started = time.monotonic()
+            outcomes = []
+            self.group_state = {}
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+                for pending in group:
+                    conn.execute('SAVEPOINT user_write')
+                    try:
+                        outcomes.append((pending, pending.work(conn), None))
+                        conn.execute('RELEASE user_write')
+                    except Exception as exc:
+                        conn.execute('ROLLBACK TO user_write')
+                        conn.execute('RELEASE user_write')
+                        outcomes.append((pending, None, exc))
+                conn.commit()
+            except sqlite3.Error as exc:
+                conn.rollback()
+                with self._stats_lock:
+                    self._failed_groups += 1
+                for pending in group:
+                    pending.future.set_exception(exc)
+                continue
+
+            finished = time.monotonic()
+            for pending, result, error in outcomes:
+                if error is None:
+                    pending.future.set_result(result)
+                else:
+                    pending.future.set_exception(error)
+            with self._stats_lock:
+                self._groups += 1
+                self._items += len(group)
+                self._largest_group = max(self._largest_group, len(group))
+                self._commit_seconds.append(finished - started)
+                self._ack_seconds.extend(finished - pending.queued_at for pending in group)
+
+
+group_writer = GroupCommitWriter()
@@ -5,13 +5,19 @@ const state = {
   action: '',
   success: 'all',
   limit: 100,
+  from: '',
+  to: '',
   logs: [],
-  actions: []
+  actions: [],
+  nextBeforeId: null
 };
 
 const auditActionSelect = document.getElementById('auditActionSelect');
 const auditSuccessSelect = document.getElementById('auditSuccessSelect');
 const auditLimitSelect = document.getElementById('auditLimitSelect');
+const auditFromInput = document.getElementById('auditFromInput');
+const auditToInput = document.getElementById('auditToInput');
+const auditOlderButton = document.getElementById('auditOlderButton');
 const auditRefreshButton = document.getElementById('auditRefreshButton');
 const auditStatus = document.getElementById('auditStatus');
 const auditTableBody = document.getElementById('auditTableBody');
@@ -53,13 +59,23 @@ const sizeSelectToOptions = (selectEl) => {
   selectEl.style.width = `${Math.max(longest + 4, 8)}ch`;
 };
 
-const loadAuditLogs = async () => {
+// Without beforeId this loads the newest page; with it, the next older page is appended.
+const loadAuditLogs = async (beforeId = null) => {
   const params = new URLSearchParams();
   if (state.action) {
     params.set('action', state.action);
   }
   params.set('success', state.success || 'all');
   params.set('limit', String(state.limit || 100));
+  if (state.from) {
+    params.set('from', state.from);
+  }
+  if (state.to) {
+    params.set('to', state.to);
+  }
+  if (beforeId) {
+    params.set('before_id', String(beforeId));
+  }
   const paths = [
     `/api/admin/audit-logs?${params.toString()}`,
     `/api/admin/audit-logs/?${params.toString()}`,
@@ -69,8 +85,9 @@ const loadAuditLogs = async () => {
   for (const path of paths) {
     try {
       const payload = await api(path);
-      state.logs = payload.logs || [];
+      state.logs = beforeId ? [...state.logs, ...(payload.logs || [])] : payload.logs || [];
       state.actions = payload.actions || [];
+      state.nextBeforeId = payload.nextBeforeId || null;
       return;
     } catch (error) {
       if (!String(error.message || '').includes('API error 404')) {
@@ -94,6 +111,8 @@ const render = () => {
   auditActionSelect.value = state.action;
   auditSuccessSelect.value = state.success;
   auditLimitSelect.value = String(state.limit);
+  auditFromInput.value = state.from;
+  auditToInput.value = state.to;
   sizeSelectToOptions(auditActionSelect);
   sizeSelectToOptions(auditSuccessSelect);
   sizeSelectToOptions(auditLimitSelect);
@@ -120,6 +139,7 @@ const render = () => {
     auditTableBody.append(tr);
   }
 
+  auditOlderButton.hidden = !state.nextBeforeId;
   auditStatus.textContent = `${state.logs.length} log entries loaded.`;
 };
 
@@ -147,6 +167,23 @@ const wireEvents = () => {
     render();
   });
 
+  auditFromInput.addEventListener('change', async () => {
+    state.from = auditFromInput.value;
+    await loadAuditLogs();
+    render();
+  });
+
+  auditToInput.addEventListener('change', async () => {
+    state.to = auditToInput.value;
+    await loadAuditLogs();
+    render();
+  });
+
+  auditOlderButton.addEventListener('click', async () => {
+    await loadAuditLogs(state.nextBeforeId);
+    render();
+  });
+
   auditRefreshButton.addEventListener('click', async () => {
     await loadAuditLogs();
     render();
@@ -155,7 +155,12 @@ const resolveWatchUrl = (film) => {
 };
 const posterProxyUrl = (filmId) =>
   `/api/poster-image?year=${encodeURIComponent(String(state.year))}&filmId=${encodeURIComponent(filmId)}`;
-const resolvePosterUrl = (film) => posterProxyUrl(film.id);
+// Hashed poster URLs are immutable; anything else goes through the proxy.
+const resolvePosterUrl = (film) =>
+  film.posterUrl && film.posterUrl.startsWith('/api/poster-image?') ? film.posterUrl : posterProxyUrl(film.id);
+// Downscaled variants the server packs; .poster-wrap is 72px wide.
+const POSTER_WIDTHS = [80, 160, 240];
+const posterSrcset = (url) => POSTER_WIDTHS.map((width) => `${url}&w=${width} ${width}w`).join(', ');
 
 const sizeSelectToOptions = (selectEl) => {
   const longest = Math.max(...[...selectEl.options].map((o) => o.textContent.length), 1);
@@ -299,7 +304,10 @@ const renderFilms = () => {
 
     const posterImage = card.querySelector('.poster-image');
     const posterFallback = card.querySelector('.poster-fallback');
-    posterImage.src = resolvePosterUrl(film);
+    const posterUrl = resolvePosterUrl(film);
+    posterImage.sizes = '72px';
+    posterImage.srcset = posterSrcset(posterUrl);
+    posterImage.src = `${posterUrl}&w=${POSTER_WIDTHS[1]}`;
     posterImage.alt = `${film.title} poster`;
     posterImage.hidden = false;
     posterFallback.hidden = true;
@@ -27,6 +27,9 @@ const CATEGORY_VIEW_ORDER = [
   'Writing (Original Screenplay)'
 ];
 const LIVE_SYNC_INTERVAL_MS = 5000;
+const USER_WRITE_DEBOUNCE_MS = 400;
+const USER_WRITE_RETRY_MS = 3000;
+const USER_WRITE_BATCH_PATH = '/api/user-state/batch';
 const USER_PREFS_KEY = 'oscars:user:prefs';
 const EVENT_MODE_SIGNAL_KEY = 'oscars:event-mode-signal';
 const makeUserKey = () =>
@@ -148,6 +151,9 @@ const announcementBanner = document.getElementById('announcementBanner');
 const appHeader = document.querySelector('.app-header');
 let liveSyncTimerId = null;
 let liveSyncBusy = false;
+let liveEventSource = null;
+let liveEventYear = null;
+let liveEventsUnavailable = false;
 
 const stableObjectSignature = (obj) =>
   JSON.stringify(
@@ -193,7 +199,12 @@ const resolveWatchUrl = (film) => {
 
 const posterProxyUrl = (filmId) =>
   `/api/poster-image?year=${encodeURIComponent(String(state.year))}&filmId=${encodeURIComponent(filmId)}`;
-const resolvePosterUrl = (film) => posterProxyUrl(film.id);
+// Hashed poster URLs are immutable; anything else goes through the proxy.
+const resolvePosterUrl = (film) =>
+  film.posterUrl && film.posterUrl.startsWith('/api/poster-image?') ? film.posterUrl : posterProxyUrl(film.id);
+// Downscaled variants the server packs; .poster-wrap is 72px wide.
+const POSTER_WIDTHS = [80, 160, 240];
+const posterSrcset = (url) => POSTER_WIDTHS.map((width) => `${url}&w=${width} ${width}w`).join(', ');
 
 const sizeSelectToOptions = (selectEl) => {
   const longest = Math.max(...[...selectEl.options].map((o) => o.textContent.length), 1);
@@ -428,7 +439,10 @@ const renderFilms = () => {
 
     const posterImage = card.querySelector('.poster-image');
     const posterFallback = card.querySelector('.poster-fallback');
-    posterImage.src = resolvePosterUrl(film);
+    const posterUrl = resolvePosterUrl(film);
+    posterImage.sizes = '72px';
+    posterImage.srcset = posterSrcset(posterUrl);
+    posterImage.src = `${posterUrl}&w=${POSTER_WIDTHS[1]}`;
     posterImage.alt = `${film.title} poster`;
     posterImage.hidden = false;
     posterFallback.hidden = true;
@@ -514,25 +528,170 @@ const refresh = async () => {
   render();
 };
 
-const updateSeen = async (filmId, seen) => {
-  await api('/api/user-state', {
-    method: 'PUT',
-    headers: { 'Content-Type': 'application/json' },
-    body: JSON.stringify({ year: state.year, userKey: state.userKey, filmId, seen })
+// Seen/pick toggles are coalesced per film/category and sent as one batch.
+// Sequence numbers make retries idempotent; clientId scopes them to this page.
+const userWrites = {
+  clientId: makeUserKey(),
+  seq: 0,
+  year: null,
+  pendingSeen: new Map(),
+  pendingPicks: new Map(),
+  inFlight: null,
+  timerId: null
+};
+
+const hasPendingUserWrites = () =>
+  userWrites.pendingSeen.size > 0 || userWrites.pendingPicks.size > 0;
+
+const takeUserWriteBatch = () => {
+  const mutations = [];
+  const picks = [];
+  userWrites.pendingSeen.forEach((seen, filmId) => {
+    userWrites.seq += 1;
+    mutations.push({ seq: userWrites.seq, type: 'seen', filmId, seen });
   });
+  userWrites.pendingPicks.forEach((pick, category) => {
+    userWrites.seq += 1;
+    mutations.push({ seq: userWrites.seq, type: 'pick', category, filmId: pick.filmId });
+    picks.push({ seq: userWrites.seq, category, ...pick });
+  });
+  userWrites.pendingSeen.clear();
+  userWrites.pendingPicks.clear();
+  return {
+    body: {
+      year: userWrites.year,
+      userKey: state.userKey,
+      clientId: userWrites.clientId,
+      mutations
+    },
+    picks
+  };
 };
 
-const updatePick = async (category, filmId, picked) => {
+const revertFailedPicks = (batch, results) => {
+  const failedBySeq = new Map(results.filter((r) => !r.ok).map((r) => [r.seq, r.error || '']));
+  const failed = batch.picks.filter((pick) => failedBySeq.has(pick.seq));
+  if (!failed.length) {
+    return;
+  }
+  failed.forEach((pick) => {
+    if (batch.body.year !== state.year || (state.picksByCategory[pick.category] || null) !== pick.filmId) {
+      return;
+    }
+    if (pick.previous) {
+      state.picksByCategory[pick.category] = pick.previous;
+    } else {
+      delete state.picksByCategory[pick.category];
+    }
+  });
   saveLocalPicks(state.picksByCategory);
-  await api('/api/user-pick', {
-    method: 'PUT',
-    headers: { 'Content-Type': 'application/json' },
-    body: JSON.stringify({ year: state.year, userKey: state.userKey, category, filmId, picked })
+  renderFilms();
+  const messages = failed.map((pick) => failedBySeq.get(pick.seq));
+  if (messages.some((message) => message.includes('Voting is locked'))) {
+    alert('Voting for this category is closed.');
+  } else {
+    alert(`Unable to save My Pick. ${messages[0]}`);
+  }
+};
+
+const sendUserWriteBatch = async (batch) => {
+  userWrites.inFlight = batch;
+  try {
+    const payload = await api(USER_WRITE_BATCH_PATH, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(batch.body)
+    });
+    revertFailedPicks(batch, payload.results || []);
+  } catch (error) {
+    const message = String(error?.message || '');
+    if (!/API error 4\d\d/.test(message)) {
+      // Network or server error: resend the same seqs later; the server dedupes.
+      await new Promise((resolve) => setTimeout(resolve, USER_WRITE_RETRY_MS));
+      userWrites.inFlight = null;
+      sendUserWriteBatch(batch);
+      return;
+    }
+    revertFailedPicks(
+      batch,
+      batch.picks.map((pick) => ({ seq: pick.seq, ok: false, error: message }))
+    );
+  }
+  userWrites.inFlight = null;
+  if (hasPendingUserWrites()) {
+    scheduleUserWrites();
+  }
+};
+
+const flushUserWrites = () => {
+  clearTimeout(userWrites.timerId);
+  userWrites.timerId = null;
+  if (userWrites.inFlight || !hasPendingUserWrites()) {
+    return;
+  }
+  sendUserWriteBatch(takeUserWriteBatch());
+};
+
+const scheduleUserWrites = () => {
+  clearTimeout(userWrites.timerId);
+  userWrites.timerId = setTimeout(flushUserWrites, USER_WRITE_DEBOUNCE_MS);
+};
+
+const prepareUserWrite = () => {
+  if (userWrites.year !== null && userWrites.year !== state.year && hasPendingUserWrites()) {
+    // A batch targets one year; ship the old year's writes before queueing new ones.
+    if (userWrites.inFlight) {
+      navigator.sendBeacon?.(
+        USER_WRITE_BATCH_PATH,
+        new Blob([JSON.stringify(takeUserWriteBatch().body)], { type: 'application/json' })
+      );
+    } else {
+      flushUserWrites();
+    }
+  }
+  userWrites.year = state.year;
+};
+
+const updateSeen = (filmId, seen) => {
+  prepareUserWrite();
+  userWrites.pendingSeen.set(filmId, seen);
+  scheduleUserWrites();
+};
+
+const updatePick = (category, filmId, previousFilmId) => {
+  prepareUserWrite();
+  saveLocalPicks(state.picksByCategory);
+  const pending = userWrites.pendingPicks.get(category);
+  userWrites.pendingPicks.set(category, {
+    filmId,
+    previous: pending ? pending.previous : previousFilmId
+  });
+  scheduleUserWrites();
+};
+
+const flushUserWritesOnExit = () => {
+  if (!navigator.sendBeacon) {
+    flushUserWrites();
+    return;
+  }
+  const batches = [];
+  if (userWrites.inFlight) {
+    batches.push(userWrites.inFlight.body);
+  }
+  if (hasPendingUserWrites()) {
+    batches.push(takeUserWriteBatch().body);
+  }
+  batches.forEach((body) => {
+    navigator.sendBeacon(
+      USER_WRITE_BATCH_PATH,
+      new Blob([JSON.stringify(body)], { type: 'application/json' })
+    );
   });
 };
 
 const wireEvents = () => {
   yearSelect.addEventListener('change', async (event) => {
+    flushUserWrites();
     state.year = Number(event.target.value);
     state.category = DEFAULT_CATEGORY;
     saveUserPrefs();
@@ -556,7 +715,7 @@ const wireEvents = () => {
     if (seenButton) {
       const filmId = seenButton.dataset.filmId;
       const nextSeen = !state.seenFilmIds.has(filmId);
-      await updateSeen(filmId, nextSeen);
+      updateSeen(filmId, nextSeen);
       if (nextSeen) {
         state.seenFilmIds.add(filmId);
       } else {
@@ -573,8 +732,8 @@ const wireEvents = () => {
       }
       const category = pickButton.dataset.category;
       const filmId = pickButton.dataset.filmId;
-      const currentlyPicked = state.picksByCategory?.[category] === filmId;
-      const nextPicked = !currentlyPicked;
+      const previousFilmId = state.picksByCategory?.[category] || null;
+      const currentlyPicked = previousFilmId === filmId;
 
       if (currentlyPicked) {
         delete state.picksByCategory[category];
@@ -582,23 +741,7 @@ const wireEvents = () => {
         state.picksByCategory[category] = filmId;
       }
       renderFilms();
-
-      try {
-        await updatePick(category, filmId, nextPicked);
-      } catch (error) {
-        if (currentlyPicked) {
-          state.picksByCategory[category] = filmId;
-        } else {
-          delete state.picksByCategory[category];
-        }
-        renderFilms();
-        const message = String(error?.message || '');
-        if (message.includes('API error 403: /api/user-pick')) {
-          alert('Voting for this category is closed.');
-        } else {
-          alert(`Unable to save My Pick. ${message}`);
-        }
-      }
+      updatePick(category, currentlyPicked ? null : filmId, previousFilmId);
       return;
     }
 
@@ -615,6 +758,13 @@ const wireEvents = () => {
     window.scrollTo({ top: 0, behavior: 'smooth' });
   });
 
+  window.addEventListener('pagehide', flushUserWritesOnExit);
+  document.addEventListener('visibilitychange', () => {
+    if (document.hidden) {
+      flushUserWrites();
+    }
+  });
+
   window.addEventListener('storage', async (event) => {
     if (event.key !== EVENT_MODE_SIGNAL_KEY || !event.newValue) {
       return;
@@ -633,37 +783,111 @@ const wireEvents = () => {
   });
 };
 
-const startLiveSync = () => {
+const syncLiveState = async () => {
+  if (liveSyncBusy) {
+    return;
+  }
+
+  liveSyncBusy = true;
+  const before = liveSyncSignature();
+  try {
+    await loadNominees();
+    await loadSeen();
+    renderBanner();
+    const after = liveSyncSignature();
+    if (after !== before) {
+      renderFilms();
+    }
+  } catch {
+    // Skip transient sync errors; normal manual actions still surface errors.
+  } finally {
+    liveSyncBusy = false;
+  }
+};
+
+const stopLiveSync = () => {
   if (liveSyncTimerId) {
     clearInterval(liveSyncTimerId);
     liveSyncTimerId = null;
   }
-
-  if (!state.eventMode) {
-    return;
+  if (liveEventSource) {
+    liveEventSource.close();
+    liveEventSource = null;
+    liveEventYear = null;
   }
+};
 
-  liveSyncTimerId = setInterval(async () => {
-    if (liveSyncBusy || document.hidden) {
-      return;
+const startLivePolling = () => {
+  liveSyncTimerId = setInterval(() => {
+    if (!document.hidden) {
+      syncLiveState();
     }
+  }, LIVE_SYNC_INTERVAL_MS);
+};
 
-    liveSyncBusy = true;
-    const before = liveSyncSignature();
-    try {
-      await loadNominees();
-      await loadSeen();
+const parseLiveEvent = (event) => {
+  try {
+    return JSON.parse(event.data);
+  } catch {
+    return null;
+  }
+};
+
+const startLiveEvents = () => {
+  const source = new EventSource(`/api/events?year=${encodeURIComponent(String(state.year))}`);
+  liveEventSource = source;
+  liveEventYear = state.year;
+
+  // Winners change scores too, so refetch; conditional requests keep this cheap.
+  source.addEventListener('winner', () => syncLiveState());
+  source.addEventListener('resync', () => syncLiveState());
+  source.addEventListener('banner', (event) => {
+    const payload = parseLiveEvent(event);
+    if (payload) {
+      state.banner = { enabled: Boolean(payload.enabled), text: String(payload.text || '') };
       renderBanner();
-      const after = liveSyncSignature();
-      if (after !== before) {
-        renderFilms();
-      }
-    } catch {
-      // Skip transient sync errors; normal manual actions still surface errors.
-    } finally {
-      liveSyncBusy = false;
     }
-  }, LIVE_SYNC_INTERVAL_MS);
+  });
+  source.addEventListener('votingLock', (event) => {
+    const payload = parseLiveEvent(event);
+    if (payload) {
+      state.votingLocked = Boolean(payload.enabled);
+      renderFilms();
+    }
+  });
+  source.addEventListener('eventMode', (event) => {
+    const payload = parseLiveEvent(event);
+    if (payload) {
+      state.eventMode = Boolean(payload.enabled);
+      startLiveSync();
+    }
+  });
+  source.addEventListener('error', () => {
+    // The browser reconnects on its own unless the server refused the stream.
+    if (source.readyState === EventSource.CLOSED && liveEventSource === source) {
+      liveEventSource = null;
+      liveEventYear = null;
+      liveEventsUnavailable = true;
+      startLiveSync();
+    }
+  });
+};
+
+const startLiveSync = () => {
+  if (state.eventMode && liveEventSource && liveEventYear === state.year) {
+    return;
+  }
+  stopLiveSync();
+
+  if (!state.eventMode) {
+    return;
+  }
+
+  if (window.EventSource && !liveEventsUnavailable) {
+    startLiveEvents();
+  } else {
+    startLivePolling();
+  }
 };
 
 const start = async () => {